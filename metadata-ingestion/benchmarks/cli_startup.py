@@ -0,0 +1,194 @@
+"""
+Measures the cold start of the datahub CLI: the wall-clock time of a few commands,
+each in a fresh interpreter, and with `python -X importtime`, the time spent
+importing each module. The report ranks the worst offenders, and the run fails if
+a command or a module takes longer than its budget in import_budgets.yml.
+
+Usage: python benchmarks/cli_startup.py [--runs N] [--top N] [--command NAME]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple
+
+import yaml
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGETS = os.path.join(BENCHMARKS_DIR, "import_budgets.yml")
+MCE_FILE = os.path.join(
+    BENCHMARKS_DIR, "..", "examples", "mce_files", "single_mce.json"
+)
+
+_CLI = "from datahub.entrypoints import datahub; datahub(prog_name='datahub')"
+
+_RECIPE = """
+source:
+  type: file
+  config:
+    filename: {filename}
+sink:
+  type: console
+"""
+
+# The arguments of each command, where {recipe} is a file to console recipe.
+COMMANDS: Dict[str, List[str]] = {
+    "help": ["--help"],
+    "list-plugins": ["ingest-list-plugins"],
+    "file-to-console": ["ingest", "-c", "{recipe}"],
+}
+
+
+class ImportTime(NamedTuple):
+    # In milliseconds. The cumulative time includes the modules that it imported
+    # first.
+    self_ms: float
+    cumulative_ms: float
+
+
+def parse_importtime(stderr: str) -> Dict[str, ImportTime]:
+    """
+    Parses the "import time: self | cumulative | module" lines, in microseconds.
+    The modules that the interpreter imports on startup, up to and including site,
+    are left out.
+    """
+    import_times: Dict[str, ImportTime] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.split(":", 1)[1].split("|")
+        if not self_us.strip().isdigit():
+            # The header.
+            continue
+        import_times[module.strip()] = ImportTime(
+            int(self_us) / 1000, int(cumulative_us) / 1000
+        )
+        # Modules are listed once they are imported, after the ones they import,
+        # and nested modules are indented.
+        if module.rstrip() == " site":
+            import_times.clear()
+    return import_times
+
+
+def get_offender(module: str) -> str:
+    """
+    What the time spent importing a module is attributed to. The datahub modules
+    are listed each on their own, except for the generated classes, while other
+    packages are listed as a whole.
+    """
+    if module.startswith("datahub.metadata.") or module == "datahub.metadata":
+        return "datahub.metadata"
+    if module == "datahub" or module.startswith("datahub."):
+        return module
+    return module.split(".", 1)[0]
+
+
+def rank_offenders(import_times: Dict[str, ImportTime]) -> List[tuple]:
+    totals: Dict[str, float] = {}
+    for module, import_time in import_times.items():
+        offender = get_offender(module)
+        totals[offender] = totals.get(offender, 0.0) + import_time.self_ms
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _run(args: List[str], importtime: bool) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    return subprocess.run(
+        command + ["-c", _CLI] + args,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+
+def measure(args: List[str], runs: int) -> tuple:
+    """The median wall-clock time, and the median import times of each module."""
+    # Makes sure that the modules are compiled, like they would be once installed.
+    _run(args, importtime=False)
+
+    wall_clock_ms: List[float] = []
+    import_times: Dict[str, List[ImportTime]] = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(args, importtime=False)
+        wall_clock_ms.append((time.perf_counter() - start) * 1000)
+        stderr = _run(args, importtime=True).stderr
+        for module, import_time in parse_importtime(stderr).items():
+            import_times.setdefault(module, []).append(import_time)
+
+    median_import_times = {
+        module: ImportTime(
+            statistics.median(t.self_ms for t in times),
+            statistics.median(t.cumulative_ms for t in times),
+        )
+        for module, times in import_times.items()
+    }
+    return statistics.median(wall_clock_ms), median_import_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--command", choices=sorted(COMMANDS), action="append", dest="commands"
+    )
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS)
+    args = parser.parse_args()
+
+    with open(args.budgets) as f:
+        budgets = yaml.safe_load(f)
+    command_budgets: Dict[str, float] = budgets.get("commands", {})
+    module_budgets: Dict[str, float] = budgets.get("modules", {})
+
+    over_budget: List[str] = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recipe = os.path.join(temp_dir, "file_to_console.yml")
+        with open(recipe, "w") as f:
+            f.write(_RECIPE.format(filename=os.path.abspath(MCE_FILE)))
+
+        for name in args.commands or COMMANDS:
+            command_args = [arg.format(recipe=recipe) for arg in COMMANDS[name]]
+            wall_clock_ms, import_times = measure(command_args, args.runs)
+            imports_ms = sum(t.self_ms for t in import_times.values())
+
+            print(
+                f"datahub {' '.join(COMMANDS[name])}: {wall_clock_ms:.1f} ms, "
+                f"of which {imports_ms:.1f} ms importing {len(import_times)} modules "
+                f"(median of {args.runs} runs)"
+            )
+            if wall_clock_ms > command_budgets.get(name, float("inf")):
+                over_budget.append(
+                    f"{name}: {wall_clock_ms:.1f} ms, budget {command_budgets[name]} ms"
+                )
+
+            print("  Worst offenders, by time spent importing their modules:")
+            for offender, total_ms in rank_offenders(import_times)[: args.top]:
+                print(f"    {total_ms:8.1f} ms  {offender}")
+
+            for module, budget_ms in module_budgets.items():
+                import_time = import_times.get(module)
+                if import_time is not None and import_time.cumulative_ms > budget_ms:
+                    over_budget.append(
+                        f"{name}: importing {module} took "
+                        f"{import_time.cumulative_ms:.1f} ms, budget {budget_ms} ms"
+                    )
+            print()
+
+    if over_budget:
+        print("Over budget:")
+        for line in over_budget:
+            print(f"  {line}")
+        sys.exit(1)
+    print("Everything is within its budget.")
+
+
+if __name__ == "__main__":
+    main()
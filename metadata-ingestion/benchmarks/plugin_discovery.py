@@ -0,0 +1,82 @@
+"""
+Measures how long it takes a fresh interpreter to discover the source and sink
+plugins: with pkg_resources, as before, and with the importlib.metadata index,
+both when it has to be built and when it is read from its cache file.
+
+Usage: python benchmarks/plugin_discovery.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+GROUPS = ["datahub.ingestion.source.plugins", "datahub.ingestion.sink.plugins"]
+
+_TIMED = """
+import time
+{setup}
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+PKG_RESOURCES = f"""
+import pkg_resources
+for group in {GROUPS!r}:
+    list(pkg_resources.iter_entry_points(group))
+"""
+
+# Importing the package that holds the index isn't part of discovering plugins.
+PLUGIN_INDEX_SETUP = "import datahub.ingestion.api"
+
+PLUGIN_INDEX = f"""
+from datahub.ingestion.api import plugin_index
+for group in {GROUPS!r}:
+    plugin_index.get_entry_points(group)
+"""
+
+
+def _run(code: str, env: Dict[str, str], setup: str = "") -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMED.format(setup=setup, code=code)],
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "plugin_index.json")
+        env = {**os.environ, "DATAHUB_PLUGIN_INDEX": index_path}
+        timings: Dict[str, List[float]] = {
+            "pkg_resources": [],
+            "index, rebuilt": [],
+            "index, cached": [],
+        }
+        for _ in range(args.runs):
+            timings["pkg_resources"].append(_run(PKG_RESOURCES, env))
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            timings["index, rebuilt"].append(
+                _run(PLUGIN_INDEX, env, PLUGIN_INDEX_SETUP)
+            )
+            timings["index, cached"].append(_run(PLUGIN_INDEX, env, PLUGIN_INDEX_SETUP))
+
+    print(f"Median time to discover the plugins, over {args.runs} runs:")
+    for name, values in timings.items():
+        print(f"  {name + ':':<16} {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures the memory that each record in flight takes up, i.e. its work unit and
+record envelope, but not the MCE that they both point to. The dataclass-based
+types that were used before are measured for comparison.
+
+Usage: python benchmarks/record_memory.py [--records N]
+"""
+
+import argparse
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.source.metadata_common import MetadataWorkUnit
+
+
+@dataclass
+class _DataclassRecordEnvelope:
+    record: Any
+    metadata: dict
+    serialized: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _DataclassWorkUnit:
+    id: str
+    mce: Any
+
+
+def _dataclass_record(workunit_id: str, mce: Any) -> Tuple[Any, Any]:
+    return (
+        _DataclassWorkUnit(id=workunit_id, mce=mce),
+        _DataclassRecordEnvelope(mce, {"workunit_id": workunit_id}),
+    )
+
+
+def _slotted_record(workunit_id: str, mce: Any) -> Tuple[Any, Any]:
+    return (
+        MetadataWorkUnit(id=workunit_id, mce=mce),
+        RecordEnvelope(mce, workunit_id=workunit_id),
+    )
+
+
+def measure(make_record: Callable[[str, Any], Tuple[Any, Any]], count: int) -> float:
+    """Returns the bytes allocated per record in flight."""
+    mce = object()
+    # The ids and the lists that hold the records are created up front, so that
+    # only the records themselves are measured.
+    workunit_ids = [f"workunit-{i}" for i in range(count)]
+    workunits: List[Any] = [None] * count
+    record_envelopes: List[Any] = [None] * count
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i, workunit_id in enumerate(workunit_ids):
+        workunits[i], record_envelopes[i] = make_record(workunit_id, mce)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    dataclass_bytes = measure(_dataclass_record, args.records)
+    slotted_bytes = measure(_slotted_record, args.records)
+    print(f"Bytes per record in flight, over {args.records} records:")
+    print(f"  dataclasses: {dataclass_bytes:8.1f}")
+    print(f"  __slots__:   {slotted_bytes:8.1f}")
+    print(f"  saved:       {1 - slotted_bytes / dataclass_bytes:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Compares the generated schema classes of avrogen's single schema_classes module
+with the lazily loaded modules per namespace of scripts/avro_codegen.py: the time
+and memory that a fresh interpreter needs to import the MetadataChangeEvent class,
+and then to build and serialize its first event.
+
+By default, the schema is a synthetic one of about the size of the metadata
+models. Pass --schema to use a real one, e.g. MetadataChangeEvent.avsc.
+
+Usage: python benchmarks/schema_classes.py [--schema FILE] [--runs N]
+"""
+
+import argparse
+import compileall
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+NAMESPACES = 20
+RECORDS_PER_NAMESPACE = 15
+
+# Times the import and the first event, or with tracemalloc, measures the memory
+# that they allocate and keep, which tracing would skew the times of.
+_MEASURED = """
+import json
+import sys
+import time
+import tracemalloc
+import avrogen.dict_wrapper
+trace = {trace}
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+from {package}.{mxe_namespace} import MetadataChangeEvent
+imported = time.perf_counter()
+imported_memory = tracemalloc.get_traced_memory()[0]
+{serialize}
+serialized = time.perf_counter()
+if trace:
+    print(json.dumps({{
+        "import_mib": imported_memory / 2**20,
+        "total_mib": tracemalloc.get_traced_memory()[0] / 2**20,
+    }}))
+else:
+    print(json.dumps({{
+        "import_ms": (imported - start) * 1000,
+        "serialize_ms": (serialized - imported) * 1000,
+    }}))
+"""
+
+_SERIALIZE_SYNTHETIC = """
+from {package}.com.example.snapshot import Snapshot0Class
+from {package}.com.example.ns0 import Aspect0x0Class
+MetadataChangeEvent(
+    proposedSnapshot=Snapshot0Class(urn="urn", aspects=[Aspect0x0Class(name="a")])
+).to_obj()
+"""
+
+
+def _aspect(namespace: int, record: int) -> Dict[str, Any]:
+    return {
+        "type": "record",
+        "name": f"Aspect{namespace}x{record}",
+        "namespace": f"com.example.ns{namespace}",
+        "doc": "A synthetic aspect.",
+        "fields": [
+            {"name": "name", "type": "string"},
+            {"name": "description", "type": ["null", "string"], "default": None},
+            {"name": "created", "type": "long", "default": 0},
+            {"name": "tags", "type": {"type": "array", "items": "string"}},
+            {
+                "name": "properties",
+                "type": {"type": "map", "values": "string"},
+                "default": {},
+            },
+            {
+                "name": "kind",
+                "type": {
+                    "type": "enum",
+                    "name": f"Kind{namespace}x{record}",
+                    "symbols": ["FIRST", "SECOND", "THIRD"],
+                },
+            },
+        ],
+    }
+
+
+def synthetic_schema() -> Dict[str, Any]:
+    snapshots = [
+        {
+            "type": "record",
+            "name": f"Snapshot{namespace}",
+            "namespace": "com.example.snapshot",
+            "fields": [
+                {"name": "urn", "type": "string"},
+                {
+                    "name": "aspects",
+                    "type": {
+                        "type": "array",
+                        "items": [
+                            _aspect(namespace, record)
+                            for record in range(RECORDS_PER_NAMESPACE)
+                        ],
+                    },
+                },
+            ],
+        }
+        for namespace in range(NAMESPACES)
+    ]
+    return {
+        "type": "record",
+        "name": "MetadataChangeEvent",
+        "namespace": "com.example.mxe",
+        "fields": [{"name": "proposedSnapshot", "type": snapshots}],
+    }
+
+
+def _load_codegen() -> Any:
+    path = os.path.join(os.path.dirname(__file__), "..", "scripts", "avro_codegen.py")
+    spec = importlib.util.spec_from_file_location("avro_codegen", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module
+
+
+def _run(code: str, cwd: str) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--schema", help="an Avro schema file")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    codegen = _load_codegen()
+    if args.schema:
+        schema_json = codegen.load_schema(args.schema)
+        serialize = ""
+    else:
+        schema_json = json.dumps(synthetic_schema(), indent=2)
+        serialize = _SERIALIZE_SYNTHETIC
+    mxe_namespace = json.loads(schema_json)["namespace"]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        from avrogen import write_schema_files
+
+        write_schema_files(schema_json, os.path.join(temp_dir, "single_module"))
+        codegen.write_schema_files(schema_json, os.path.join(temp_dir, "split"))
+        # Like an installed package, the modules are compiled ahead of time.
+        compileall.compile_dir(temp_dir, quiet=1)
+
+        results: Dict[str, Dict[str, List[float]]] = {}
+        for run in range(args.runs + 1):
+            for package in ["single_module", "split"]:
+                code = _MEASURED.format(
+                    package=package,
+                    mxe_namespace=mxe_namespace,
+                    serialize=serialize.format(package=package),
+                    trace=run == args.runs,
+                )
+                for key, value in _run(code, temp_dir).items():
+                    results.setdefault(package, {}).setdefault(key, []).append(value)
+
+    print(
+        f"Median time over {args.runs} runs, and memory allocated by Python "
+        f"and still in use:"
+    )
+    for package, values in results.items():
+        print(
+            f"  {package + ':':<15}"
+            f" import {statistics.median(values['import_ms']):6.1f} ms"
+            f" {values['import_mib'][0]:5.1f} MiB,"
+            f" then the first event {statistics.median(values['serialize_ms']):6.1f} ms"
+            f" {values['total_mib'][0]:5.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,222 @@
 import json
+import os
+import re
+from io import StringIO
+from typing import Dict, List, Set, Tuple
 
 import click
-from avrogen import write_schema_files
+from avro import schema as avro_schema
+from avrogen.core_writer import clean_fullname, write_enum, write_schema_record
+from avrogen.tabbed_writer import TabbedWriter
 
+# Added to the top of every generated module, to suppress flake8 and black.
+HEADER = "# flake8: noqa\n# fmt: off\n"
+FOOTER = "# fmt: on\n"
 
-def suppress_checks_in_file(filepath: str) -> None:
-    """Adds a couple lines to the top of a file to suppress flake8 and black"""
+# The runtime of the generated package, which loads the namespace modules and
+# parses the schema on demand. Filled in with the generated class tables.
+SCHEMA_CLASSES_TEMPLATE = '''"""
+The generated classes of every schema. They are defined in a module per namespace,
+which is only imported once one of its classes is used, and the schema is only
+parsed once one of the classes needs it, e.g. to serialize a record.
+"""
+import importlib
+import json
+import os.path
+import sys
+import threading
+import types
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-    with open(filepath, "r+") as f:
-        contents = f.read()
+from avrogen import avrojson
 
-        f.seek(0, 0)
-        f.write("# flake8: noqa\n")
-        f.write("# fmt: off\n")
-        f.write(contents)
-        f.write("# fmt: on\n")
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "schema.avsc")
 
+# The namespace module that defines each class.
+_CLASS_MODULES: Dict[str, str] = {
+%(class_modules)s}
 
-@click.command()
-@click.argument("schema_file", type=click.Path(exists=True))
-@click.argument("outdir", type=click.Path())
-def generate(schema_file: str, outdir: str):
-    # print(f'using {schema_file}')
+# The name of the class of each schema, by full name and by name.
+_SCHEMA_CLASSES: Dict[str, str] = {
+%(schema_classes)s}
+
+__all__ = ["SCHEMA_JSON_STR", "SCHEMA", "get_schema_type"] + sorted(_CLASS_MODULES)
+
+_lock = threading.Lock()
+_schema_json_str: Optional[str] = None
+# The parsed schema, and every named schema in it by full name.
+_parsed: Optional[Tuple[Any, Dict[str, Any]]] = None
+
+
+def _read_schema_json_str() -> str:
+    global _schema_json_str
+    with _lock:
+        if _schema_json_str is None:
+            with open(_SCHEMA_FILE, "r") as f:
+                _schema_json_str = f.read()
+    return _schema_json_str
+
+
+def _parse_schema() -> Tuple[Any, Dict[str, Any]]:
+    global _parsed
+    schema_json_str = _read_schema_json_str()
+    with _lock:
+        if _parsed is None:
+            from avro.schema import Names, SchemaFromJSONData
+
+            names = Names()
+            schema = SchemaFromJSONData(json.loads(schema_json_str), names)
+            _parsed = (
+                schema,
+                {n.fullname.lstrip("."): n for n in names.names.values()},
+            )
+    return _parsed
+
+
+def get_schema_type(fullname: str) -> Any:
+    return _parse_schema()[1].get(fullname)
+
+
+class _RecordSchema:
+    """The RECORD_SCHEMA of a generated class, which is looked up on first use."""
+
+    def __init__(self, fullname: str):
+        self.fullname = fullname
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        record_schema = get_schema_type(self.fullname)
+        # From now on, the class attribute is the schema itself.
+        setattr(owner, "RECORD_SCHEMA", record_schema)
+        return record_schema
+
+
+def _get_class(class_name: str) -> type:
+    module = importlib.import_module(_CLASS_MODULES[class_name], __package__)
+    return getattr(module, class_name)
+
+
+class _SchemaTypes(dict):
+    """
+    The generated classes by the full name or name of their schema, which are only
+    imported once they are looked up.
+    """
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.lstrip(".") in _SCHEMA_CLASSES
+
+    def __missing__(self, name: str) -> type:
+        if name not in self:
+            raise KeyError(name)
+        cls = _get_class(_SCHEMA_CLASSES[name.lstrip(".")])
+        self[name] = cls
+        return cls
+
+    def __bool__(self) -> bool:
+        # The converter replaces an empty mapping with a dict.
+        return True
+
+
+_json_converter = avrojson.AvroJsonConverter(
+    use_logical_types=False, schema_types=_SchemaTypes()
+)
+
+
+def _register(*classes: type) -> None:
+    # The converter only registers itself with the classes that exist when it
+    # is created.
+    for cls in classes:
+        setattr(cls, "_json_converter", _json_converter)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _CLASS_MODULES:
+        value: Any = _get_class(name)
+    elif name == "SCHEMA_JSON_STR":
+        value = _read_schema_json_str()
+    elif name == "SCHEMA":
+        value = _parse_schema()[0]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+def _make_lazy(
+    module_name: str, get_attr: Callable[[str], Any], dir_: Callable[[], List[str]]
+) -> None:
+    # Module-level __getattr__ and __dir__ are only supported from Python 3.7.
+    if sys.version_info >= (3, 7):
+        return
+
+    class LazyModule(types.ModuleType):
+        def __getattr__(self, name: str) -> Any:
+            return get_attr(name)
+
+        def __dir__(self) -> List[str]:
+            return dir_()
+
+    sys.modules[module_name].__class__ = LazyModule
+
+
+_make_lazy(__name__, __getattr__, __dir__)
+
+if TYPE_CHECKING:
+    SCHEMA_JSON_STR: str
+    SCHEMA: Any
+
+%(type_checking_imports)s
+'''
+
+# The root package of the generated code, which exposes what avrogen's root
+# package does. The classes and the schema are loaded lazily by schema_classes.
+INIT_TEMPLATE = """from avro.io import DatumReader
+
+from . import schema_classes
+from .schema_classes import _json_converter as json_converter
+
+
+def __getattr__(name):
+    if name == "get_schema_type":
+        return schema_classes.SCHEMA
+    if name in schema_classes._CLASS_MODULES:
+        return getattr(schema_classes, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(schema_classes._CLASS_MODULES))
+
+
+schema_classes._make_lazy(__name__, __getattr__, __dir__)
+
+
+class SpecificDatumReader(DatumReader):
+    SCHEMA_TYPES = schema_classes._SchemaTypes()
+
+    def __init__(self, readers_schema=None, **kwargs):
+        writers_schema = kwargs.pop("writers_schema", readers_schema)
+        writers_schema = kwargs.pop("writer_schema", writers_schema)
+        super(SpecificDatumReader, self).__init__(writers_schema, readers_schema, **kwargs)
+
+    def read_record(self, writers_schema, readers_schema, decoder):
+        result = super(SpecificDatumReader, self).read_record(writers_schema, readers_schema, decoder)
+
+        if readers_schema.fullname in SpecificDatumReader.SCHEMA_TYPES:
+            result = SpecificDatumReader.SCHEMA_TYPES[readers_schema.fullname](result)
+
+        return result
+"""
+
+# References to generated classes; quoted ones are only type hints.
+CLASS_REFERENCE = re.compile(r'(?<![\w"])(\w+Class)\b(?!")')
+TYPE_HINT_REFERENCE = re.compile(r'"(\w+Class)"')
+
+
+def load_schema(schema_file: str) -> str:
     with open(schema_file) as f:
         raw_schema_text = f.read()
 
@@ -30,11 +225,177 @@ def generate(schema_file: str, outdir: str):
         '{"type": "string", "avro.java.string": "String"}', '"string"'
     )
 
-    redo_spaces = json.dumps(json.loads(schema_json), indent=2)
+    return json.dumps(json.loads(schema_json), indent=2)
+
+
+def get_named_schemas(schema_json: str) -> Dict[str, List[avro_schema.NamedSchema]]:
+    """The record and enum schemas, by namespace."""
+    names = avro_schema.Names()
+    avro_schema.SchemaFromJSONData(json.loads(schema_json), names)
+
+    by_namespace: Dict[str, List[avro_schema.NamedSchema]] = {}
+    class_names: Dict[str, str] = {}
+    for fullname, named_schema in sorted(names.names.items()):
+        if not isinstance(
+            named_schema, (avro_schema.RecordSchema, avro_schema.EnumSchema)
+        ):
+            continue
+        fullname = clean_fullname(fullname)
+        namespace, _, name = fullname.rpartition(".")
+        if not namespace:
+            raise click.UsageError(f"{fullname} has no namespace")
+        # The generated code refers to other classes by name alone.
+        if name in class_names:
+            raise click.UsageError(
+                f"{fullname} and {class_names[name]} have the same name"
+            )
+        class_names[name] = fullname
+        by_namespace.setdefault(namespace, []).append(named_schema)
+    return by_namespace
+
+
+def write_module(path: str, contents: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(HEADER)
+        f.write(contents)
+        f.write(FOOTER)
+
+
+def generate_namespace_module(
+    namespace: str,
+    named_schemas: List[avro_schema.NamedSchema],
+    class_namespaces: Dict[str, str],
+) -> str:
+    """
+    The module that defines the classes of a namespace. Their schemas are looked up
+    on first use. Classes of other namespaces that are only used as type hints are
+    only imported for type checking, and the ones that are used at runtime, e.g. as
+    defaults, are imported after the classes are defined, which allows cycles.
+    """
+    out = StringIO()
+    writer = TabbedWriter(out)
+    for named_schema in named_schemas:
+        if isinstance(named_schema, avro_schema.RecordSchema):
+            write_schema_record(named_schema, writer, False)
+        else:
+            write_enum(named_schema, writer)
+        writer.set_tab(0)
+    classes_code = out.getvalue().replace(
+        "RECORD_SCHEMA = get_schema_type(", "RECORD_SCHEMA = _RecordSchema("
+    )
 
-    write_schema_files(redo_spaces, outdir)
-    suppress_checks_in_file(f"{outdir}/schema_classes.py")
-    suppress_checks_in_file(f"{outdir}/__init__.py")
+    own_classes = [f"{clean_fullname(s.name)}Class" for s in named_schemas]
+    record_classes = [
+        f"{clean_fullname(s.name)}Class"
+        for s in named_schemas
+        if isinstance(s, avro_schema.RecordSchema)
+    ]
+
+    def imported(names: Set[str]) -> List[Tuple[str, str]]:
+        return sorted(
+            (class_namespaces[name], name)
+            for name in names
+            if name in class_namespaces and name not in own_classes
+        )
+
+    runtime_imports = imported(set(CLASS_REFERENCE.findall(classes_code)))
+    type_hint_imports = imported(set(TYPE_HINT_REFERENCE.findall(classes_code)))
+
+    root = "." * (len(namespace.split(".")) + 1)
+    lines = [
+        "from typing import TYPE_CHECKING, Dict, List, Optional, Union, overload",
+        "",
+        "from avrogen.dict_wrapper import DictWrapper",
+        "",
+        f"from {root}schema_classes import _RecordSchema, _register",
+        "",
+    ]
+    if type_hint_imports:
+        lines.append("if TYPE_CHECKING:")
+        lines.extend(
+            f"    from {root}{other_namespace} import {name}"
+            for other_namespace, name in type_hint_imports
+        )
+    lines.append(classes_code.rstrip())
+    lines.append("")
+    lines.append("")
+    lines.append(f"_register({', '.join(record_classes)})")
+    lines.append("")
+    lines.extend(
+        f"from {root}{other_namespace} import {name}"
+        for other_namespace, name in runtime_imports
+    )
+    lines.append("")
+    lines.extend(f"{name[: -len('Class')]} = {name}" for name in own_classes)
+    return "\n".join(lines) + "\n"
+
+
+def generate_schema_classes(
+    class_namespaces: Dict[str, str], named_schemas: List[avro_schema.NamedSchema]
+) -> str:
+    class_modules = "".join(
+        f'    "{name}": ".{namespace}",\n'
+        for name, namespace in sorted(class_namespaces.items())
+    )
+    schema_classes = "".join(
+        f'    "{clean_fullname(s.fullname)}": "{clean_fullname(s.name)}Class",\n'
+        for s in named_schemas
+    ) + "".join(
+        f'    "{clean_fullname(s.name)}": "{clean_fullname(s.name)}Class",\n'
+        for s in named_schemas
+    )
+    type_checking_imports = "\n".join(
+        f"    from .{namespace} import {name} as {name}"
+        for name, namespace in sorted(class_namespaces.items())
+    )
+    return SCHEMA_CLASSES_TEMPLATE % {
+        "class_modules": class_modules,
+        "schema_classes": schema_classes,
+        "type_checking_imports": type_checking_imports,
+    }
+
+
+def write_schema_files(schema_json: str, outdir: str) -> None:
+    by_namespace = get_named_schemas(schema_json)
+    class_namespaces = {
+        f"{clean_fullname(s.name)}Class": namespace
+        for namespace, named_schemas in by_namespace.items()
+        for s in named_schemas
+    }
+
+    os.makedirs(outdir, exist_ok=True)
+
+    with open(os.path.join(outdir, "schema.avsc"), "w") as f:
+        f.write(schema_json)
+
+    # Every level of a namespace is a package, which is empty unless the namespace
+    # has classes of its own.
+    for namespace in by_namespace:
+        parts = namespace.split(".")
+        for i in range(1, len(parts)):
+            init_file = os.path.join(outdir, *parts[:i], "__init__.py")
+            if not os.path.exists(init_file):
+                write_module(init_file, "")
+    for namespace, named_schemas in sorted(by_namespace.items()):
+        write_module(
+            os.path.join(outdir, *namespace.split("."), "__init__.py"),
+            generate_namespace_module(namespace, named_schemas, class_namespaces),
+        )
+
+    all_schemas = [s for named_schemas in by_namespace.values() for s in named_schemas]
+    write_module(
+        os.path.join(outdir, "schema_classes.py"),
+        generate_schema_classes(class_namespaces, all_schemas),
+    )
+    write_module(os.path.join(outdir, "__init__.py"), INIT_TEMPLATE)
+
+
+@click.command()
+@click.argument("schema_file", type=click.Path(exists=True))
+@click.argument("outdir", type=click.Path())
+def generate(schema_file: str, outdir: str):
+    write_schema_files(load_schema(schema_file), outdir)
 
 
 if __name__ == "__main__":
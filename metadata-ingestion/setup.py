@@ -28,6 +28,7 @@ base_requirements = {
     # Compatability.
     "dataclasses>=0.6; python_version < '3.7'",
     "typing_extensions>=3.7.4; python_version < '3.8'",
+    "importlib_metadata>=1.4; python_version < '3.8'",
     "mypy_extensions>=0.4.3",
     # Actual dependencies.
     "typing-inspect",
@@ -1,9 +1,10 @@
-import re
 from abc import ABC, abstractmethod
 from typing import IO, Any, List, Optional
 
 from pydantic import BaseModel
 
+from datahub.configuration.patterns import get_allow_deny_matcher
+
 
 class ConfigModel(BaseModel):
     class Config:
@@ -60,12 +61,6 @@ class AllowDenyPattern(ConfigModel):
         return AllowDenyPattern()
 
     def allowed(self, string: str) -> bool:
-        for deny_pattern in self.deny:
-            if re.match(deny_pattern, string):
-                return False
-
-        for allow_pattern in self.allow:
-            if re.match(allow_pattern, string):
-                return True
-
-        return False
+        # Like re.match() of each deny and then each allow pattern, but with the
+        # patterns compiled once and the decisions cached.
+        return get_allow_deny_matcher(self.allow, self.deny).allowed(string)
@@ -0,0 +1,166 @@
+import functools
+import re
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+# Sources check a pattern against every table, topic or collection, and the same
+# names come up again across schemas, recipes and runs of a daemon.
+DECISION_CACHE_SIZE = 65536
+# The number of pattern lists whose matchers are looked up by identity.
+_MATCHERS_BY_LIST_SIZE = 256
+
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+_DEFAULT_FLAGS = re.compile("").flags
+# Group references use absolute numbers or names, which combining patterns into an
+# alternation would shift or duplicate.
+_GROUP_REFERENCE = re.compile(r"\\[0-9]|\(\?P[<=]|\(\?\(")
+
+
+def get_literal_prefix(pattern: str) -> Optional[str]:
+    """
+    If re.match() of the pattern only checks that a string starts with a literal,
+    returns that literal. That covers plain and escaped characters, optionally
+    after a "^" and followed by ".*", e.g. "^db\\.staging\\..*" for "db.staging.".
+    """
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+    literal: List[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 < len(pattern) and pattern[i + 1] in _REGEX_SPECIAL_CHARS:
+                literal.append(pattern[i + 1])
+                i += 2
+                continue
+            return None
+        if pattern[i:] == ".*":
+            break
+        if char in _REGEX_SPECIAL_CHARS:
+            return None
+        literal.append(char)
+        i += 1
+    return "".join(literal)
+
+
+class PrefixTrie:
+    """A set of literal prefixes, which finds whether a string starts with any."""
+
+    _END = ""
+
+    def __init__(self, prefixes: Sequence[str] = ()):
+        self._root: Dict[str, dict] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._END] = {}
+
+    def matches_prefix(self, string: str) -> bool:
+        node = self._root
+        if self._END in node:
+            return True
+        for char in string:
+            next_node = node.get(char)
+            if next_node is None:
+                return False
+            node = next_node
+            if self._END in node:
+                return True
+        return False
+
+
+class CompiledPatterns:
+    """
+    Checks whether re.match() of any of several patterns matches a string. Literal
+    prefixes are looked up in a trie, and the other patterns are combined into a
+    single alternation. Patterns that can't be combined, e.g. ones with inline
+    flags or group references, are matched one by one.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.prefixes = PrefixTrie()
+        combinable: List[str] = []
+        self.separate: List[Pattern] = []
+        for pattern in patterns:
+            literal = get_literal_prefix(pattern)
+            if literal is not None:
+                self.prefixes.add(literal)
+                continue
+            compiled = re.compile(pattern)
+            if compiled.flags == _DEFAULT_FLAGS and not _GROUP_REFERENCE.search(
+                pattern
+            ):
+                combinable.append(pattern)
+            else:
+                self.separate.append(compiled)
+
+        self.combined: Optional[Pattern] = None
+        if combinable:
+            try:
+                self.combined = re.compile(
+                    "|".join(f"(?:{pattern})" for pattern in combinable)
+                )
+            except re.error:
+                self.separate.extend(re.compile(pattern) for pattern in combinable)
+
+    def match(self, string: str) -> bool:
+        if self.prefixes.matches_prefix(string):
+            return True
+        if self.combined is not None and self.combined.match(string):
+            return True
+        return any(pattern.match(string) for pattern in self.separate)
+
+
+class AllowDenyMatcher:
+    """The compiled form of an AllowDenyPattern, with a bounded decision cache."""
+
+    def __init__(
+        self,
+        allow: Sequence[str],
+        deny: Sequence[str],
+        cache_size: int = DECISION_CACHE_SIZE,
+    ):
+        self.allow_patterns = list(allow)
+        self.deny_patterns = list(deny)
+        self.allow = CompiledPatterns(allow)
+        self.deny = CompiledPatterns(deny)
+        self.allowed = functools.lru_cache(maxsize=cache_size)(self._allowed)
+
+    def _allowed(self, string: str) -> bool:
+        return not self.deny.match(string) and self.allow.match(string)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_allow_deny(
+    allow: Tuple[str, ...], deny: Tuple[str, ...]
+) -> AllowDenyMatcher:
+    return AllowDenyMatcher(allow, deny)
+
+
+# The matchers of the allow and deny lists of AllowDenyPatterns, by the identity of
+# the lists, which are kept so that their ids aren't reused.
+_matchers_by_list: Dict[
+    Tuple[int, int], Tuple[List[str], List[str], AllowDenyMatcher]
+] = {}
+
+
+def get_allow_deny_matcher(allow: List[str], deny: List[str]) -> AllowDenyMatcher:
+    """
+    Returns the matcher of an allow and a deny list. Building a key out of every
+    pattern would take longer than a cached decision, so the matcher is looked up
+    by the identity of the lists, and compared against them in case they changed.
+    """
+    key = (id(allow), id(deny))
+    entry = _matchers_by_list.get(key)
+    if entry is not None:
+        matcher = entry[2]
+        if matcher.allow_patterns == allow and matcher.deny_patterns == deny:
+            return matcher
+    matcher = compile_allow_deny(tuple(allow), tuple(deny))
+    if len(_matchers_by_list) >= _MATCHERS_BY_LIST_SIZE:
+        _matchers_by_list.clear()
+    _matchers_by_list[key] = (allow, deny, matcher)
+    return matcher
@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, List, Optional, Tuple
 
 from confluent_kafka import SerializingProducer
 from confluent_kafka.schema_registry import SchemaRegistryClient
@@ -8,6 +8,7 @@ from pydantic import Field
 
 from datahub.configuration.common import ConfigModel
 from datahub.configuration.kafka import KafkaProducerConnectionConfig
+from datahub.emitter import serialization
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 from datahub.metadata.schema_classes import SCHEMA_JSON_STR
 
@@ -21,47 +22,89 @@ class KafkaEmitterConfig(ConfigModel):
     topic: str = DEFAULT_KAFKA_TOPIC
 
 
-class DatahubKafkaEmitter:
-    def __init__(self, config: KafkaEmitterConfig):
-        self.config = config
+def create_producer(connection: KafkaProducerConnectionConfig) -> SerializingProducer:
+    schema_registry_conf = {
+        "url": connection.schema_registry_url,
+        **connection.schema_registry_config,
+    }
+    schema_registry_client = SchemaRegistryClient(schema_registry_conf)
 
-        schema_registry_conf = {
-            "url": self.config.connection.schema_registry_url,
-            **self.config.connection.schema_registry_config,
-        }
-        schema_registry_client = SchemaRegistryClient(schema_registry_conf)
+    def convert_mce_to_dict(mce: MetadataChangeEvent, ctx):
+        if isinstance(mce, dict):
+            # The MCE was already serialized ahead of time.
+            return mce
+        tuple_encoding = serialization.serialize(mce, serialization.AVRO_TUPLES)
+        return tuple_encoding
 
-        def convert_mce_to_dict(mce: MetadataChangeEvent, ctx):
-            tuple_encoding = mce.to_obj(tuples=True)
-            return tuple_encoding
+    avro_serializer = AvroSerializer(
+        schema_str=SCHEMA_JSON_STR,
+        schema_registry_client=schema_registry_client,
+        to_dict=convert_mce_to_dict,
+    )
 
-        avro_serializer = AvroSerializer(
-            schema_str=SCHEMA_JSON_STR,
-            schema_registry_client=schema_registry_client,
-            to_dict=convert_mce_to_dict,
-        )
+    producer_config = {
+        "bootstrap.servers": connection.bootstrap,
+        "key.serializer": StringSerializer("utf_8"),
+        "value.serializer": avro_serializer,
+        **connection.producer_config,
+    }
+
+    return SerializingProducer(producer_config)
 
-        producer_config = {
-            "bootstrap.servers": self.config.connection.bootstrap,
-            "key.serializer": StringSerializer("utf_8"),
-            "value.serializer": avro_serializer,
-            **self.config.connection.producer_config,
-        }
 
-        self.producer = SerializingProducer(producer_config)
+class DatahubKafkaEmitter:
+    def __init__(
+        self,
+        config: KafkaEmitterConfig,
+        producer: Optional[SerializingProducer] = None,
+    ):
+        self.config = config
+        # The producer doesn't depend on the topic, so it can be shared by emitters
+        # that write to different topics.
+        self.producer = (
+            producer if producer is not None else create_producer(config.connection)
+        )
 
     def emit_mce_async(
         self,
         mce: MetadataChangeEvent,
         callback: Callable[[Exception, str], None],
+        serialized_value: Optional[dict] = None,
     ):
         # Call poll to trigger any callbacks on success / failure of previous writes
         self.producer.poll(0)
-        self.producer.produce(
-            topic=self.config.topic,
-            value=mce,
-            on_delivery=callback,
-        )
+        self._produce(mce, callback, serialized_value)
+
+    def emit_mces_async(
+        self,
+        mces: List[
+            Tuple[MetadataChangeEvent, Callable[[Exception, str], None], Optional[dict]]
+        ],
+    ) -> None:
+        """Like emit_mce_async, for the MCE, callback and serialized value of each
+        message, but only polls once for all of them."""
+        self.producer.poll(0)
+        for mce, callback, serialized_value in mces:
+            self._produce(mce, callback, serialized_value)
+
+    def _produce(
+        self,
+        mce: MetadataChangeEvent,
+        callback: Callable[[Exception, str], None],
+        serialized_value: Optional[dict],
+    ) -> None:
+        while True:
+            try:
+                self.producer.produce(
+                    topic=self.config.topic,
+                    value=serialized_value if serialized_value is not None else mce,
+                    on_delivery=callback,
+                )
+                return
+            except BufferError:
+                # The producer's local queue is full. Delivering some of its
+                # messages makes room.
+                self.producer.poll(0.1)
 
     def flush(self) -> None:
         self.producer.flush()
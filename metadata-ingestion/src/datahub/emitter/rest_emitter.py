@@ -1,10 +1,10 @@
-from collections import OrderedDict
-from typing import Any, Dict, Type
+from typing import Dict, Optional, Type, Union
 
 import requests
 from requests.exceptions import HTTPError, RequestException
 
 from datahub.configuration.common import OperationalError
+from datahub.emitter import serialization
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 from datahub.metadata.schema_classes import (  # MLFeatureSnapshotClass,
     ChartSnapshotClass,
@@ -29,31 +29,13 @@ resource_locator: Dict[Type[object], str] = {
 }
 
 
-def _rest_li_ify(obj: Any) -> Any:
-    if isinstance(obj, (dict, OrderedDict)):
-        if len(obj.keys()) == 1:
-            key = list(obj.keys())[0]
-            value = obj[key]
-            if key.find("com.linkedin.pegasus2avro.") >= 0:
-                new_key = key.replace("com.linkedin.pegasus2avro.", "com.linkedin.")
-                return {new_key: _rest_li_ify(value)}
-
-        new_obj: Any = {}
-        for key, value in obj.items():
-            if value is not None:
-                new_obj[key] = _rest_li_ify(value)
-        return new_obj
-    elif isinstance(obj, list):
-        new_obj = [_rest_li_ify(item) for item in obj]
-        return new_obj
-    return obj
-
-
 class DatahubRestEmitter:
     _gms_server: str
 
-    def __init__(self, gms_server: str):
+    def __init__(self, gms_server: str, session: Optional[requests.Session] = None):
         self._gms_server = gms_server
+        # Reuses connections to GMS across requests.
+        self._session = session if session is not None else requests.Session()
 
     def _get_ingest_endpoint(self, mce: MetadataChangeEvent) -> str:
         snapshot_type = type(mce.proposedSnapshot)
@@ -65,16 +47,22 @@ class DatahubRestEmitter:
 
         return f"{self._gms_server}/{snapshot_resource}?action=ingest"
 
-    def emit_mce(self, mce: MetadataChangeEvent) -> None:
+    def emit_mce(
+        self,
+        mce: MetadataChangeEvent,
+        serialized_request: Optional[Union[str, bytes]] = None,
+    ) -> None:
         url = self._get_ingest_endpoint(mce)
-        headers = {"X-RestLi-Protocol-Version": "2.0.0"}
+        headers = {
+            "X-RestLi-Protocol-Version": "2.0.0",
+            "Content-Type": "application/json",
+        }
 
-        raw_mce_obj = mce.proposedSnapshot.to_obj()
-        mce_obj = _rest_li_ify(raw_mce_obj)
-        snapshot = {"snapshot": mce_obj}
+        if serialized_request is None:
+            serialized_request = serialization.serialize(mce, serialization.RESTLI_JSON)
 
         try:
-            response = requests.post(url, headers=headers, json=snapshot)
+            response = self._session.post(url, headers=headers, data=serialized_request)
 
             # import curlify
             # print(curlify.to_curl(response.request))
@@ -82,7 +70,11 @@ class DatahubRestEmitter:
 
             response.raise_for_status()
         except HTTPError as e:
-            info = response.json()
+            try:
+                info = response.json()
+            except ValueError:
+                # E.g. an HTML error page from a proxy in front of GMS.
+                info = {"message": response.text}
             raise OperationalError(
                 "Unable to emit metadata to DataHub GMS", info
             ) from e
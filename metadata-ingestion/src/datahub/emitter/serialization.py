@@ -0,0 +1,74 @@
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# The serialized formats of a MetadataChangeEvent that sinks and emitters write out.
+# Pipelines can compute these ahead of time, e.g. in a worker process, and attach
+# them to the record envelope so that the sink doesn't have to. Record envelopes
+# also cache the forms that sinks ask for, see RecordEnvelope.get_serialized().
+
+# The avro-JSON object, which the JSON and rest.li forms are derived from.
+AVRO_JSON = "avro-json"
+# Pretty-printed avro-JSON, as written by the file sink.
+JSON = "json"
+# The rest.li JSON request body for the GMS ingest action, encoded as UTF-8.
+RESTLI_JSON = "restli-json"
+# The avro-JSON object with unions encoded as tuples, as expected by Kafka's AvroSerializer.
+AVRO_TUPLES = "avro-tuples"
+
+
+def _rest_li_ify(obj: Any) -> Any:
+    if isinstance(obj, (dict, OrderedDict)):
+        if len(obj.keys()) == 1:
+            key = list(obj.keys())[0]
+            value = obj[key]
+            if key.find("com.linkedin.pegasus2avro.") >= 0:
+                new_key = key.replace("com.linkedin.pegasus2avro.", "com.linkedin.")
+                return {new_key: _rest_li_ify(value)}
+
+        new_obj: Any = {}
+        for key, value in obj.items():
+            if value is not None:
+                new_obj[key] = _rest_li_ify(value)
+        return new_obj
+    elif isinstance(obj, list):
+        new_obj = [_rest_li_ify(item) for item in obj]
+        return new_obj
+    return obj
+
+
+def _to_json(mce: Any, get: Callable[[str], Any]) -> str:
+    return json.dumps(get(AVRO_JSON), indent=4)
+
+
+def _to_restli_json(mce: Any, get: Callable[[str], Any]) -> bytes:
+    # The snapshot is a union, which avro-JSON wraps in an object keyed by its type.
+    (raw_mce_obj,) = get(AVRO_JSON)["proposedSnapshot"].values()
+    mce_obj = _rest_li_ify(raw_mce_obj)
+    return json.dumps({"snapshot": mce_obj}).encode("utf-8")
+
+
+# Each serializer is passed a function that returns the other forms of the MCE.
+serializers: Dict[str, Callable[[Any, Callable[[str], Any]], Any]] = {
+    AVRO_JSON: lambda mce, get: mce.to_obj(),
+    JSON: _to_json,
+    RESTLI_JSON: _to_restli_json,
+    AVRO_TUPLES: lambda mce, get: mce.to_obj(tuples=True),
+}
+
+
+def serialize(
+    mce: Any, serialized_format: str, cache: Optional[Dict[str, Any]] = None
+) -> Any:
+    """Serializes the MCE. If a cache is given, forms that are already in it are
+    reused, and the forms that are computed are added to it. The cached forms must
+    not be modified."""
+    if cache is None:
+        cache = {}
+
+    def get(other_format: str) -> Any:
+        if other_format not in cache:
+            cache[other_format] = serializers[other_format](mce, get)
+        return cache[other_format]
+
+    return get(serialized_format)
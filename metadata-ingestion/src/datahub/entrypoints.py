@@ -2,12 +2,14 @@ import logging
 import os
 import pathlib
 import sys
+from typing import Optional, Tuple
 
 import click
 from pydantic import ValidationError
 
 from datahub.check.check_cli import check
 from datahub.configuration.config_loader import load_config_file
+from datahub.ingestion.run import recipes
 from datahub.ingestion.run.pipeline import Pipeline
 from datahub.ingestion.sink.sink_registry import sink_registry
 from datahub.ingestion.source.source_registry import source_registry
@@ -44,15 +46,79 @@ def datahub(debug: bool) -> None:
 @click.option(
     "-c",
     "--config",
-    type=click.Path(exists=True, dir_okay=False),
-    help="Config file in .toml or .yaml format",
+    type=click.Path(exists=True),
+    multiple=True,
+    help="Config file in .toml or .yaml format, or a directory of them. "
+    "Can be given more than once to run several recipes concurrently",
     required=True,
 )
-def ingest(config: str) -> None:
+@click.option(
+    "--resume",
+    "resume_run_id",
+    type=str,
+    default=None,
+    help="Resume an earlier run with checkpointing enabled, skipping completed work units",
+)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="How many recipes to run at the same time, when given several",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    default=False,
+    help="Keep running, and run the recipes again every --interval seconds",
+)
+@click.option(
+    "--interval",
+    "interval_seconds",
+    type=click.FloatRange(min=0),
+    default=3600,
+    show_default=True,
+    help="Seconds between the starts of two runs in --daemon mode",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cpu", "memory"]),
+    default=None,
+    help="Profile the run, with cProfile for each stage or with tracemalloc",
+)
+def ingest(
+    config: Tuple[str, ...],
+    resume_run_id: Optional[str],
+    max_concurrency: int,
+    daemon: bool,
+    interval_seconds: float,
+    profile: Optional[str],
+) -> None:
     """Main command for ingesting metadata into DataHub"""
 
-    config_file = pathlib.Path(config)
-    pipeline_config = load_config_file(config_file)
+    config_files = recipes.find_recipes(config)
+    if not config_files:
+        click.echo("No recipes found", err=True)
+        sys.exit(1)
+    if resume_run_id is not None and (daemon or len(config_files) > 1):
+        click.echo("--resume only works with a single recipe run once", err=True)
+        sys.exit(1)
+    if profile is not None and (daemon or len(config_files) > 1):
+        # Pipelines running side by side would show up in each other's profiles.
+        click.echo("--profile only works with a single recipe run once", err=True)
+        sys.exit(1)
+    if daemon:
+        sys.exit(recipes.run_daemon(config_files, interval_seconds, max_concurrency))
+    if len(config) > 1 or pathlib.Path(config[0]).is_dir():
+        results = recipes.run_recipes(config_files, max_concurrency)
+        sys.exit(recipes.pretty_print_summary(results))
+
+    pipeline_config = load_config_file(config_files[0])
+    if resume_run_id is not None:
+        pipeline_config["run_id"] = resume_run_id
+        pipeline_config.setdefault("checkpointing", {})["enabled"] = True
+    if profile is not None:
+        pipeline_config.setdefault("profiling", {})["mode"] = profile
 
     try:
         logger.info(f"Using config: {pipeline_config}")
@@ -61,6 +127,8 @@ def ingest(config: str) -> None:
         click.echo(e, err=True)
         sys.exit(1)
 
+    if pipeline.checkpoint is not None:
+        click.echo(f"Run id: {pipeline.config.run_id} (checkpointing enabled)")
     pipeline.run()
     ret = pipeline.pretty_print_summary()
     sys.exit(ret)
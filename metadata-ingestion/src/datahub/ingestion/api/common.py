@@ -1,30 +1,183 @@
+import asyncio
+import threading
 from abc import ABCMeta, abstractmethod
-from dataclasses import dataclass
-from typing import Generic, TypeVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from datahub.emitter import serialization
 
 T = TypeVar("T")
 
+_thread_event_loops = threading.local()
+
+
+def run_until_complete(awaitable: Awaitable[T]) -> T:
+    """Runs a coroutine from synchronous code.
+
+    Each thread reuses its own event loop, so that resources which are bound to
+    a loop, such as connection pools, survive across calls.
+    """
+    loop = getattr(_thread_event_loops, "loop", None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _thread_event_loops.loop = loop
+    return loop.run_until_complete(awaitable)
+
 
-@dataclass
 class RecordEnvelope(Generic[T]):
-    record: T
-    metadata: dict
+    """
+    A record on its way to the sink, along with its metadata.
+
+    Pipelines can hold millions of these in their queues, so they use __slots__,
+    and the id of the work unit a record came from is kept in its own attribute.
+    The metadata and serialized dicts are only created once they are used.
+    """
+
+    __slots__ = ("record", "workunit_id", "_metadata", "_serialized")
+
+    def __init__(
+        self,
+        record: T,
+        metadata: Optional[dict] = None,
+        serialized: Optional[Dict[str, Any]] = None,
+        workunit_id: Optional[str] = None,
+    ):
+        self.record = record
+        self.workunit_id = workunit_id
+        self._metadata: Optional[dict] = None
+        if metadata:
+            self.metadata = metadata
+        # Pre-serialized forms of the record, keyed by format. See
+        # datahub.emitter.serialization.
+        self._serialized = serialized or None
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = (
+                {} if self.workunit_id is None else {"workunit_id": self.workunit_id}
+            )
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: dict) -> None:
+        self._metadata = metadata
+        if "workunit_id" in metadata:
+            self.workunit_id = metadata["workunit_id"]
+
+    @property
+    def serialized(self) -> Dict[str, Any]:
+        if self._serialized is None:
+            self._serialized = {}
+        return self._serialized
+
+    @serialized.setter
+    def serialized(self, serialized: Dict[str, Any]) -> None:
+        self._serialized = serialized
+
+    @serialized.deleter
+    def serialized(self) -> None:
+        self._serialized = None
+
+    def get_serialized(self, serialized_format: str) -> Any:
+        """Returns the record in one of the formats in datahub.emitter.serialization.
+        Each form is computed once, along with the forms it is derived from, and
+        cached, so that sinks which write the same record, e.g. when fanning out,
+        share them. The returned form must not be modified."""
+        serialized = self.serialized
+        if serialized_format in serialized:
+            return serialized[serialized_format]
+        return serialization.serialize(self.record, serialized_format, serialized)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RecordEnvelope):
+            return NotImplemented
+        return (
+            self.record == other.record
+            and self.metadata == other.metadata
+            and self.serialized == other.serialized
+        )
+
+    def __repr__(self) -> str:
+        # The serialized forms are a cache, and are left out.
+        return (
+            f"{type(self).__name__}(record={self.record!r}, "
+            f"metadata={self.metadata!r})"
+        )
 
 
 @dataclass
 class _WorkUnitId(metaclass=ABCMeta):
+    __slots__ = ("id",)
     id: str
 
 
 # For information on why the WorkUnit class is structured this way
 # and is separating the dataclass portion from the abstract methods, see
 # https://github.com/python/mypy/issues/5374#issuecomment-568335302.
+# Work units use __slots__, like record envelopes. Subclasses should declare
+# theirs too, or they get a __dict__ after all.
 class WorkUnit(_WorkUnitId, metaclass=ABCMeta):
+    __slots__ = ()
+
     @abstractmethod
     def get_metadata(self) -> dict:
         pass
 
 
+class SharedResources:
+    """Holds resources, such as HTTP sessions and Kafka producers, which pipelines
+    running in the same process share. Each resource is created on first use."""
+
+    def __init__(self) -> None:
+        self._resources: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        with self._lock:
+            if key not in self._resources:
+                self._resources[key] = factory()
+            return self._resources[key]
+
+    def close(self) -> None:
+        """Closes the resources that can be closed, such as HTTP sessions and
+        SQLAlchemy engines."""
+        with self._lock:
+            resources = list(self._resources.values())
+            self._resources = {}
+        for resource in resources:
+            close = getattr(resource, "close", None) or getattr(
+                resource, "dispose", None
+            )
+            if close is not None:
+                close()
+
+
 @dataclass
 class PipelineContext:
     run_id: str
+    # Work units that an earlier attempt of this run already wrote to the sink.
+    # Sources may skip producing these, e.g. to avoid expensive reflection.
+    completed_workunit_ids: Set[str] = field(default_factory=set)
+    shared_resources: Optional[SharedResources] = None
+
+
+def get_shared_resource(
+    ctx: PipelineContext, key: Hashable, factory: Callable[[], T]
+) -> T:
+    """Returns the resource that the context shares under the given key, creating it
+    if needed. If the context doesn't share resources, a new one is created."""
+    shared_resources = getattr(ctx, "shared_resources", None)
+    if not isinstance(shared_resources, SharedResources):
+        return factory()
+    return shared_resources.get(key, factory)
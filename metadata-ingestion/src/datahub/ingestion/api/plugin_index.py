@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The index of the installed entry points is cached in this file, unless the
+# DATAHUB_PLUGIN_INDEX environment variable points elsewhere.
+DEFAULT_INDEX_PATH = "~/.datahub/plugin_index.json"
+
+_METADATA_SUFFIXES = (".dist-info", ".egg-info", ".egg")
+
+# The entry points of each group, by name, as "module:attribute" import paths.
+EntryPointIndex = Dict[str, Dict[str, str]]
+
+# The index for this process, once it was loaded.
+_index: Optional[EntryPointIndex] = None
+
+
+def _get_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _get_environment_fingerprint() -> str:
+    """
+    Hashes the path and modification times of the metadata of every installed
+    distribution, in the order in which they are found on sys.path.
+
+    The name of a wheel's metadata directory includes its version, and installing,
+    upgrading or removing a distribution changes the directory or its mtime. The
+    entry points of an editable install are rewritten in place, so their file's
+    mtime is included as well.
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(sys.version.encode())
+    for entry in sys.path:
+        try:
+            names = sorted(os.listdir(entry or "."))
+        except OSError:
+            continue
+        for name in names:
+            if not name.endswith(_METADATA_SUFFIXES):
+                continue
+            path = os.path.join(entry, name)
+            entry_points_file = os.path.join(
+                path, "EGG-INFO" if name.endswith(".egg") else "", "entry_points.txt"
+            )
+            fingerprint.update(
+                f"{path}|{_get_mtime(path)}|{_get_mtime(entry_points_file)}\n".encode()
+            )
+    return fingerprint.hexdigest()
+
+
+def _get_import_path(entry_point: Any) -> str:
+    # Leaves out any extras, e.g. "module:attribute [extra]".
+    return entry_point.value.split("[", 1)[0].strip()
+
+
+def build_index() -> EntryPointIndex:
+    """Reads the entry points of every installed distribution. Like pkg_resources,
+    only the first distribution with a given name on sys.path is used."""
+    # Only imported when the index is built, since it takes a while.
+    try:
+        from importlib import metadata as importlib_metadata
+    except ImportError:
+        # Before Python 3.8.
+        import importlib_metadata  # type: ignore[no-redef]
+
+    index: EntryPointIndex = {}
+    seen_distributions = set()
+    for distribution in importlib_metadata.distributions():
+        name = distribution.metadata["Name"]
+        if name is None:
+            continue
+        normalized_name = name.lower().replace("_", "-")
+        if normalized_name in seen_distributions:
+            continue
+        seen_distributions.add(normalized_name)
+        for entry_point in distribution.entry_points:
+            group = index.setdefault(entry_point.group, {})
+            group.setdefault(entry_point.name, _get_import_path(entry_point))
+    return index
+
+
+def _get_index_path() -> str:
+    return os.path.expanduser(
+        os.environ.get("DATAHUB_PLUGIN_INDEX", DEFAULT_INDEX_PATH)
+    )
+
+
+def _read_index(path: str, fingerprint: str) -> Optional[EntryPointIndex]:
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("entry_points")
+
+
+def _write_index(path: str, fingerprint: str, index: EntryPointIndex) -> None:
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Replace the file at once, since several processes may start together.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"fingerprint": fingerprint, "entry_points": index}, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.debug(f"failed to cache the plugin index in {path}: {e}")
+
+
+def load_index() -> EntryPointIndex:
+    """Returns the index of the installed entry points, from the cache file if the
+    installed distributions haven't changed since it was written."""
+    global _index
+    if _index is None:
+        path = _get_index_path()
+        fingerprint = _get_environment_fingerprint()
+        index = _read_index(path, fingerprint)
+        if index is None:
+            index = build_index()
+            _write_index(path, fingerprint, index)
+        _index = index
+    return _index
+
+
+def get_entry_points(group: str) -> List[Tuple[str, str]]:
+    """The name and "module:attribute" import path of each entry point in the
+    group."""
+    return sorted(load_index().get(group, {}).items())
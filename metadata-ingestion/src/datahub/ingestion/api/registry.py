@@ -1,18 +1,105 @@
+import ast
 import importlib
+import importlib.util
 import inspect
-from typing import Dict, Generic, Type, TypeVar, Union
+from typing import Dict, Generic, List, Optional, Set, Type, TypeVar, Union
 
-import pkg_resources
 import typing_inspect
 
 from datahub.configuration.common import ConfigurationError
+from datahub.ingestion.api import plugin_index
 
 T = TypeVar("T")
 
+# The generated metadata classes are large, and only import base requirements.
+_NOT_PROBED = ("datahub.metadata",)
+# The module-level imports of each module that was probed, by module name.
+_module_imports: Dict[str, List[str]] = {}
+
+
+def _get_source_file(module_name: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin
+
+
+def _get_module_level_imports(module_name: str, source_file: str) -> List[str]:
+    """The absolute names of the modules imported at the top level of a module.
+    Imports in functions or in try blocks are left out, since they are either
+    deferred or optional."""
+    with open(source_file, "rb") as f:
+        tree = ast.parse(f.read(), source_file)
+    package = module_name.rsplit(".", 1)[0]
+    if source_file.endswith("__init__.py"):
+        package = module_name
+
+    imported: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imported.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0:
+                assert node.module is not None
+                imported.append(node.module)
+            else:
+                parent = package.rsplit(".", node.level - 1)[0]
+                imported.append(f"{parent}.{node.module}" if node.module else parent)
+    return imported
+
+
+def find_missing_modules(module_name: str) -> List[str]:
+    """
+    Finds the top-level modules that importing the given module would need, but
+    which aren't installed, without importing anything outside of the module's
+    own package.
+
+    The imports of the module's package are followed recursively, while other
+    packages are only looked up. This is a cheap approximation: a module that is
+    installed may still fail to import, e.g. due to a version conflict.
+    """
+    own_package = module_name.split(".", 1)[0]
+    missing: List[str] = []
+    seen: Set[str] = set()
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+
+        top_level = name.split(".", 1)[0]
+        if top_level != own_package:
+            if importlib.util.find_spec(top_level) is None:
+                missing.append(top_level)
+            continue
+
+        if name.startswith(_NOT_PROBED):
+            continue
+        if name not in _module_imports:
+            # Modules without Python source, e.g. extension modules, are skipped.
+            source_file = _get_source_file(name)
+            _module_imports[name] = (
+                _get_module_level_imports(name, source_file)
+                if source_file is not None
+                else []
+            )
+        pending.extend(_module_imports[name])
+    return sorted(set(missing))
+
 
 class Registry(Generic[T]):
     def __init__(self):
-        self._mapping: Dict[str, Union[Type[T], Exception]] = {}
+        # Plugins registered from entry points are only imported once they are
+        # used. Until then, their import path is kept as "module:attribute".
+        self._mapping: Dict[str, Union[str, Type[T], Exception]] = {}
+        # Classes looked up by their dotted import path.
+        self._dotted_path_cache: Dict[str, Type[T]] = {}
+        # Whether each plugin that wasn't imported yet looks importable.
+        self._probes: Dict[str, bool] = {}
 
     def _get_registered_type(self) -> Type[T]:
         cls = typing_inspect.get_generic_type(self)
@@ -28,7 +115,7 @@ class Registry(Generic[T]):
         if not issubclass(cls, super_cls):
             raise ValueError(f"must be derived from {super_cls}; got {cls}")
 
-    def _register(self, key: str, tp: Union[Type[T], Exception]) -> None:
+    def _register(self, key: str, tp: Union[str, Type[T], Exception]) -> None:
         if key in self._mapping:
             raise KeyError(f"key already in use - {key}")
         if key.find(".") >= 0:
@@ -42,38 +129,60 @@ class Registry(Generic[T]):
     def register_disabled(self, key: str, reason: Exception) -> None:
         self._register(key, reason)
 
+    def register_lazy(self, key: str, import_path: str) -> None:
+        """Registers the class at the given "module:attribute" path, which is only
+        imported once it is looked up."""
+        self._register(key, import_path)
+
     def is_enabled(self, key: str) -> bool:
+        """Whether the plugin can be used. For plugins that weren't imported yet,
+        this is a cheap probe for their dependencies, which doesn't import them."""
         tp = self._mapping[key]
+        if isinstance(tp, str):
+            if key not in self._probes:
+                module_name = tp.split(":", 1)[0]
+                self._probes[key] = not find_missing_modules(module_name)
+            return self._probes[key]
         return not isinstance(tp, Exception)
 
     def load(self, entry_point_key: str) -> None:
-        for entry_point in pkg_resources.iter_entry_points(entry_point_key):
-            name = entry_point.name
-
-            try:
-                plugin_class = entry_point.load()
-            except ImportError as e:
-                self.register_disabled(name, e)
-                continue
-
-            self.register(name, plugin_class)
+        for name, import_path in plugin_index.get_entry_points(entry_point_key):
+            self.register_lazy(name, import_path)
 
     @property
     def mapping(self):
         return self._mapping
 
+    def _import(self, import_path: str) -> Union[Type[T], Exception]:
+        module_name, attrs = import_path.split(":", 1)
+        try:
+            tp = importlib.import_module(module_name)
+        except ImportError as e:
+            return e
+        for attr in attrs.split("."):
+            tp = getattr(tp, attr)
+        plugin_class: Type[T] = tp  # type: ignore[assignment]
+        self._check_cls(plugin_class)
+        return plugin_class
+
     def get(self, key: str) -> Type[T]:
         if key.find(".") >= 0:
             # If the key contains a dot, we treat it as a import path and attempt
             # to load it dynamically.
-            module_name, class_name = key.rsplit(".", 1)
-            MyClass = getattr(importlib.import_module(module_name), class_name)
-            self._check_cls(MyClass)
-            return MyClass
+            if key not in self._dotted_path_cache:
+                module_name, class_name = key.rsplit(".", 1)
+                MyClass = getattr(importlib.import_module(module_name), class_name)
+                self._check_cls(MyClass)
+                self._dotted_path_cache[key] = MyClass
+            return self._dotted_path_cache[key]
 
         if key not in self._mapping:
             raise KeyError(f"Did not find a registered class for {key}")
         tp = self._mapping[key]
+        if isinstance(tp, str):
+            tp = self._import(tp)
+            self._mapping[key] = tp
+            self._probes.pop(key, None)
         if isinstance(tp, Exception):
             raise ConfigurationError(
                 f'{key} is disabled; try running: pip install ".[{key}]"'
@@ -1,15 +1,193 @@
 import json
 import pprint
+import random
+import threading
 from dataclasses import dataclass
+from typing import IO, Any, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_spill_lock = threading.Lock()
+_spill_file: Optional[IO[str]] = None
+# Spilling is process-wide, so it stays enabled until every pipeline that enabled
+# it has disabled it again.
+_spill_users = 0
+
+
+def enable_spill(path: str) -> None:
+    """Also writes every item added to the lossy structures of reports created from
+    now on to the given file, as JSON lines, so that nothing is lost."""
+    global _spill_file, _spill_users
+    with _spill_lock:
+        if _spill_file is None or _spill_file.name != path:
+            if _spill_file is not None:
+                _spill_file.close()
+            _spill_file = open(path, "a")
+        _spill_users += 1
+
+
+def disable_spill() -> None:
+    global _spill_file, _spill_users
+    with _spill_lock:
+        _spill_users = max(_spill_users - 1, 0)
+        if _spill_file is not None and _spill_users == 0:
+            _spill_file.close()
+            _spill_file = None
+
+
+def _spill(label: Optional[str], item: Any) -> None:
+    if label is None:
+        return
+    line = json.dumps({"field": label, "item": item}, default=str)
+    with _spill_lock:
+        if _spill_file is not None:
+            _spill_file.write(line + "\n")
+
+
+class LossyList(List[T]):
+    """
+    A list that keeps a uniform random sample of at most max_elements of the items
+    appended to it, along with the total number of items.
+    """
+
+    def __init__(self, max_elements: int = 100):
+        super().__init__()
+        self.max_elements = max_elements
+        self.total = 0
+        # Set on reports created while spilling is enabled.
+        self.spill_label: Optional[str] = None
+
+    def append(self, item: T) -> None:
+        _spill(self.spill_label, item)
+        self._add_to_sample(item)
+
+    def _add_to_sample(self, item: T) -> None:
+        self.total += 1
+        if len(self) < self.max_elements:
+            super().append(item)
+        else:
+            # Reservoir sampling.
+            index = random.randrange(self.total)
+            if index < self.max_elements:
+                self[index] = item
+
+    def merge(self, other: List[T]) -> None:
+        """Folds the items of another list into the sample. These are not spilled again."""
+        for item in other:
+            self._add_to_sample(item)
+        if isinstance(other, LossyList):
+            # Account for the items that didn't make it into the other sample.
+            self.total += other.total - len(other)
+
+    def as_obj(self) -> List[Any]:
+        if self.total > len(self):
+            return [*self, f"... sampled {len(self)} of {self.total}"]
+        return list(self)
+
+
+class LossyDict(Dict[str, LossyList[T]]):
+    """
+    A dict of lossy lists that holds at most max_keys keys, counting the items for
+    any further keys without keeping them.
+    """
+
+    def __init__(self, max_keys: int = 100, max_elements_per_key: int = 10):
+        super().__init__()
+        self.max_keys = max_keys
+        self.max_elements_per_key = max_elements_per_key
+        self.dropped_keys = 0
+        self.dropped_items = 0
+        self.spill_label: Optional[str] = None
+
+    def add(self, key: str, item: T) -> None:
+        _spill(self.spill_label, {"key": key, "value": item})
+        self._add_to_sample(key, [item])
+
+    def _add_to_sample(self, key: str, items: List[T]) -> None:
+        if key not in self:
+            if len(self) >= self.max_keys:
+                self.dropped_keys += 1
+                self.dropped_items += len(items)
+                return
+            self[key] = LossyList(self.max_elements_per_key)
+        self[key].merge(items)
+
+    def merge(self, other: Dict[str, List[T]]) -> None:
+        for key, items in other.items():
+            self._add_to_sample(key, items)
+        if isinstance(other, LossyDict):
+            self.dropped_keys += other.dropped_keys
+            self.dropped_items += other.dropped_items
+
+    def as_obj(self) -> Dict[str, Any]:
+        obj: Dict[str, Any] = {key: items.as_obj() for key, items in self.items()}
+        if self.dropped_keys:
+            obj["..."] = f"{self.dropped_items} more in {self.dropped_keys} keys"
+        return obj
+
+
+def count_category(
+    counts: Dict[str, int], category: str, max_categories: int = 100
+) -> None:
+    """Counts an occurrence of a category, lumping any categories beyond
+    max_categories together as "other"."""
+    if category not in counts and len(counts) >= max_categories:
+        category = "other"
+    counts[category] = counts.get(category, 0) + 1
+
+
+def get_category(message: str) -> str:
+    """The category of a message is its text up to the first colon, which usually
+    leaves out the details of the specific error."""
+    return message.split(":", 1)[0][:100]
 
 
 @dataclass
 class Report:
+    def __post_init__(self) -> None:
+        if _spill_file is None:
+            return
+        for key, value in self.__dict__.items():
+            if isinstance(value, (LossyList, LossyDict)):
+                value.spill_label = f"{type(self).__name__}.{key}"
+
     def as_obj(self) -> dict:
-        return self.__dict__
+        return {
+            key: value.as_obj() if isinstance(value, (LossyList, LossyDict)) else value
+            for key, value in self.__dict__.items()
+        }
 
     def as_string(self) -> str:
         return pprint.pformat(self.as_obj(), width=150)
 
     def as_json(self) -> str:
         return json.dumps(self.as_obj())
+
+    def merge(self, other: "Report") -> None:
+        """Folds another report of the same type into this one.
+
+        Counters are added up, lists are concatenated and dicts of lists are
+        merged key by key. Lossy lists and dicts are merged into their samples.
+        """
+        for key, value in other.__dict__.items():
+            current = getattr(self, key, None)
+            if isinstance(current, (LossyList, LossyDict)):
+                current.merge(value)
+            elif isinstance(value, list):
+                setattr(self, key, [*(current or []), *value])
+            elif isinstance(value, dict):
+                merged = dict(current or {})
+                for item_key, item_value in value.items():
+                    if isinstance(item_value, list):
+                        merged[item_key] = [*merged.get(item_key, []), *item_value]
+                    elif isinstance(item_value, int) and isinstance(
+                        merged.get(item_key), int
+                    ):
+                        merged[item_key] += item_value
+                    else:
+                        merged[item_key] = item_value
+                setattr(self, key, merged)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                setattr(self, key, (current or 0) + value)
+            else:
+                setattr(self, key, value)
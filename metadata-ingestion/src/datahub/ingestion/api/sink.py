@@ -1,26 +1,68 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, List
+from typing import Any, ClassVar, Dict, List
 
 from datahub.ingestion.api.closeable import Closeable
-from datahub.ingestion.api.common import PipelineContext, RecordEnvelope, WorkUnit
-from datahub.ingestion.api.report import Report
+from datahub.ingestion.api.common import (
+    PipelineContext,
+    RecordEnvelope,
+    WorkUnit,
+    run_until_complete,
+)
+from datahub.ingestion.api.report import (
+    LossyList,
+    Report,
+    count_category,
+    get_category,
+)
+
+
+def _compact(info: Any) -> Any:
+    # Exceptions hold on to their traceback, and with it to every frame's locals.
+    if isinstance(info, BaseException):
+        return f"{type(info).__name__}: {info}"
+    elif isinstance(info, dict):
+        return {key: _compact(value) for key, value in info.items()}
+    return info
+
+
+def _get_category(info: Any) -> str:
+    if isinstance(info, BaseException):
+        return type(info).__name__
+    elif isinstance(info, dict):
+        for value in info.values():
+            if isinstance(value, BaseException):
+                return type(value).__name__
+        if "error" in info:
+            return get_category(str(info["error"]))
+    return get_category(str(info))
 
 
 @dataclass
 class SinkReport(Report):
     records_written = 0
-    warnings: List[Any] = field(default_factory=list)
-    failures: List[Any] = field(default_factory=list)
+    # Only set by sinks that adapt the number of writes they keep in flight.
+    current_concurrency = 0
+    concurrency_decreases = 0
+    warnings: LossyList[Any] = field(default_factory=LossyList)
+    failures: LossyList[Any] = field(default_factory=LossyList)
+    warnings_by_category: Dict[str, int] = field(default_factory=dict)
+    failures_by_category: Dict[str, int] = field(default_factory=dict)
 
     def report_record_written(self, record_envelope: RecordEnvelope):
         self.records_written += 1
 
+    def report_concurrency(self, current_concurrency: int, decreases: int) -> None:
+        self.current_concurrency = current_concurrency
+        self.concurrency_decreases = decreases
+
     def report_warning(self, info: Any) -> None:
-        self.warnings.append(info)
+        self.warnings.append(_compact(info))
+        count_category(self.warnings_by_category, _get_category(info))
 
     def report_failure(self, info: Any) -> None:
-        self.failures.append(info)
+        self.failures.append(_compact(info))
+        count_category(self.failures_by_category, _get_category(info))
 
 
 class WriteCallback(metaclass=ABCMeta):
@@ -50,15 +92,17 @@ class NoopWriteCallback(WriteCallback):
 
 # See https://github.com/python/mypy/issues/5374 for why we suppress this mypy error.
 @dataclass  # type: ignore[misc]
-class Sink(Closeable, metaclass=ABCMeta):
-    """All Sinks must inherit this base class."""
+class BaseSink(Closeable, metaclass=ABCMeta):
+    """What the pipeline writes records to: either a sink, or one of the pipeline's
+    own wrappers around its sinks. Unlike sinks, the wrappers are not in the sink
+    registry, so they can't be created from a config."""
 
     ctx: PipelineContext
 
-    @classmethod
-    @abstractmethod
-    def create(cls, config_dict: dict, ctx: PipelineContext) -> "Sink":
-        pass
+    # The serialized formats (see datahub.emitter.serialization) that this sink writes.
+    # The pipeline may compute these ahead of time and attach them to each record
+    # envelope, in which case the sink should use them instead of serializing again.
+    serialized_formats: ClassVar[List[str]] = []
 
     @abstractmethod
     def handle_work_unit_start(self, workunit: WorkUnit) -> None:
@@ -68,6 +112,18 @@ class Sink(Closeable, metaclass=ABCMeta):
     def handle_work_unit_end(self, workunit: WorkUnit) -> None:
         pass
 
+    def handle_batch_start(self) -> None:
+        """Called before the first record of a batch is written."""
+        pass
+
+    def handle_batch_end(self) -> None:
+        """Called after the last record of a batch was written.
+
+        This is the place to flush any buffered writes. The pipeline decides on
+        the batch edges, based on its batch_size and batch_timeout_ms settings.
+        """
+        pass
+
     @abstractmethod
     def write_record_async(
         self, record_envelope: RecordEnvelope, callback: WriteCallback
@@ -75,6 +131,19 @@ class Sink(Closeable, metaclass=ABCMeta):
         # must call callback when done.
         pass
 
+    def write_records_batch(
+        self, record_envelopes: List[RecordEnvelope], callback: WriteCallback
+    ) -> None:
+        """Writes several records at once, calling the callback for each of them.
+
+        The pipeline hands records to the sink in batches, which never span work
+        units or the batch edges. Sinks that can write several records at once,
+        e.g. with a single request, should override this. By default, the records
+        are written one at a time.
+        """
+        for record_envelope in record_envelopes:
+            self.write_record_async(record_envelope, callback)
+
     @abstractmethod
     def get_report(self) -> SinkReport:
         pass
@@ -82,3 +151,33 @@ class Sink(Closeable, metaclass=ABCMeta):
     @abstractmethod
     def close(self) -> None:
         pass
+
+
+class Sink(BaseSink, metaclass=ABCMeta):
+    """All Sinks must inherit this base class."""
+
+    @classmethod
+    @abstractmethod
+    def create(cls, config_dict: dict, ctx: PipelineContext) -> "Sink":
+        pass
+
+
+class AsyncSink(Sink, metaclass=ABCMeta):
+    """Base class for sinks which write records using asyncio.
+
+    The pipeline's "async" execution mode awaits write_record() directly, and keeps
+    many writes in flight at once. The other modes use write_record_async(), which
+    drives it from synchronous code.
+    """
+
+    @abstractmethod
+    async def write_record(
+        self, record_envelope: RecordEnvelope, callback: WriteCallback
+    ) -> None:
+        # must call callback when done.
+        pass
+
+    def write_record_async(
+        self, record_envelope: RecordEnvelope, callback: WriteCallback
+    ) -> None:
+        run_until_complete(self.write_record(record_envelope, callback))
@@ -1,33 +1,49 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, Generic, Iterable, List, TypeVar
+from typing import (
+    AsyncIterable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    TypeVar,
+)
 
 from .closeable import Closeable
-from .common import PipelineContext, RecordEnvelope, WorkUnit
-from .report import Report
+from .common import PipelineContext, RecordEnvelope, WorkUnit, run_until_complete
+from .report import LossyDict, LossyList, Report, count_category, get_category
 
 
 @dataclass
 class SourceReport(Report):
     workunits_produced = 0
-    workunit_ids: List[str] = field(default_factory=list)
+    # A sample of the work unit ids. Reports can spill the full lists to a file.
+    workunit_ids: LossyList[str] = field(default_factory=LossyList)
+    # Work units that were not produced again, since a resumed run had completed them.
+    workunits_skipped = 0
+    skipped_workunit_ids: LossyList[str] = field(default_factory=LossyList)
 
-    warnings: Dict[str, List[str]] = field(default_factory=dict)
-    failures: Dict[str, List[str]] = field(default_factory=dict)
+    warnings: LossyDict[str] = field(default_factory=LossyDict)
+    failures: LossyDict[str] = field(default_factory=LossyDict)
+    warnings_by_category: Dict[str, int] = field(default_factory=dict)
+    failures_by_category: Dict[str, int] = field(default_factory=dict)
 
     def report_workunit(self, wu: WorkUnit) -> None:
         self.workunits_produced += 1
         self.workunit_ids.append(wu.id)
 
+    def report_workunit_skipped(self, workunit_id: str) -> None:
+        self.workunits_skipped += 1
+        self.skipped_workunit_ids.append(workunit_id)
+
     def report_warning(self, key: str, reason: str) -> None:
-        if key not in self.warnings:
-            self.warnings[key] = []
-        self.warnings[key].append(reason)
+        self.warnings.add(key, reason)
+        count_category(self.warnings_by_category, get_category(reason))
 
     def report_failure(self, key: str, reason: str) -> None:
-        if key not in self.failures:
-            self.failures[key] = []
-        self.failures[key].append(reason)
+        self.failures.add(key, reason)
+        count_category(self.failures_by_category, get_category(reason))
 
 
 WorkUnitType = TypeVar("WorkUnitType", bound=WorkUnit)
@@ -43,6 +59,19 @@ class Extractor(Generic[WorkUnitType], Closeable, metaclass=ABCMeta):
         pass
 
 
+@dataclass
+class SourcePartition:
+    """An independent slice of a source's crawl, e.g. a single database schema.
+
+    Partitions may be crawled concurrently, so each one reports into its own
+    report. The pipeline merges these into the source's report afterwards.
+    """
+
+    id: str
+    report: SourceReport
+    get_workunits: Callable[[], Iterable[WorkUnit]]
+
+
 # See https://github.com/python/mypy/issues/5374 for why we suppress this mypy error.
 @dataclass  # type: ignore[misc]
 class Source(Closeable, metaclass=ABCMeta):
@@ -57,6 +86,42 @@ class Source(Closeable, metaclass=ABCMeta):
     def get_workunits(self) -> Iterable[WorkUnit]:
         pass
 
+    def get_partitions(self) -> Optional[Iterable[SourcePartition]]:
+        """Splits the crawl into independent partitions.
+
+        Between them, the partitions must produce the same work units as
+        get_workunits(). Sources that cannot be split return None.
+        """
+        return None
+
+    def get_workunits_estimate(self) -> Optional[int]:
+        """Estimates the total number of work units, for progress reporting.
+
+        This may be called from another thread while the crawl is running. Sources
+        return None while they cannot tell.
+        """
+        return None
+
     @abstractmethod
     def get_report(self) -> SourceReport:
         pass
+
+
+class AsyncSource(Source, metaclass=ABCMeta):
+    """Base class for sources which produce their work units using asyncio.
+
+    The pipeline's "async" execution mode consumes get_workunits_async() directly.
+    The other modes use get_workunits(), which drives it from synchronous code.
+    """
+
+    @abstractmethod
+    def get_workunits_async(self) -> AsyncIterable[WorkUnit]:
+        pass
+
+    def get_workunits(self) -> Iterable[WorkUnit]:
+        workunits = self.get_workunits_async().__aiter__()
+        while True:
+            try:
+                yield run_until_complete(workunits.__anext__())
+            except StopAsyncIteration:
+                return
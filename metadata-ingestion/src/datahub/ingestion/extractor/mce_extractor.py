@@ -19,12 +19,7 @@ class WorkUnitMCEExtractor(Extractor):
             raise AttributeError("every mce must have at least one aspect")
         if not workunit.mce.validate():
             raise ValueError(f"source produced an invalid MCE: {workunit.mce}")
-        yield RecordEnvelope(
-            workunit.mce,
-            {
-                "workunit_id": workunit.id,
-            },
-        )
+        yield RecordEnvelope(workunit.mce, workunit_id=workunit.id)
 
     def close(self):
         pass
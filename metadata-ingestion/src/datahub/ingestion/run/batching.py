@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.api.sink import BaseSink, WriteCallback
+
+
+class SinkBatcher:
+    """
+    Groups the records written to a sink into batches, and calls the sink's batch
+    hooks at the batch edges.
+
+    A batch ends once it holds max_records records or once it has been open for
+    max_wait_seconds, whichever comes first. The age of a batch is only checked
+    when a record is written, so a stalled source can keep a batch open for longer.
+    If given, on_batch_end is called after the sink has handled the end of a batch.
+    """
+
+    def __init__(
+        self,
+        sink: BaseSink,
+        max_records: int,
+        max_wait_seconds: float,
+        on_batch_end: Optional[Callable[[], None]] = None,
+    ):
+        self.sink = sink
+        self.max_records = max_records
+        self.max_wait_seconds = max_wait_seconds
+        self.on_batch_end = on_batch_end
+
+        self._lock = threading.Lock()
+        self._is_open = False
+        self._records = 0
+        self._started_at = 0.0
+
+    def begin_record(self) -> None:
+        with self._lock:
+            if not self._is_open:
+                self._is_open = True
+                self._records = 0
+                self._started_at = time.perf_counter()
+                self.sink.handle_batch_start()
+
+    def remaining_records(self) -> int:
+        """The number of records that fit into the open batch, or into the next one
+        if none is open."""
+        with self._lock:
+            if not self._is_open:
+                return self.max_records
+            return max(self.max_records - self._records, 1)
+
+    def end_record(self, count: int = 1) -> None:
+        with self._lock:
+            self._records += count
+            if (
+                self._records >= self.max_records
+                or time.perf_counter() - self._started_at >= self.max_wait_seconds
+            ):
+                self._end_batch()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._end_batch()
+
+    def _end_batch(self) -> None:
+        if self._is_open:
+            self._is_open = False
+            self.sink.handle_batch_end()
+            if self.on_batch_end is not None:
+                self.on_batch_end()
+
+
+class RecordCallbacks(WriteCallback):
+    """Calls back each record's own callback, so that records with different
+    callbacks can be written in one batch."""
+
+    def __init__(self) -> None:
+        # Keyed by the id of the record envelope.
+        self._callbacks: Dict[int, WriteCallback] = {}
+
+    def add(self, record_envelope: RecordEnvelope, callback: WriteCallback) -> None:
+        self._callbacks[id(record_envelope)] = callback
+
+    def on_success(self, record_envelope: RecordEnvelope, success_metadata: dict):
+        callback = self._callbacks[id(record_envelope)]
+        callback.on_success(record_envelope, success_metadata)
+
+    def on_failure(
+        self,
+        record_envelope: RecordEnvelope,
+        failure_exception: Exception,
+        failure_metadata: dict,
+    ):
+        callback = self._callbacks[id(record_envelope)]
+        callback.on_failure(record_envelope, failure_exception, failure_metadata)
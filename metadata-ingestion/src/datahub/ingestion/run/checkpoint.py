@@ -0,0 +1,79 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """
+    Keeps track of the work units that a run has written to the sink, in a local
+    SQLite database keyed by run_id.
+
+    Work units are marked as completed once the sink has been handed all of their
+    records, but they are only committed to the database by commit(), which the
+    pipeline calls at the end of each batch, once the sink has flushed it. Work
+    units with records that the sink failed to write are never committed, so they
+    are retried when the run is resumed.
+    """
+
+    def __init__(self, path: str, run_id: str):
+        self.path = os.path.expanduser(path)
+        self.run_id = run_id
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The pipeline commits from whichever thread ends a batch.
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS completed_workunits ("
+            "run_id TEXT NOT NULL, workunit_id TEXT NOT NULL, "
+            "PRIMARY KEY (run_id, workunit_id))"
+        )
+        self._connection.commit()
+
+        self._lock = threading.Lock()
+        self._completed: List[str] = []
+        self._failed: Set[str] = set()
+
+    def get_completed_workunit_ids(self) -> Set[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT workunit_id FROM completed_workunits WHERE run_id = ?",
+                (self.run_id,),
+            )
+            return {workunit_id for (workunit_id,) in rows}
+
+    def mark_completed(self, workunit_id: str) -> None:
+        with self._lock:
+            self._completed.append(workunit_id)
+
+    def mark_failed(self, workunit_id: str) -> None:
+        with self._lock:
+            self._failed.add(workunit_id)
+
+    def commit(self) -> None:
+        with self._lock:
+            completed = [
+                workunit_id
+                for workunit_id in self._completed
+                if workunit_id not in self._failed
+            ]
+            self._completed = []
+            if not completed:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO completed_workunits (run_id, workunit_id) "
+                    "VALUES (?, ?)",
+                    [(self.run_id, workunit_id) for workunit_id in completed],
+                )
+        logger.debug(f"Checkpointed {len(completed)} work units of run {self.run_id}")
+
+    def close(self) -> None:
+        self.commit()
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,271 @@
+import itertools
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope, WorkUnit
+from datahub.ingestion.api.sink import BaseSink, SinkReport, WriteCallback
+from datahub.ingestion.run import pickling
+from datahub.ingestion.run.batching import RecordCallbacks, SinkBatcher
+from datahub.ingestion.run.pipeline_report import PipelineReport
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingSnapshot:
+    """The aspects received for one URN so far, keyed by aspect type. Later aspects
+    of a type replace earlier ones, just like they would in GMS."""
+
+    def __init__(self, record: Any):
+        self.record_class = type(record)
+        self.snapshot_class = type(record.proposedSnapshot)
+        self.aspects: Dict[str, Any] = {}
+
+    def add(self, snapshot: Any) -> None:
+        for aspect in snapshot.aspects:
+            self.aspects[type(aspect).__name__] = aspect
+
+    def merge(self, other: "_PendingSnapshot") -> None:
+        self.aspects.update(other.aspects)
+
+    def to_record(self, urn: str) -> Any:
+        return self.record_class(
+            proposedSnapshot=self.snapshot_class(
+                urn=urn, aspects=list(self.aspects.values())
+            )
+        )
+
+
+class _SpillStore:
+    """Holds pending snapshots in a temporary SQLite database. Their aspects are
+    stored as avro-JSON objects, see datahub.ingestion.run.pickling."""
+
+    def __init__(self, directory: Optional[str]):
+        fd, self.path = tempfile.mkstemp(
+            prefix="datahub-coalescing-", suffix=".db", dir=directory
+        )
+        os.close(fd)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE spilled (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "urn TEXT NOT NULL, pending BLOB NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX spilled_urn ON spilled (urn, seq)")
+        self.is_empty = True
+
+    def add(self, pending: Dict[str, _PendingSnapshot]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO spilled (urn, pending) VALUES (?, ?)",
+                ((urn, pickling.dumps(snapshot)) for urn, snapshot in pending.items()),
+            )
+        self.is_empty = False
+
+    def drain(self) -> Iterator[Tuple[str, _PendingSnapshot]]:
+        """Yields the snapshots of each URN merged in the order they were spilled,
+        and empties the store."""
+        rows = self._connection.execute(
+            "SELECT urn, pending FROM spilled ORDER BY urn, seq"
+        )
+        for urn, group in itertools.groupby(rows, key=lambda row: row[0]):
+            snapshots = [pickling.loads(pending) for _, pending in group]
+            for snapshot in snapshots[1:]:
+                snapshots[0].merge(snapshot)
+            yield urn, snapshots[0]
+        with self._connection:
+            self._connection.execute("DELETE FROM spilled")
+        self.is_empty = True
+
+    def close(self) -> None:
+        self._connection.close()
+        os.remove(self.path)
+
+
+class _CoalescedCallback(WriteCallback):
+    """Reports the outcome of writing a coalesced record to the callbacks of all the
+    records it was merged from."""
+
+    def __init__(self, writes: List[Tuple[RecordEnvelope, WriteCallback]]):
+        self.writes = writes
+
+    def on_success(self, record_envelope: RecordEnvelope, success_metadata: dict):
+        for original, callback in self.writes:
+            callback.on_success(original, success_metadata)
+
+    def on_failure(
+        self,
+        record_envelope: RecordEnvelope,
+        failure_exception: Exception,
+        failure_metadata: dict,
+    ):
+        for original, callback in self.writes:
+            callback.on_failure(original, failure_exception, failure_metadata)
+
+
+class CoalescingSink(BaseSink):
+    """
+    Merges the aspects of all MetadataChangeEvents for the same URN within a window
+    into a single event, before writing it to the wrapped sink. Sources often emit
+    several events per dataset, e.g. one each for its schema, ownership and tags,
+    and this turns them into one write.
+
+    A window ends after window_size records, or at the end of the run if that is 0.
+    If checkpointing is enabled, it also ends with every batch, so that no work unit
+    is checkpointed while its records are still held back. Other kinds of records
+    are passed through as they come.
+
+    Once more than max_records_in_memory records are held back, the pending aspects
+    are spilled to a temporary SQLite database. Only the metadata of the spilled
+    record envelopes is kept in memory, for the write callbacks, which are called
+    once the merged record was written.
+    """
+
+    def __init__(
+        self,
+        ctx: PipelineContext,
+        sink: BaseSink,
+        report: PipelineReport,
+        window_size: int,
+        max_records_in_memory: int,
+        spill_dir: Optional[str],
+        batch_size: int,
+        batch_timeout_seconds: float,
+        flush_on_batch_end: bool,
+    ):
+        super().__init__(ctx)
+        self.sink = sink
+        self.report = report
+        self.window_size = window_size
+        self.max_records_in_memory = max_records_in_memory
+        self.spill_dir = spill_dir
+        self.flush_on_batch_end = flush_on_batch_end
+        # This sink decides on the batch edges of the wrapped sink, since records
+        # only reach it when a window ends.
+        self._batcher = SinkBatcher(sink, batch_size, batch_timeout_seconds)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _PendingSnapshot] = {}
+        self._writes: Dict[str, List[Tuple[RecordEnvelope, WriteCallback]]] = {}
+        self._unspilled: List[RecordEnvelope] = []
+        self._records_in_window = 0
+        self._spill_store: Optional[_SpillStore] = None
+
+    def handle_work_unit_start(self, workunit: WorkUnit) -> None:
+        self.sink.handle_work_unit_start(workunit)
+
+    def handle_work_unit_end(self, workunit: WorkUnit) -> None:
+        self.sink.handle_work_unit_end(workunit)
+
+    def handle_batch_end(self) -> None:
+        with self._lock:
+            if self.flush_on_batch_end:
+                self._flush()
+            else:
+                self._batcher.flush()
+
+    def write_record_async(
+        self, record_envelope: RecordEnvelope, write_callback: WriteCallback
+    ) -> None:
+        record = record_envelope.record
+        snapshot = getattr(record, "proposedSnapshot", None)
+        with self._lock:
+            if snapshot is None or getattr(record, "proposedDelta", None) is not None:
+                self._write(record_envelope, write_callback)
+                return
+
+            urn = snapshot.urn
+            if urn not in self._pending:
+                self._pending[urn] = _PendingSnapshot(record)
+            self._pending[urn].add(snapshot)
+            self._writes.setdefault(urn, []).append((record_envelope, write_callback))
+            self._unspilled.append(record_envelope)
+            self._records_in_window += 1
+
+            if self.window_size and self._records_in_window >= self.window_size:
+                self._flush()
+            elif len(self._unspilled) >= self.max_records_in_memory:
+                self._spill()
+
+    def _write(self, record_envelope: RecordEnvelope, callback: WriteCallback) -> None:
+        self._batcher.begin_record()
+        self.sink.write_record_async(record_envelope, callback)
+        self._batcher.end_record()
+
+    def _spill(self) -> None:
+        if self._spill_store is None:
+            self._spill_store = _SpillStore(self.spill_dir)
+            logger.info(
+                f"Spilling coalesced aspects to {self._spill_store.path}, since more "
+                f"than {self.max_records_in_memory} records are held back"
+            )
+        self._spill_store.add(self._pending)
+        self._pending = {}
+        for record_envelope in self._unspilled:
+            record_envelope.record = None
+            del record_envelope.serialized
+        self._unspilled = []
+
+    def _flush(self) -> None:
+        record_envelopes: List[RecordEnvelope] = []
+        callbacks = RecordCallbacks()
+        if self._spill_store is not None and not self._spill_store.is_empty:
+            for urn, snapshot in self._spill_store.drain():
+                if urn in self._pending:
+                    snapshot.merge(self._pending.pop(urn))
+                self._emit(urn, snapshot, record_envelopes, callbacks)
+                self._write_full_batch(record_envelopes, callbacks)
+        for urn, snapshot in self._pending.items():
+            self._emit(urn, snapshot, record_envelopes, callbacks)
+            self._write_full_batch(record_envelopes, callbacks)
+        self._write_batch(record_envelopes, callbacks)
+        self._pending = {}
+        self._unspilled = []
+        self._records_in_window = 0
+        self._batcher.flush()
+
+    def _emit(
+        self,
+        urn: str,
+        snapshot: _PendingSnapshot,
+        record_envelopes: List[RecordEnvelope],
+        callbacks: RecordCallbacks,
+    ) -> None:
+        writes = self._writes.pop(urn)
+        self.report.report_records_coalesced(len(writes) - 1)
+        last_record_envelope = writes[-1][0]
+        record_envelope = RecordEnvelope(
+            snapshot.to_record(urn), workunit_id=last_record_envelope.workunit_id
+        )
+        record_envelopes.append(record_envelope)
+        callbacks.add(record_envelope, _CoalescedCallback(writes))
+
+    def _write_full_batch(
+        self, record_envelopes: List[RecordEnvelope], callbacks: RecordCallbacks
+    ) -> None:
+        if len(record_envelopes) >= self._batcher.remaining_records():
+            self._write_batch(record_envelopes, callbacks)
+
+    def _write_batch(
+        self, record_envelopes: List[RecordEnvelope], callbacks: RecordCallbacks
+    ) -> None:
+        """Writes the merged records to the wrapped sink, and empties the list."""
+        if not record_envelopes:
+            return
+        self._batcher.begin_record()
+        self.sink.write_records_batch(list(record_envelopes), callbacks)
+        self._batcher.end_record(len(record_envelopes))
+        record_envelopes.clear()
+
+    def get_report(self) -> SinkReport:
+        return self.sink.get_report()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self._spill_store is not None:
+                self._spill_store.close()
+                self._spill_store = None
+        self.sink.close()
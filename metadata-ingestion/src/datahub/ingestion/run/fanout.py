@@ -0,0 +1,177 @@
+import functools
+import operator
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope, WorkUnit
+from datahub.ingestion.api.sink import BaseSink, Sink, SinkReport, WriteCallback
+from datahub.ingestion.run.batching import RecordCallbacks
+from datahub.ingestion.run.stages import END_OF_STREAM, StageAborted, StageRunner
+
+
+class _FanOutCallback(WriteCallback):
+    """Calls back once every sink has written the record, with the first failure if any."""
+
+    def __init__(self, callback: WriteCallback, sinks: int):
+        self.callback = callback
+        self._remaining = sinks
+        self._failure: Optional[Tuple[Exception, dict]] = None
+        self._lock = threading.Lock()
+
+    def on_success(self, record_envelope: RecordEnvelope, success_metadata: dict):
+        self._done(record_envelope, None)
+
+    def on_failure(
+        self,
+        record_envelope: RecordEnvelope,
+        failure_exception: Exception,
+        failure_metadata: dict,
+    ):
+        self._done(record_envelope, (failure_exception, failure_metadata))
+
+    def _done(
+        self, record_envelope: RecordEnvelope, failure: Optional[Tuple[Exception, dict]]
+    ) -> None:
+        with self._lock:
+            self._remaining -= 1
+            if failure is not None and self._failure is None:
+                self._failure = failure
+            is_last = self._remaining == 0
+        if not is_last:
+            return
+        if self._failure is not None:
+            self.callback.on_failure(record_envelope, *self._failure)
+        else:
+            self.callback.on_success(record_envelope, {})
+
+
+class FanOutSink(BaseSink):
+    """
+    Writes every record to several sinks, so that a single pass over the source
+    can feed all of them.
+
+    Records are serialized once, into every format that any of the sinks writes.
+    Each sink is then fed from its own bounded queue by its own thread, so that a
+    slow sink doesn't hold up the others until its queue fills up. The end of a
+    batch is passed on to each sink in turn too. If wait_on_batch_end is set, e.g.
+    because the pipeline checkpoints the batch once it ends, the batch only ends
+    once every sink has flushed it, and the sinks wait for each other.
+    """
+
+    def __init__(
+        self,
+        ctx: PipelineContext,
+        sinks: Sequence[Sink],
+        queue_size: int,
+        wait_on_batch_end: bool,
+    ):
+        super().__init__(ctx)
+        self.sinks = list(sinks)
+        self.wait_on_batch_end = wait_on_batch_end
+        # Depends on the sinks, so unlike for other sinks this is set per instance.
+        self.serialized_formats = sorted(  # type: ignore[misc]
+            {
+                serialized_format
+                for sink in sinks
+                for serialized_format in sink.serialized_formats
+            }
+        )
+
+        self._runner = StageRunner(queue_size)
+        self._queues = [self._runner.new_queue() for _ in sinks]
+        for i, (sink, queue) in enumerate(zip(sinks, self._queues)):
+            self._runner.add_stage(
+                f"fan-out-{i}", functools.partial(self._feed, sink, queue)
+            )
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _feed(self, sink: Sink, queue: Any) -> None:
+        while True:
+            call = self._runner.get(queue)
+            if call is END_OF_STREAM:
+                return
+            call(sink)
+
+    def _put_each(self, calls: List[Callable[[Sink], Any]]) -> None:
+        with self._start_lock:
+            if not self._started:
+                self._started = True
+                self._runner.start()
+        try:
+            for queue, call in zip(self._queues, calls):
+                self._runner.put(queue, call)
+        except StageAborted:
+            # One of the sinks failed. Re-raise its error.
+            self._runner.join()
+            raise
+
+    def _put_all(self, method: str, *args: Any) -> None:
+        self._put_each([operator.methodcaller(method, *args)] * len(self.sinks))
+
+    def handle_work_unit_start(self, workunit: WorkUnit) -> None:
+        self._put_all("handle_work_unit_start", workunit)
+
+    def handle_work_unit_end(self, workunit: WorkUnit) -> None:
+        self._put_all("handle_work_unit_end", workunit)
+
+    def handle_batch_start(self) -> None:
+        self._put_all("handle_batch_start")
+
+    def handle_batch_end(self) -> None:
+        if not self.wait_on_batch_end:
+            self._put_all("handle_batch_end")
+            return
+        flushed = [threading.Event() for _ in self.sinks]
+        self._put_each(
+            [functools.partial(_end_batch, flushed=event) for event in flushed]
+        )
+        try:
+            for event in flushed:
+                self._runner.wait(event)
+        except StageAborted:
+            self._runner.join()
+            raise
+
+    def _serialize(self, record_envelope: RecordEnvelope) -> None:
+        for serialized_format in self.serialized_formats:
+            record_envelope.get_serialized(serialized_format)
+
+    def write_record_async(
+        self, record_envelope: RecordEnvelope, write_callback: WriteCallback
+    ) -> None:
+        self._serialize(record_envelope)
+        callback = _FanOutCallback(write_callback, len(self.sinks))
+        self._put_all("write_record_async", record_envelope, callback)
+
+    def write_records_batch(
+        self, record_envelopes: List[RecordEnvelope], callback: WriteCallback
+    ) -> None:
+        callbacks = RecordCallbacks()
+        for record_envelope in record_envelopes:
+            self._serialize(record_envelope)
+            callbacks.add(record_envelope, _FanOutCallback(callback, len(self.sinks)))
+        self._put_all("write_records_batch", record_envelopes, callbacks)
+
+    def get_report(self) -> SinkReport:
+        report = SinkReport()
+        for sink in self.sinks:
+            report.merge(sink.get_report())
+        return report
+
+    def close(self) -> None:
+        if self._started:
+            try:
+                for queue in self._queues:
+                    self._runner.put(queue, END_OF_STREAM)
+            except StageAborted:
+                pass
+            # Re-raises the error of any sink that failed.
+            self._runner.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+def _end_batch(sink: Sink, *, flushed: threading.Event) -> None:
+    sink.handle_batch_end()
+    flushed.set()
@@ -0,0 +1,348 @@
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import validator
+
+from datahub.configuration.common import ConfigModel
+from datahub.ingestion.api.sink import SinkReport
+from datahub.ingestion.api.source import SourceReport
+from datahub.ingestion.run.pipeline_report import LatencyHistogram, PipelineReport
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# The upper bounds of the buckets of the exported latency histograms, in seconds.
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0]
+
+
+class MetricsConfig(ConfigModel):
+    # If set, the pipeline's metrics are served in the OpenMetrics text format, which
+    # Prometheus can scrape, at http://<host>:<port>/metrics while it runs.
+    port: Optional[int] = None
+    host: str = "127.0.0.1"
+    # If set, the metrics are also written to this file every interval_seconds.
+    # If the port can't be used, they are written to a temporary file instead.
+    file: Optional[str] = None
+    interval_seconds: int = 15
+
+    @validator("interval_seconds")
+    def is_positive(cls, val: int) -> int:
+        assert val > 0, "must be a positive number"
+        return val
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    # One of "counter", "gauge" or "histogram".
+    type: str
+    help: str
+    # The name suffix, labels and value of each sample.
+    samples: List[Tuple[str, Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, labels: Dict[str, str], value: float, suffix: str = "") -> None:
+        if self.type == "counter" and not suffix:
+            suffix = "_total"
+        self.samples.append((suffix, labels, value))
+
+    def add_histogram(self, labels: Dict[str, str], histogram: LatencyHistogram):
+        for bound, count in zip(
+            LATENCY_BUCKETS, histogram.cumulative_counts(LATENCY_BUCKETS)
+        ):
+            self.add({**labels, "le": str(bound)}, count, "_bucket")
+        self.add({**labels, "le": "+Inf"}, histogram.count, "_bucket")
+        self.add(labels, histogram.count, "_count")
+        self.add(labels, histogram.total_seconds, "_sum")
+
+
+def _count(counts_by_category: Dict[str, int]) -> int:
+    return sum(counts_by_category.values())
+
+
+def collect_metrics(
+    pipeline: str,
+    source_report: SourceReport,
+    sink_reports: List[Tuple[str, SinkReport]],
+    pipeline_report: PipelineReport,
+) -> List[MetricFamily]:
+    labels = {"pipeline": pipeline}
+
+    def family(name: str, type: str, help: str) -> MetricFamily:
+        return MetricFamily(f"datahub_{name}", type, help)
+
+    workunits_produced = family(
+        "workunits_produced", "counter", "Work units produced by the source."
+    )
+    workunits_produced.add(labels, source_report.workunits_produced)
+    workunits_written = family(
+        "workunits_written",
+        "counter",
+        "Work units whose records were all handed to the sink.",
+    )
+    workunits_written.add(labels, pipeline_report.workunits_written)
+    source_failures = family(
+        "source_failures", "counter", "Failures reported by the source."
+    )
+    source_failures.add(labels, _count(source_report.failures_by_category))
+    source_warnings = family(
+        "source_warnings", "counter", "Warnings reported by the source."
+    )
+    source_warnings.add(labels, _count(source_report.warnings_by_category))
+
+    records_written = family(
+        "records_written", "counter", "Records written by the sink."
+    )
+    records_failed = family(
+        "records_failed", "counter", "Records the sink failed to write."
+    )
+    sink_concurrency = family(
+        "sink_concurrency",
+        "gauge",
+        "Writes the sink currently allows in flight, if it adapts them.",
+    )
+    for sink, sink_report in sink_reports:
+        sink_labels = {**labels, "sink": sink}
+        records_written.add(sink_labels, sink_report.records_written)
+        records_failed.add(sink_labels, _count(sink_report.failures_by_category))
+        if sink_report.current_concurrency:
+            sink_concurrency.add(sink_labels, sink_report.current_concurrency)
+
+    records_in_flight = family(
+        "records_in_flight",
+        "gauge",
+        "Records handed to the sink which it hasn't acknowledged yet.",
+    )
+    records_in_flight.add(
+        labels,
+        max(
+            pipeline_report.stages["sink"].count
+            - pipeline_report.stages["callback"].count,
+            0,
+        ),
+    )
+    records_unchanged = family(
+        "records_unchanged",
+        "counter",
+        "Records dropped since they didn't change since the last run.",
+    )
+    records_unchanged.add(labels, pipeline_report.records_unchanged)
+    records_coalesced = family(
+        "records_coalesced",
+        "counter",
+        "Records merged into another record for the same URN.",
+    )
+    records_coalesced.add(labels, pipeline_report.records_coalesced)
+
+    queue_depth = family(
+        "queue_depth", "gauge", "Items waiting in the queues between stages."
+    )
+    for queue_name, depth in pipeline_report.get_queue_depths().items():
+        queue_depth.add({**labels, "queue": queue_name}, depth)
+
+    stage_latency = family(
+        "stage_latency_seconds", "histogram", "Latency of each pipeline stage."
+    )
+    for stage, histogram in pipeline_report.stages.items():
+        stage_latency.add_histogram({**labels, "stage": stage}, histogram)
+
+    return [
+        workunits_produced,
+        workunits_written,
+        source_failures,
+        source_warnings,
+        records_written,
+        records_failed,
+        sink_concurrency,
+        records_in_flight,
+        records_unchanged,
+        records_coalesced,
+        queue_depth,
+        stage_latency,
+    ]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return (
+        "{"
+        + ",".join(f'{key}="{value}"' for key, value in zip(labels.keys(), escaped))
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """Renders metric families in the OpenMetrics text format. Families with the
+    same name, e.g. from several pipelines, are rendered together."""
+    merged: Dict[str, MetricFamily] = {}
+    for metric_family in families:
+        if metric_family.name not in merged:
+            merged[metric_family.name] = MetricFamily(
+                metric_family.name, metric_family.type, metric_family.help
+            )
+        merged[metric_family.name].samples.extend(metric_family.samples)
+
+    lines = []
+    for metric_family in merged.values():
+        lines.append(f"# TYPE {metric_family.name} {metric_family.type}")
+        lines.append(f"# HELP {metric_family.name} {metric_family.help}")
+        for suffix, labels, value in metric_family.samples:
+            lines.append(
+                f"{metric_family.name}{suffix}{_format_labels(labels)} "
+                f"{_format_value(value)}"
+            )
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _MetricsServer:
+    """Serves the metrics of every pipeline that registered a collector with it."""
+
+    def __init__(self, host: str, port: int):
+        self.collectors: List[Callable[[], List[MetricFamily]]] = []
+        collectors = self.collectors
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ["/", "/metrics"]:
+                    self.send_error(404)
+                    return
+                body = render(
+                    family for collect in list(collectors) for family in collect()
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logger.debug(format % args)
+
+        self.http_server = _ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(
+            target=self.http_server.serve_forever, name="datahub-metrics", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        self._thread.join()
+
+
+# Pipelines running in the same process, e.g. several recipes, share a server
+# if they are configured with the same port.
+_servers: Dict[Tuple[str, int], _MetricsServer] = {}
+_servers_lock = threading.Lock()
+
+
+class MetricsExporter:
+    """
+    Exports a pipeline's metrics while it runs: over HTTP if a port is configured,
+    and to a file every interval_seconds if a file is configured or if the port
+    can't be used.
+    """
+
+    def __init__(
+        self, config: MetricsConfig, collect: Callable[[], List[MetricFamily]]
+    ):
+        self.config = config
+        self.collect = collect
+        self.file: Optional[str] = config.file
+        self._server: Optional[_MetricsServer] = None
+        self._server_key: Optional[Tuple[str, int]] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        """The port the metrics are served on, if they are."""
+        if self._server is None:
+            return None
+        return self._server.http_server.server_address[1]
+
+    def start(self) -> None:
+        if self.config.port is not None:
+            try:
+                self._start_server(self.config.host, self.config.port)
+            except OSError as e:
+                if self.file is None:
+                    self.file = os.path.join(
+                        tempfile.gettempdir(), f"datahub-metrics-{os.getpid()}.prom"
+                    )
+                logger.warning(
+                    f"Unable to serve metrics on port {self.config.port} ({e}), "
+                    f"writing them to {self.file} instead"
+                )
+        if self.file is not None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="datahub-metrics-file", daemon=True
+            )
+            self._thread.start()
+
+    def _start_server(self, host: str, port: int) -> None:
+        with _servers_lock:
+            key = (host, port)
+            server = _servers.get(key) if port else None
+            if server is None:
+                server = _MetricsServer(host, port)
+                key = (host, server.http_server.server_address[1])
+                _servers[key] = server
+                logger.info(f"Serving metrics at http://{host}:{key[1]}/metrics")
+            server.collectors.append(self.collect)
+            self._server = server
+            self._server_key = key
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.config.interval_seconds):
+            self.write_file()
+
+    def write_file(self) -> None:
+        if self.file is None:
+            return
+        try:
+            # Replace the file at once, so that readers never see half of it.
+            temp_file = f"{self.file}.tmp"
+            with open(temp_file, "w") as f:
+                f.write(render(self.collect()))
+            os.replace(temp_file, self.file)
+        except Exception as e:
+            logger.debug(f"failed to write metrics to {self.file}: {e}")
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+        # Leave the final metrics behind.
+        self.write_file()
+        if self._server is not None and self._server_key is not None:
+            with _servers_lock:
+                self._server.collectors.remove(self.collect)
+                if not self._server.collectors:
+                    del _servers[self._server_key]
+                    self._server.close()
+            self._server = None
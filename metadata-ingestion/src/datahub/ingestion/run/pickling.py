@@ -0,0 +1,37 @@
+import io
+import pickle
+from typing import Any
+
+from avrogen.dict_wrapper import DictWrapper
+
+# Generated records can't be pickled as they are: they are read-only dicts, which
+# pickle fills in item by item. They are stored as their avro-JSON object instead,
+# along with their class, and read back into it.
+_RECORD = "avro-record"
+
+
+class _Pickler(pickle.Pickler):
+    def persistent_id(self, obj: Any) -> Any:
+        if isinstance(obj, DictWrapper):
+            return (_RECORD, type(obj), obj.to_obj())
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid: Any) -> Any:
+        kind, record_class, obj = pid
+        if kind != _RECORD:
+            raise pickle.UnpicklingError(f"unsupported persistent id {kind}")
+        return record_class.from_obj(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Pickles an object, e.g. a work unit or a record envelope, including any
+    generated records that it holds."""
+    buffer = io.BytesIO()
+    _Pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    return _Unpickler(io.BytesIO(data)).load()
@@ -1,28 +1,212 @@
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
 import logging
+import threading
+import time
 import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import click
-from pydantic import Field
+from pydantic import Field, validator
 
 from datahub.configuration.common import (
     ConfigModel,
     DynamicTypedConfig,
     PipelineExecutionError,
 )
-from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
-from datahub.ingestion.api.sink import Sink, WriteCallback
-from datahub.ingestion.api.source import Extractor, Source
+from datahub.emitter import serialization
+from datahub.ingestion.api.common import (
+    PipelineContext,
+    RecordEnvelope,
+    SharedResources,
+    WorkUnit,
+    run_until_complete,
+)
+from datahub.ingestion.api.report import disable_spill, enable_spill
+from datahub.ingestion.api.sink import (
+    AsyncSink,
+    BaseSink,
+    Sink,
+    SinkReport,
+    WriteCallback,
+)
+from datahub.ingestion.api.source import (
+    AsyncSource,
+    Extractor,
+    Source,
+    SourcePartition,
+)
 from datahub.ingestion.extractor.extractor_registry import extractor_registry
+from datahub.ingestion.run import pickling
+from datahub.ingestion.run.batching import SinkBatcher
+from datahub.ingestion.run.checkpoint import CheckpointStore
+from datahub.ingestion.run.coalescing import CoalescingSink
+from datahub.ingestion.run.fanout import FanOutSink
+from datahub.ingestion.run.metrics import (
+    MetricFamily,
+    MetricsConfig,
+    MetricsExporter,
+    collect_metrics,
+)
+from datahub.ingestion.run.pipeline_report import PipelineReport, ProgressReporter
+from datahub.ingestion.run.profiling import (
+    Profiler,
+    ProfilingConfig,
+    create_profiler,
+)
+from datahub.ingestion.run.stages import END_OF_STREAM, StageAborted, StageRunner
+from datahub.ingestion.run.state import IngestionStateStore, get_aspect_hashes
 from datahub.ingestion.sink.sink_registry import sink_registry
 from datahub.ingestion.source.source_registry import source_registry
 
 logger = logging.getLogger(__name__)
 
 
+EXECUTION_MODES = ["serial", "threaded", "process", "async"]
+
+
 class SourceConfig(DynamicTypedConfig):
     extractor: str = "mce"
 
 
+class PipelineExecutionConfig(ConfigModel):
+    # In "serial" mode, the source, extractor and sink all run in the calling thread.
+    # In "threaded" mode, they run as separate stages that are joined by bounded
+    # queues, so that source and sink latencies overlap instead of adding up.
+    # In "process" mode, work units are shipped to a pool of worker processes which
+    # run the extractor and pre-serialize the records for the sink, so that all
+    # cores can be used. Records are still handed to the sink in source order.
+    # In "async" mode, work units are processed concurrently on an asyncio event
+    # loop, which suits sources and sinks that mostly wait on the network.
+    mode: str = "serial"
+
+    # Maximum number of work units buffered between two stages. A full queue blocks
+    # the stage that feeds it, which keeps memory usage bounded.
+    queue_size: int = 1000
+
+    # Number of threads running the extractor and the sink respectively. Only use
+    # more than one sink worker with sinks that can be called concurrently.
+    extractor_workers: int = 1
+    sink_workers: int = 1
+
+    # Number of threads crawling the source. Sources that can split their crawl
+    # into independent partitions, e.g. one per database schema, crawl that many
+    # partitions concurrently. Other sources ignore this.
+    source_workers: int = 1
+
+    # Number of worker processes in "process" mode. Defaults to the number of CPUs.
+    process_workers: Optional[int] = None
+    # Number of work units sent to a worker process at a time.
+    process_chunk_size: int = 10
+
+    # Records are written to the sink in batches, which end after batch_size
+    # records or batch_timeout_ms milliseconds, whichever comes first. Sinks that
+    # buffer their writes, like datahub-kafka, only flush at the end of a batch.
+    batch_size: int = 1000
+    batch_timeout_ms: int = 1000
+
+    # Maximum number of work units being written concurrently in "async" mode.
+    # Sinks that don't implement AsyncSink are still called from at most
+    # sink_workers threads at a time.
+    max_in_flight: int = 100
+
+    @validator("mode")
+    def mode_is_supported(cls, mode: str) -> str:
+        assert mode in EXECUTION_MODES, f"mode must be one of {EXECUTION_MODES}"
+        return mode
+
+    @validator(
+        "queue_size",
+        "source_workers",
+        "extractor_workers",
+        "sink_workers",
+        "process_workers",
+        "process_chunk_size",
+        "max_in_flight",
+        "batch_size",
+        "batch_timeout_ms",
+    )
+    def is_positive(cls, val: Optional[int]) -> Optional[int]:
+        assert val is None or val > 0, "must be a positive number"
+        return val
+
+
+class PipelineReportingConfig(ConfigModel):
+    # If set, the source, sink and pipeline reports are also written to this file
+    # as JSON once the run finishes.
+    report_file: Optional[str] = None
+    # Reports only keep samples of long lists, such as the ids of the work units
+    # produced. If set, the full lists are written to this file as JSON lines.
+    spill_file: Optional[str] = None
+    # How often a summary of the pipeline's progress is logged. 0 turns it off.
+    # Logging every record written is left to the DEBUG log level.
+    progress_interval_seconds: int = 30
+    # Live metrics in the OpenMetrics format, over HTTP or in a file.
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+
+    @validator("progress_interval_seconds")
+    def is_not_negative(cls, val: int) -> int:
+        assert val >= 0, "must not be negative"
+        return val
+
+
+class CheckpointingConfig(ConfigModel):
+    # If enabled, the ids of the work units that were written to the sink are
+    # stored in a local SQLite database, keyed by run_id. Re-running a pipeline
+    # with the same run_id then skips those work units.
+    enabled: bool = False
+    path: str = "~/.datahub/checkpoints.db"
+
+
+class IncrementalConfig(ConfigModel):
+    # If enabled, a content hash of each aspect written to the sink is stored in a
+    # local SQLite database, and records whose aspects are all unchanged since an
+    # earlier run are dropped before they reach the sink.
+    enabled: bool = False
+    path: str = "~/.datahub/state.db"
+    # Keeps the state of different pipelines apart. Defaults to a hash of the
+    # source and sink configs.
+    state_key: Optional[str] = None
+
+
+class CoalescingConfig(ConfigModel):
+    # If enabled, the aspects of all MetadataChangeEvents for the same URN within a
+    # window are merged into a single event before they reach the sink.
+    enabled: bool = False
+    # Number of records in a window. 0 coalesces over the whole run.
+    window_size: int = 10000
+    # Records held back beyond this are spilled to a temporary file in spill_dir,
+    # which defaults to the system's temporary directory.
+    max_records_in_memory: int = 100000
+    spill_dir: Optional[str] = None
+
+    @validator("window_size")
+    def is_not_negative(cls, val: int) -> int:
+        assert val >= 0, "must not be negative"
+        return val
+
+    @validator("max_records_in_memory")
+    def is_positive(cls, val: int) -> int:
+        assert val > 0, "must be a positive number"
+        return val
+
+
 class PipelineConfig(ConfigModel):
     # Once support for discriminated unions gets merged into Pydantic, we can
     # simplify this configuration and validation.
@@ -30,29 +214,203 @@ class PipelineConfig(ConfigModel):
 
     run_id: str = Field(default_factory=lambda: str(uuid.uuid1()))
     source: SourceConfig
-    sink: DynamicTypedConfig
+    # Either a single sink, or a list of sinks which are all fed from one pass
+    # over the source.
+    # The list comes first, since pydantic would otherwise read a list of sinks as
+    # a single sink, taking the first item's keys for its fields.
+    sink: Union[List[DynamicTypedConfig], DynamicTypedConfig]
+    execution: PipelineExecutionConfig = Field(default_factory=PipelineExecutionConfig)
+    reporting: PipelineReportingConfig = Field(default_factory=PipelineReportingConfig)
+    checkpointing: CheckpointingConfig = Field(default_factory=CheckpointingConfig)
+    incremental: IncrementalConfig = Field(default_factory=IncrementalConfig)
+    coalescing: CoalescingConfig = Field(default_factory=CoalescingConfig)
+    profiling: ProfilingConfig = Field(default_factory=ProfilingConfig)
+
+    @validator("sink")
+    def sinks_not_empty(
+        cls, sink: Union[List[DynamicTypedConfig], DynamicTypedConfig]
+    ) -> Union[List[DynamicTypedConfig], DynamicTypedConfig]:
+        assert not isinstance(sink, list) or sink, "must have at least one sink"
+        return sink
+
+    def get_sink_configs(self) -> List[DynamicTypedConfig]:
+        if isinstance(self.sink, list):
+            return self.sink
+        return [self.sink]
+
+    def get_state_key(self) -> str:
+        if self.incremental.state_key:
+            return self.incremental.state_key
+        configs = json.dumps(
+            self.dict(include={"source", "sink"}),
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(configs.encode("utf-8")).hexdigest()
 
 
 class LoggingCallback(WriteCallback):
+    def __init__(
+        self,
+        report: Optional[PipelineReport] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        state: Optional[IngestionStateStore] = None,
+    ):
+        self.report = report
+        self.checkpoint = checkpoint
+        self.state = state
+
     def on_success(self, record_envelope: RecordEnvelope, success_meta):
-        logger.info(f"sink wrote workunit {record_envelope.metadata['workunit_id']}")
+        if self.report is not None:
+            self.report.report_write_acknowledged(record_envelope)
+        if self.state is not None and "aspect_hashes" in record_envelope.metadata:
+            self.state.record_written(*record_envelope.metadata["aspect_hashes"])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"sink wrote workunit {record_envelope.workunit_id}")
 
     def on_failure(self, record_envelope: RecordEnvelope, exception, failure_meta):
+        if self.report is not None:
+            self.report.report_write_acknowledged(record_envelope)
+        if self.checkpoint is not None and record_envelope.workunit_id is not None:
+            self.checkpoint.mark_failed(record_envelope.workunit_id)
         logger.error(
-            f"failed to write record with workunit {record_envelope.metadata['workunit_id']}"
+            f"failed to write record with workunit {record_envelope.workunit_id}"
             f" with {exception} and info {failure_meta}"
         )
 
 
+def _get_urns(record_envelopes: Iterable[RecordEnvelope]) -> Set[str]:
+    """The URNs of the snapshots among the records. Records for the same URN are
+    written in source order, even when work units are written concurrently."""
+    urns = set()
+    for record_envelope in record_envelopes:
+        snapshot = getattr(record_envelope.record, "proposedSnapshot", None)
+        if snapshot is not None:
+            urns.add(snapshot.urn)
+    return urns
+
+
+class _UrnWriteOrder:
+    """
+    Lets work units be written concurrently, except for those with records for the
+    same URN, which are written in the order they were claimed in.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # The event that is set once the work unit claimed last for each URN was
+        # written.
+        self._last_writes: Dict[str, threading.Event] = {}
+
+    def claim(self, urns: Set[str]) -> Tuple[List[threading.Event], threading.Event]:
+        """Returns the events of the earlier writes to wait for, and the event of this
+        write, to release once it is done."""
+        written = threading.Event()
+        with self._lock:
+            earlier_writes = [
+                self._last_writes[urn] for urn in urns if urn in self._last_writes
+            ]
+            for urn in urns:
+                self._last_writes[urn] = written
+        return earlier_writes, written
+
+    def release(self, urns: Set[str], written: threading.Event) -> None:
+        written.set()
+        with self._lock:
+            for urn in urns:
+                if self._last_writes.get(urn) is written:
+                    del self._last_writes[urn]
+
+
+# Extractors are reused across work units within each worker process.
+_worker_extractors: Dict[Type[Extractor], Extractor] = {}
+
+
+def _extract_in_worker(
+    extractor_class: Type[Extractor],
+    ctx: PipelineContext,
+    serialized_formats: List[str],
+    compute_aspect_hashes: bool,
+    pickled_workunits: bytes,
+) -> bytes:
+    """Extracts the records of a chunk of work units. The work units, and the record
+    envelopes and extractor latencies sent back, are pickled with
+    datahub.ingestion.run.pickling, since they hold generated records."""
+    workunits: List[WorkUnit] = pickling.loads(pickled_workunits)
+    if extractor_class not in _worker_extractors:
+        _worker_extractors[extractor_class] = extractor_class()
+    extractor = _worker_extractors[extractor_class]
+
+    results = []
+    # The time taken to extract each record, reported back to the pipeline.
+    durations = []
+    for wu in workunits:
+        # TODO: change extractor interface
+        extractor.configure({}, ctx)
+        record_envelopes = []
+        records = iter(extractor.get_records(wu))
+        while True:
+            start = time.perf_counter()
+            record_envelope = next(records, None)
+            if record_envelope is None:
+                break
+            durations.append(time.perf_counter() - start)
+            record_envelopes.append(record_envelope)
+        extractor.close()
+
+        for record_envelope in record_envelopes:
+            if compute_aspect_hashes:
+                record_envelope.metadata["aspect_hashes"] = get_aspect_hashes(
+                    record_envelope.record
+                )
+            # Only send back the forms the sink asked for, and not the ones they
+            # are derived from.
+            cache: Dict[str, Any] = {}
+            for serialized_format in serialized_formats:
+                record_envelope.serialized[serialized_format] = serialization.serialize(
+                    record_envelope.record, serialized_format, cache
+                )
+        results.append(record_envelopes)
+    return pickling.dumps((results, durations))
+
+
 class Pipeline:
     config: PipelineConfig
     ctx: PipelineContext
     source: Source
-    sink: Sink
+    sink: BaseSink
 
-    def __init__(self, config: PipelineConfig):
+    def __init__(
+        self,
+        config: PipelineConfig,
+        name: Optional[str] = None,
+        shared_resources: Optional[SharedResources] = None,
+    ):
         self.config = config
-        self.ctx = PipelineContext(run_id=self.config.run_id)
+        # Identifies the pipeline in the logs when several run at once.
+        self.name = name
+        self.ctx = PipelineContext(
+            run_id=self.config.run_id, shared_resources=shared_resources
+        )
+        if self.config.reporting.spill_file:
+            # Must be enabled before the source and sink create their reports.
+            enable_spill(self.config.reporting.spill_file)
+
+        self.pipeline_report = PipelineReport()
+
+        self.checkpoint: Optional[CheckpointStore] = None
+        if self.config.checkpointing.enabled:
+            self.checkpoint = CheckpointStore(
+                self.config.checkpointing.path, self.config.run_id
+            )
+            self.ctx.completed_workunit_ids = (
+                self.checkpoint.get_completed_workunit_ids()
+            )
+            if self.ctx.completed_workunit_ids:
+                logger.info(
+                    f"Resuming run {self.config.run_id}, skipping "
+                    f"{len(self.ctx.completed_workunit_ids)} completed work units"
+                )
 
         source_type = self.config.source.type
         source_class = source_registry.get(source_type)
@@ -61,33 +419,521 @@ class Pipeline:
         )
         logger.debug(f"Source type:{source_type},{source_class} configured")
 
-        sink_type = self.config.sink.type
-        sink_class = sink_registry.get(sink_type)
-        sink_config = self.config.sink.dict().get("config", {})
-        self.sink: Sink = sink_class.create(sink_config, self.ctx)
-        logger.debug(f"Sink type:{self.config.sink.type},{sink_class} configured")
+        self.sinks: List[Sink] = []
+        for sink_config in self.config.get_sink_configs():
+            sink_class = sink_registry.get(sink_config.type)
+            sink = sink_class.create(sink_config.dict().get("config", {}), self.ctx)
+            logger.debug(f"Sink type:{sink_config.type},{sink_class} configured")
+            self.sinks.append(sink)
+        self.sink: BaseSink = self.sinks[0]
+        if len(self.sinks) > 1:
+            self.sink = FanOutSink(
+                self.ctx,
+                self.sinks,
+                self.config.execution.queue_size,
+                # Checkpoints and state are committed once the batch was written.
+                wait_on_batch_end=(
+                    self.checkpoint is not None or self.config.incremental.enabled
+                ),
+            )
+        coalescing = self.config.coalescing
+        if coalescing.enabled:
+            self.sink = CoalescingSink(
+                self.ctx,
+                self.sink,
+                self.pipeline_report,
+                window_size=coalescing.window_size,
+                max_records_in_memory=coalescing.max_records_in_memory,
+                spill_dir=coalescing.spill_dir,
+                batch_size=self.config.execution.batch_size,
+                batch_timeout_seconds=self.config.execution.batch_timeout_ms / 1000,
+                flush_on_batch_end=self.checkpoint is not None,
+            )
+        self.state: Optional[IngestionStateStore] = None
+        if self.config.incremental.enabled:
+            self.state = IngestionStateStore(
+                self.config.incremental.path, self.config.get_state_key()
+            )
+
+        self.batcher = SinkBatcher(
+            self.sink,
+            self.config.execution.batch_size,
+            self.config.execution.batch_timeout_ms / 1000,
+            on_batch_end=self._on_batch_end,
+        )
 
         self.extractor_class = extractor_registry.get(self.config.source.extractor)
 
+        self.profiler: Optional[Profiler] = create_profiler(
+            self.config.profiling, self.config.run_id
+        )
+        if self.profiler is not None:
+            self.pipeline_report.observers.append(self.profiler)
+        # Guards the source report against concurrent partition crawls.
+        self._source_report_lock = threading.Lock()
+
     @classmethod
-    def create(cls, config_dict: dict) -> "Pipeline":
+    def create(
+        cls,
+        config_dict: dict,
+        name: Optional[str] = None,
+        shared_resources: Optional[SharedResources] = None,
+    ) -> "Pipeline":
         config = PipelineConfig.parse_obj(config_dict)
-        return cls(config)
+        return cls(config, name, shared_resources)
 
     def run(self):
-        callback = LoggingCallback()
+        self.pipeline_report.report_run_started()
+        callback = LoggingCallback(self.pipeline_report, self.checkpoint, self.state)
+        progress: Optional[ProgressReporter] = None
+        if self.config.reporting.progress_interval_seconds:
+            progress = ProgressReporter(
+                self.pipeline_report,
+                self.config.reporting.progress_interval_seconds,
+                self.source.get_workunits_estimate,
+                name=self.name,
+            )
+            progress.start()
+        metrics: Optional[MetricsExporter] = None
+        metrics_config = self.config.reporting.metrics
+        if metrics_config.port is not None or metrics_config.file is not None:
+            metrics = MetricsExporter(metrics_config, self.get_metrics)
+            metrics.start()
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            if self.config.execution.mode == "threaded":
+                self._run_threaded(callback)
+            elif self.config.execution.mode == "process":
+                self._run_process_pool(callback)
+            elif self.config.execution.mode == "async":
+                run_until_complete(self._run_async(callback))
+            else:
+                self._run_serial(callback)
+            self.batcher.flush()
+            self.source.close()
+            self.sink.close()
+        finally:
+            if progress is not None:
+                progress.stop()
+            if metrics is not None:
+                metrics.stop()
+            if self.profiler is not None:
+                self.profiler.stop()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        if self.state is not None:
+            self.state.close()
+        self.pipeline_report.report_run_finished()
+        if self.config.reporting.report_file:
+            self._write_report_file(self.config.reporting.report_file)
+        if self.config.reporting.spill_file:
+            disable_spill()
+
+    def get_metrics(self) -> List[MetricFamily]:
+        return collect_metrics(
+            self.name or self.config.run_id,
+            self.source.get_report(),
+            self.get_sink_reports(),
+            self.pipeline_report,
+        )
+
+    def _write_report_file(self, report_file: str) -> None:
+        reports = {
+            "run_id": self.config.run_id,
+            "source": self.source.get_report().as_obj(),
+            "sinks": {
+                sink_type: report.as_obj()
+                for sink_type, report in self.get_sink_reports()
+            },
+            "pipeline": self.pipeline_report.as_obj(),
+        }
+        with open(report_file, "w") as f:
+            json.dump(reports, f, indent=4, default=str)
+
+    def _on_batch_end(self) -> None:
+        # The sink has flushed the batch, so its records are safe to remember.
+        if self.checkpoint is not None:
+            self.checkpoint.commit()
+        if self.state is not None:
+            self.state.commit()
+
+    def _get_workunits(self) -> Iterable[WorkUnit]:
+        partitions = None
+        if self.config.execution.source_workers > 1:
+            partitions = self.source.get_partitions()
+        if partitions is None:
+            workunits = self.source.get_workunits()
+        else:
+            workunits = self._get_partitioned_workunits(partitions)
+        if self.ctx.completed_workunit_ids:
+            workunits = self._skip_completed_workunits(workunits)
+        return self.pipeline_report.timed("source", workunits)
+
+    def _skip_completed_workunits(
+        self, workunits: Iterable[WorkUnit]
+    ) -> Iterable[WorkUnit]:
+        for wu in workunits:
+            if wu.id in self.ctx.completed_workunit_ids:
+                with self._source_report_lock:
+                    self.source.get_report().report_workunit_skipped(wu.id)
+                continue
+            yield wu
+
+    def _get_partitioned_workunits(
+        self, partitions: Iterable[SourcePartition]
+    ) -> Iterable[WorkUnit]:
+        execution = self.config.execution
+        runner = StageRunner(execution.queue_size)
+        workunits = runner.new_queue()
+        self.pipeline_report.watch_queue("partitioned_workunits", workunits)
+        remaining_partitions = iter(partitions)
+
+        def crawl() -> None:
+            while True:
+                with self._source_report_lock:
+                    partition = next(remaining_partitions, None)
+                if partition is None:
+                    return
+                logger.debug(f"Crawling source partition {partition.id}")
+                for wu in partition.get_workunits():
+                    runner.put(workunits, wu)
+                with self._source_report_lock:
+                    self.source.get_report().merge(partition.report)
+
+        runner.add_stage(
+            "partition", crawl, workers=execution.source_workers, output=workunits
+        )
+        runner.start()
+        try:
+            while True:
+                wu = runner.get(workunits)
+                if wu is END_OF_STREAM:
+                    break
+                yield wu
+        except StageAborted:
+            # A partition failed. Its error is re-raised by join() below.
+            pass
+        finally:
+            # Also stops the crawl early if the consumer gives up on the work units.
+            runner.abort()
+        runner.join()
+
+    def _extract(self, extractor: Extractor, wu: WorkUnit) -> Iterable[RecordEnvelope]:
+        # TODO: change extractor interface
+        extractor.configure({}, self.ctx)
+        yield from self.pipeline_report.timed("extractor", extractor.get_records(wu))
+        extractor.close()
+
+    def _write(
+        self, wu: WorkUnit, records: Iterable[RecordEnvelope], callback: WriteCallback
+    ) -> None:
+        self.sink.handle_work_unit_start(wu)
+        for record_envelopes in self._batch_records(self._drop_unchanged(records)):
+            self._write_records(record_envelopes, callback)
+        self.sink.handle_work_unit_end(wu)
+        self.pipeline_report.report_workunit_written()
+        if self.checkpoint is not None:
+            self.checkpoint.mark_completed(wu.id)
+
+    def _drop_unchanged(
+        self, records: Iterable[RecordEnvelope]
+    ) -> Iterable[RecordEnvelope]:
+        if self.state is None:
+            yield from records
+            return
+
+        for record_envelope in records:
+            if "aspect_hashes" not in record_envelope.metadata:
+                record_envelope.metadata["aspect_hashes"] = get_aspect_hashes(
+                    record_envelope.record
+                )
+            aspect_hashes = record_envelope.metadata["aspect_hashes"]
+            if aspect_hashes is None:
+                # Not a snapshot, so there's nothing to compare.
+                del record_envelope.metadata["aspect_hashes"]
+            elif self.state.is_unchanged(*aspect_hashes):
+                self.pipeline_report.report_record_unchanged()
+                continue
+            yield record_envelope
+
+    def _batch_records(
+        self, records: Iterable[RecordEnvelope]
+    ) -> Iterable[List[RecordEnvelope]]:
+        """Groups the records of a work unit into batches for the sink, which end
+        where the batcher's batches do."""
+        record_envelopes: List[RecordEnvelope] = []
+        for record_envelope in records:
+            record_envelopes.append(record_envelope)
+            if len(record_envelopes) >= self.batcher.remaining_records():
+                yield record_envelopes
+                record_envelopes = []
+        if record_envelopes:
+            yield record_envelopes
+
+    def _write_records(
+        self, record_envelopes: List[RecordEnvelope], callback: WriteCallback
+    ) -> None:
+        self.batcher.begin_record()
+        self.pipeline_report.stage_started("sink")
+        start = time.perf_counter()
+        for record_envelope in record_envelopes:
+            self.pipeline_report.report_write_started(record_envelope)
+        try:
+            self.sink.write_records_batch(record_envelopes, callback)
+        finally:
+            self.pipeline_report.stage_finished("sink")
+        # The time taken is split evenly between the records of the batch.
+        latency = (time.perf_counter() - start) / len(record_envelopes)
+        for _ in record_envelopes:
+            self.pipeline_report.report_latency("sink", latency)
+        self.batcher.end_record(len(record_envelopes))
+
+    def _run_serial(self, callback: WriteCallback) -> None:
+        extractor: Extractor = self.extractor_class()
+        for wu in self._get_workunits():
+            self._write(wu, self._extract(extractor, wu), callback)
+
+    def _run_threaded(self, callback: WriteCallback) -> None:
+        execution = self.config.execution
+        runner = StageRunner(execution.queue_size)
+        workunits = runner.new_queue()
+        # The work units in source order, along with futures of their records,
+        # which the extractors fill in.
+        extracted = runner.new_queue()
+        records = runner.new_queue()
+        self.pipeline_report.watch_queue("workunits", workunits)
+        self.pipeline_report.watch_queue("extracted", extracted)
+        self.pipeline_report.watch_queue("records", records)
+
+        urn_order = _UrnWriteOrder()
+
+        def read_source() -> None:
+            for wu in self._get_workunits():
+                future: Future = Future()
+                runner.put(extracted, (wu, future))
+                runner.put(workunits, (wu, future))
+            runner.put(extracted, END_OF_STREAM)
+
+        def extract() -> None:
+            extractor: Extractor = self.extractor_class()
+            while True:
+                item = runner.get(workunits)
+                if item is END_OF_STREAM:
+                    return
+                wu, future = item
+                future.set_result(list(self._extract(extractor, wu)))
+
+        def order() -> None:
+            while True:
+                item = runner.get(extracted)
+                if item is END_OF_STREAM:
+                    return
+                wu, future = item
+                record_envelopes = runner.result(future)
+                urns = _get_urns(record_envelopes)
+                earlier_writes, written = urn_order.claim(urns)
+                runner.put(
+                    records, (wu, record_envelopes, urns, earlier_writes, written)
+                )
+
+        def write() -> None:
+            while True:
+                item = runner.get(records)
+                if item is END_OF_STREAM:
+                    return
+                wu, record_envelopes, urns, earlier_writes, written = item
+                for earlier_write in earlier_writes:
+                    runner.wait(earlier_write)
+                self._write(wu, record_envelopes, callback)
+                urn_order.release(urns, written)
+
+        runner.add_stage(
+            "source",
+            read_source,
+            output=workunits,
+            consumers=execution.extractor_workers,
+        )
+        runner.add_stage("extractor", extract, workers=execution.extractor_workers)
+        runner.add_stage(
+            "ordering", order, output=records, consumers=execution.sink_workers
+        )
+        runner.add_stage("sink", write, workers=execution.sink_workers)
+        runner.run()
+
+    def _run_process_pool(self, callback: WriteCallback) -> None:
+        execution = self.config.execution
+        chunk_size = execution.process_chunk_size
+        # The queue holds chunks, so scale it down to keep the same number of
+        # work units in flight.
+        runner = StageRunner(max(1, execution.queue_size // chunk_size))
+        pending = runner.new_queue()
+        self.pipeline_report.watch_queue("chunks", pending)
+
+        # Leave out the completed work unit ids, which can be large, since the
+        # context is pickled along with every chunk.
+        worker_ctx = PipelineContext(run_id=self.ctx.run_id)
+
+        with ProcessPoolExecutor(max_workers=execution.process_workers) as pool:
+
+            def submit_chunks() -> None:
+                workunits = iter(self._get_workunits())
+                while True:
+                    chunk = list(itertools.islice(workunits, chunk_size))
+                    if not chunk:
+                        return
+                    future = pool.submit(
+                        _extract_in_worker,
+                        self.extractor_class,
+                        worker_ctx,
+                        self.sink.serialized_formats,
+                        self.state is not None,
+                        pickling.dumps(chunk),
+                    )
+                    runner.put(pending, (chunk, future))
+
+            def write() -> None:
+                # Chunks are written in the order in which they were submitted, which
+                # keeps the records for any given URN in order.
+                while True:
+                    item = runner.get(pending)
+                    if item is END_OF_STREAM:
+                        return
+                    chunk, future = item
+                    results, durations = pickling.loads(future.result())
+                    for duration in durations:
+                        self.pipeline_report.report_latency("extractor", duration)
+                    for wu, record_envelopes in zip(chunk, results):
+                        self._write(wu, record_envelopes, callback)
+
+            runner.add_stage("source", submit_chunks, output=pending)
+            runner.add_stage("sink", write)
+            runner.run()
+
+    async def _run_async(self, callback: WriteCallback) -> None:
+        execution = self.config.execution
+        loop = asyncio.get_event_loop()
+        # Synchronous sources and sinks are adapted by running them on threads.
+        source_executor = ThreadPoolExecutor(max_workers=1)
+        sink_executor = ThreadPoolExecutor(max_workers=execution.sink_workers)
+
+        async def call_sink(fn: Callable, *args: Any) -> None:
+            if isinstance(self.sink, AsyncSink):
+                fn(*args)
+            else:
+                await loop.run_in_executor(sink_executor, fn, *args)
+
+        async def write(
+            wu: WorkUnit,
+            records: List[RecordEnvelope],
+            earlier_writes: List[asyncio.Future],
+        ) -> None:
+            if earlier_writes:
+                await asyncio.wait(earlier_writes)
+            await call_sink(self.sink.handle_work_unit_start, wu)
+            if isinstance(self.sink, AsyncSink):
+                await self._write_records_async(self.sink, records, callback)
+            else:
+                for record_envelopes in self._batch_records(records):
+                    await call_sink(self._write_records, record_envelopes, callback)
+            await call_sink(self.sink.handle_work_unit_end, wu)
+            self.pipeline_report.report_workunit_written()
+            if self.checkpoint is not None:
+                self.checkpoint.mark_completed(wu.id)
+
+        def forget_write(urns: Set[str], task: asyncio.Future) -> None:
+            in_flight.release()
+            for urn in urns:
+                if last_writes.get(urn) is task:
+                    del last_writes[urn]
+
         extractor: Extractor = self.extractor_class()
-        for wu in self.source.get_workunits():
-            # TODO: change extractor interface
-            extractor.configure({}, self.ctx)
-
-            self.sink.handle_work_unit_start(wu)
-            for record_envelope in extractor.get_records(wu):
-                self.sink.write_record_async(record_envelope, callback)
-            extractor.close()
-            self.sink.handle_work_unit_end(wu)
-        self.source.close()
-        self.sink.close()
+        in_flight = asyncio.Semaphore(execution.max_in_flight)
+        pending: List[asyncio.Future] = []
+        # The latest write of a work unit with records for each URN. Work units are
+        # written concurrently, except for those with records for the same URN,
+        # which wait for the earlier ones.
+        last_writes: Dict[str, asyncio.Future] = {}
+        workunits = self._get_workunits_async(source_executor)
+        try:
+            async for wu in workunits:
+                await in_flight.acquire()
+                # Fail fast instead of crawling the rest of the source.
+                for task in [task for task in pending if task.done()]:
+                    pending.remove(task)
+                    task.result()
+
+                records = list(self._drop_unchanged(self._extract(extractor, wu)))
+                urns = _get_urns(records)
+                earlier_writes = [
+                    last_writes[urn] for urn in urns if urn in last_writes
+                ]
+                task = asyncio.ensure_future(write(wu, records, earlier_writes))
+                for urn in urns:
+                    last_writes[urn] = task
+                task.add_done_callback(functools.partial(forget_write, urns))
+                pending.append(task)
+            await asyncio.gather(*pending)
+        finally:
+            for task in pending:
+                task.cancel()
+            await workunits.aclose()
+            source_executor.shutdown(wait=False)
+            sink_executor.shutdown(wait=True)
+
+    async def _write_records_async(
+        self,
+        sink: AsyncSink,
+        records: List[RecordEnvelope],
+        callback: WriteCallback,
+    ) -> None:
+        for record_envelope in records:
+            self.batcher.begin_record()
+            start = self.pipeline_report.report_write_started(record_envelope)
+            await sink.write_record(record_envelope, callback)
+            self.pipeline_report.report_latency("sink", time.perf_counter() - start)
+            self.batcher.end_record()
+
+    async def _get_workunits_async(
+        self, executor: ThreadPoolExecutor
+    ) -> AsyncGenerator[WorkUnit, None]:
+        if isinstance(self.source, AsyncSource):
+            async_workunits = self.source.get_workunits_async().__aiter__()
+            while True:
+                start = time.perf_counter()
+                try:
+                    wu = await async_workunits.__anext__()
+                except StopAsyncIteration:
+                    return
+                self.pipeline_report.report_latency(
+                    "source", time.perf_counter() - start
+                )
+                if wu.id in self.ctx.completed_workunit_ids:
+                    self.source.get_report().report_workunit_skipped(wu.id)
+                    continue
+                yield wu
+
+        loop = asyncio.get_event_loop()
+        workunits = iter(self._get_workunits())
+        get_next = functools.partial(next, workunits, None)
+        while True:
+            wu = await loop.run_in_executor(executor, get_next)
+            if wu is None:
+                return
+            yield wu
+
+    def get_sink_reports(self) -> List[Tuple[str, SinkReport]]:
+        """The report of each sink, along with its type, numbered if several sinks
+        have the same type."""
+        sink_types = [
+            sink_config.type for sink_config in self.config.get_sink_configs()
+        ]
+        if len(set(sink_types)) < len(sink_types):
+            sink_types = [f"{i}:{sink_type}" for i, sink_type in enumerate(sink_types)]
+        return [
+            (sink_type, sink.get_report())
+            for sink_type, sink in zip(sink_types, self.sinks)
+        ]
 
     def raise_from_status(self, raise_warnings=False):
         if self.source.get_report().failures:
@@ -103,17 +949,38 @@ class Pipeline:
                 "Source reported warnings", self.source.get_report()
             )
 
+    def has_failures(self) -> bool:
+        return bool(
+            self.source.get_report().failures or self.sink.get_report().failures
+        )
+
+    def has_warnings(self) -> bool:
+        return bool(
+            self.source.get_report().warnings or self.sink.get_report().warnings
+        )
+
     def pretty_print_summary(self) -> int:
         click.echo()
         click.secho("Source report:", bold=True)
         click.echo(self.source.get_report().as_string())
-        click.secho("Sink report:", bold=True)
-        click.echo(self.sink.get_report().as_string())
+        for sink_type, sink_report in self.get_sink_reports():
+            if len(self.sinks) > 1:
+                click.secho(f"Sink report ({sink_type}):", bold=True)
+            else:
+                click.secho("Sink report:", bold=True)
+            click.echo(sink_report.as_string())
+        click.secho("Pipeline report:", bold=True)
+        click.echo(self.pipeline_report.as_string())
+        if self.profiler is not None:
+            click.secho("Profile:", bold=True)
+            click.echo(self.profiler.summary())
         click.echo()
-        if self.source.get_report().failures or self.sink.get_report().failures:
+        if self.checkpoint is not None:
+            click.echo(f"Run id: {self.config.run_id} (resume with --resume)")
+        if self.has_failures():
             click.secho("Pipeline finished with failures", fg="bright_red", bold=True)
             return 1
-        elif self.source.get_report().warnings or self.sink.get_report().warnings:
+        elif self.has_warnings():
             click.secho("Pipeline finished with warnings", fg="yellow", bold=True)
             return 0
         else:
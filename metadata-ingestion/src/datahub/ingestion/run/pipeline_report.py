@@ -0,0 +1,321 @@
+import datetime
+import logging
+import math
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.api.report import Report
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# The stages of the pipeline that are timed:
+#   source    - pulling the next work unit from the source
+#   extractor - pulling the next record from the extractor
+#   sink      - handing a record to the sink
+#   callback  - from handing a record to the sink until the sink acknowledges it
+STAGES = ["source", "extractor", "sink", "callback"]
+
+# Each power of two is split into this many buckets, which bounds the relative
+# error of the reported percentiles to about 3%.
+_SUB_BUCKETS = 16
+
+
+class LatencyHistogram:
+    """
+    A histogram of durations with log-linear buckets.
+
+    Recording a value is cheap and the memory usage is constant, so this can stay
+    enabled for runs with millions of records. benchmarks/stage_timing.py measures
+    what the histograms add to a serial run.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._buckets: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        micros = seconds * 1e6
+        if micros < 1:
+            return 0
+        mantissa, exponent = math.frexp(micros)
+        return exponent * _SUB_BUCKETS + int((mantissa - 0.5) * 2 * _SUB_BUCKETS)
+
+    @staticmethod
+    def _bucket_value(bucket: int) -> float:
+        if bucket == 0:
+            return 0.0
+        exponent, sub_bucket = divmod(bucket, _SUB_BUCKETS)
+        mantissa = 0.5 + (sub_bucket + 0.5) / (2 * _SUB_BUCKETS)
+        return math.ldexp(mantissa, exponent) / 1e6
+
+    def record(self, seconds: float) -> None:
+        bucket = self._bucket(seconds)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        with self._lock:
+            buckets = sorted(self._buckets.items())
+            count = self.count
+        if count == 0:
+            return 0.0
+        rank = math.ceil(count * percent / 100)
+        seen = 0
+        for bucket, bucket_count in buckets:
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bucket_value(bucket), self.max_seconds)
+        return self.max_seconds
+
+    def cumulative_counts(self, bounds: List[float]) -> List[int]:
+        """The number of durations up to each of the given bounds, in seconds. Like
+        the percentiles, these are accurate to within a bucket."""
+        with self._lock:
+            buckets = sorted(self._buckets.items())
+        counts = []
+        for bound in bounds:
+            last_bucket = self._bucket(bound)
+            counts.append(
+                sum(count for bucket, count in buckets if bucket <= last_bucket)
+            )
+        return counts
+
+    def summary(self, elapsed_seconds: float) -> dict:
+        return {
+            "count": self.count,
+            "busy_seconds": round(self.total_seconds, 3),
+            "throughput_per_second": (
+                round(self.count / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0
+            ),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+
+class StageObserver:
+    """Is told when the pipeline enters and leaves its timed stages, on the thread
+    that runs the stage, and when it has written a work unit."""
+
+    def stage_started(self, stage: str) -> None:
+        pass
+
+    def stage_finished(self, stage: str) -> None:
+        pass
+
+    def workunit_written(self) -> None:
+        pass
+
+
+@dataclass
+class PipelineReport(Report):
+    """Latency histograms and throughput for each stage of the pipeline."""
+
+    stages: Dict[str, LatencyHistogram] = field(
+        default_factory=lambda: {stage: LatencyHistogram() for stage in STAGES}
+    )
+    start_time: float = field(default_factory=time.perf_counter)
+    end_time: Optional[float] = None
+    # Records that were dropped since they didn't change since the last run.
+    records_unchanged: int = 0
+    # Records that were merged into another record for the same URN.
+    records_coalesced: int = 0
+    # Work units whose records were all handed to the sink.
+    workunits_written: int = 0
+
+    observers: List[StageObserver] = field(default_factory=list, repr=False)
+    # The queues between the stages of the pipeline, by name.
+    _queues: Dict[str, queue.Queue] = field(default_factory=dict, repr=False)
+    # Keyed by the id of the record envelope.
+    _write_start_times: Dict[int, float] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def report_latency(self, stage: str, seconds: float) -> None:
+        self.stages[stage].record(seconds)
+
+    def timed(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Wraps an iterable, timing how long each next() call takes."""
+        histogram = self.stages[stage]
+        iterator = iter(iterable)
+        while True:
+            self.stage_started(stage)
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stage_finished(stage)
+            histogram.record(time.perf_counter() - start)
+            yield item
+
+    def stage_started(self, stage: str) -> None:
+        for observer in self.observers:
+            observer.stage_started(stage)
+
+    def stage_finished(self, stage: str) -> None:
+        for observer in self.observers:
+            observer.stage_finished(stage)
+
+    def report_write_started(self, record_envelope: RecordEnvelope) -> float:
+        start = time.perf_counter()
+        self._write_start_times[id(record_envelope)] = start
+        return start
+
+    def report_write_acknowledged(self, record_envelope: RecordEnvelope) -> None:
+        start = self._write_start_times.pop(id(record_envelope), None)
+        if start is not None:
+            self.stages["callback"].record(time.perf_counter() - start)
+
+    def report_workunit_written(self) -> None:
+        with self._lock:
+            self.workunits_written += 1
+        for observer in self.observers:
+            observer.workunit_written()
+
+    def report_record_unchanged(self) -> None:
+        with self._lock:
+            self.records_unchanged += 1
+
+    def report_records_coalesced(self, count: int) -> None:
+        with self._lock:
+            self.records_coalesced += count
+
+    def watch_queue(self, name: str, stage_queue: queue.Queue) -> None:
+        self._queues[name] = stage_queue
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        return {name: q.qsize() for name, q in list(self._queues.items())}
+
+    def report_run_started(self) -> None:
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def report_run_finished(self) -> None:
+        self.end_time = time.perf_counter()
+
+    def elapsed_seconds(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    def as_obj(self) -> dict:
+        elapsed = self.elapsed_seconds()
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "workunits_written": self.workunits_written,
+            "records_unchanged": self.records_unchanged,
+            "records_coalesced": self.records_coalesced,
+            "stages": {
+                stage: histogram.summary(elapsed)
+                for stage, histogram in self.stages.items()
+            },
+        }
+
+    def as_string(self) -> str:
+        obj = self.as_obj()
+        lines = [f"elapsed: {obj['elapsed_seconds']}s"]
+        if self.records_unchanged:
+            lines.append(f"unchanged records dropped: {self.records_unchanged}")
+        if self.records_coalesced:
+            lines.append(f"records coalesced: {self.records_coalesced}")
+        for stage, summary in obj["stages"].items():
+            lines.append(
+                f"{stage:<10} count={summary['count']:<9} "
+                f"throughput={summary['throughput_per_second']}/s "
+                f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+                f"p99={summary['p99_ms']}ms max={summary['max_ms']}ms"
+            )
+        return "\n".join(lines)
+
+
+class ProgressReporter:
+    """
+    Logs a summary of the pipeline's progress every interval_seconds, from a
+    background thread: the rate at which the sink acknowledges records, the number
+    of records in flight, and an ETA if the source can estimate its total number
+    of work units.
+    """
+
+    def __init__(
+        self,
+        report: PipelineReport,
+        interval_seconds: float,
+        get_workunits_estimate: Callable[[], Optional[int]],
+        name: Optional[str] = None,
+    ):
+        self.report = report
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.get_workunits_estimate = get_workunits_estimate
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_time = 0.0
+        self._last_records = 0
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._last_time = time.perf_counter()
+        self._last_records = 0
+        self._thread = threading.Thread(
+            target=self._run, name="datahub-progress", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                logger.info(self.get_progress())
+            except Exception as e:
+                logger.debug(f"failed to report progress: {e}")
+
+    def get_progress(self) -> str:
+        now = time.perf_counter()
+        workunits_read = self.report.stages["source"].count
+        workunits = self.report.workunits_written
+        records_sent = self.report.stages["sink"].count
+        records = self.report.stages["callback"].count
+        # Records handed to the sink which it hasn't acknowledged yet.
+        in_flight = max(records_sent - records, 0)
+
+        elapsed = now - self._last_time
+        rate = (records - self._last_records) / elapsed if elapsed > 0 else 0.0
+        self._last_time = now
+        self._last_records = records
+
+        progress = f"{self.name} progress: " if self.name is not None else "Progress: "
+        progress += (
+            f"{records} records written ({rate:.1f}/s), "
+            f"{in_flight} in flight, {workunits_read} work units read, "
+            f"{workunits} written"
+        )
+        estimate = self.get_workunits_estimate()
+        if estimate:
+            progress += f" of about {estimate}"
+            total_elapsed = self.report.elapsed_seconds()
+            if 0 < workunits < estimate and total_elapsed > 0:
+                remaining = (estimate - workunits) * total_elapsed / workunits
+                eta = datetime.timedelta(seconds=round(remaining))
+                progress += f", ETA {eta}"
+        return progress
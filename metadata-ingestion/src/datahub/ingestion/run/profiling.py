@@ -0,0 +1,244 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from abc import ABCMeta, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import validator
+
+from datahub.configuration.common import ConfigModel
+from datahub.ingestion.run.pipeline_report import StageObserver
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ["cpu", "memory"]
+
+
+class ProfilingConfig(ConfigModel):
+    # "cpu" profiles each stage of the pipeline with cProfile, and "memory" traces
+    # allocations with tracemalloc. Either slows down the run.
+    mode: Optional[str] = None
+    # The profiles are saved to a directory per run in here.
+    output_dir: str = "./datahub-profile"
+    # In "memory" mode, a snapshot of the allocations is taken every this many
+    # work units.
+    snapshot_interval_workunits: int = 1000
+    # The number of functions or allocation sites listed in the summary.
+    top: int = 10
+
+    @validator("mode")
+    def mode_is_supported(cls, mode: Optional[str]) -> Optional[str]:
+        assert (
+            mode is None or mode in PROFILE_MODES
+        ), f"mode must be one of {PROFILE_MODES}"
+        return mode
+
+    @validator("snapshot_interval_workunits", "top")
+    def is_positive(cls, val: int) -> int:
+        assert val > 0, "must be a positive number"
+        return val
+
+
+class Profiler(StageObserver, metaclass=ABCMeta):
+    def __init__(self, config: ProfilingConfig, output_dir: str):
+        self.config = config
+        self.output_dir = output_dir
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    def summary(self) -> str:
+        pass
+
+
+class CpuProfiler(Profiler):
+    """
+    Profiles the time spent in each stage of the pipeline with cProfile, and saves
+    a pstats file per stage.
+
+    cProfile only profiles the thread that enables it, so each stage gets its own
+    profiler on each thread it runs on, which are merged at the end. Work done in
+    other processes, e.g. the extractor in "process" mode, isn't profiled, and
+    neither are awaited writes to asyncio-based sinks. From Python 3.12, only one
+    profiler can be active at a time in the whole process, so stages that run
+    while another one is profiled, e.g. on other threads, go unprofiled. These
+    are logged, and listed in the summary.
+    """
+
+    def __init__(self, config: ProfilingConfig, output_dir: str):
+        super().__init__(config, output_dir)
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats: Dict[str, pstats.Stats] = {}
+        # How often each stage went unprofiled.
+        self.skipped_stages: Dict[str, int] = {}
+
+    def stage_started(self, stage: str) -> None:
+        key = (stage, threading.get_ident())
+        with self._lock:
+            if key not in self._profiles:
+                self._profiles[key] = cProfile.Profile()
+            profile = self._profiles[key]
+        try:
+            profile.enable()
+            self._local.profile = profile
+        except ValueError:
+            # From Python 3.12, only one profiler can be active at a time.
+            self._local.profile = None
+            with self._lock:
+                skipped = self.skipped_stages.get(stage, 0)
+                self.skipped_stages[stage] = skipped + 1
+            if not skipped:
+                logger.warning(
+                    f"Not profiling some runs of stage {stage}, since another "
+                    "profiler is active"
+                )
+
+    def stage_finished(self, stage: str) -> None:
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile.disable()
+            self._local.profile = None
+
+    def stop(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._lock:
+            profiles = list(self._profiles.items())
+        for (stage, _), profile in profiles:
+            if stage in self.stats:
+                self.stats[stage].add(profile)
+            else:
+                self.stats[stage] = pstats.Stats(profile, stream=io.StringIO())
+        for stage, stats in self.stats.items():
+            stats.dump_stats(os.path.join(self.output_dir, f"{stage}.pstats"))
+        logger.info(f"Saved CPU profiles to {self.output_dir}")
+
+    def summary(self) -> str:
+        lines = [f"CPU profiles saved to {self.output_dir}"]
+        for stage, stats in self.stats.items():
+            stream = io.StringIO()
+            stats.stream = stream  # type: ignore[attr-defined]
+            stats.sort_stats("cumulative").print_stats(self.config.top)
+            lines.append(f"Stage {stage}:")
+            # Skip the header that pstats prints before the table.
+            table = stream.getvalue().split("\n\n", 2)[-1]
+            lines.append(table.rstrip())
+        if self.skipped_stages:
+            lines.append(
+                "Not profiled, since another profiler was active: "
+                + ", ".join(
+                    f"{stage} ({count} times)"
+                    for stage, count in self.skipped_stages.items()
+                )
+            )
+        return "\n".join(lines)
+
+
+def _get_peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows.
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryProfiler(Profiler):
+    """
+    Traces memory allocations with tracemalloc, taking a snapshot every
+    snapshot_interval_workunits work units. The summary lists the peak RSS, the top
+    allocation sites at the end of the run, and the sites that changed the most since
+    the first snapshot. The last snapshot is saved, and can be loaded with
+    tracemalloc.Snapshot.load().
+    """
+
+    def __init__(self, config: ProfilingConfig, output_dir: str):
+        super().__init__(config, output_dir)
+        self._lock = threading.Lock()
+        self._workunits = 0
+        self._first_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshots_taken = 0
+        self.peak_traced_bytes = 0
+
+    def start(self) -> None:
+        tracemalloc.start(10)
+
+    def workunit_written(self) -> None:
+        with self._lock:
+            self._workunits += 1
+            if self._workunits % self.config.snapshot_interval_workunits == 0:
+                self._take_snapshot()
+
+    def _take_snapshot(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        if self._first_snapshot is None:
+            self._first_snapshot = snapshot
+        self._last_snapshot = snapshot
+        self.snapshots_taken += 1
+
+    def stop(self) -> None:
+        with self._lock:
+            self._take_snapshot()
+        self.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert self._last_snapshot is not None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "memory.tracemalloc")
+        self._last_snapshot.dump(path)
+        logger.info(f"Saved the last memory snapshot to {path}")
+
+    def summary(self) -> str:
+        lines = [f"Memory snapshots taken: {self.snapshots_taken}"]
+        peak_rss = _get_peak_rss_bytes()
+        if peak_rss is not None:
+            lines.append(f"Peak RSS: {_format_bytes(peak_rss)}")
+        lines.append(f"Peak traced memory: {_format_bytes(self.peak_traced_bytes)}")
+        if self._last_snapshot is None:
+            return "\n".join(lines)
+
+        lines.append("Top allocation sites:")
+        for stat in self._last_snapshot.statistics("lineno")[: self.config.top]:
+            lines.append(
+                f"  {stat.traceback[0]}: {_format_bytes(stat.size)} "
+                f"in {stat.count} blocks"
+            )
+        if self._first_snapshot is not None and self.snapshots_taken > 1:
+            lines.append("Largest changes since the first snapshot:")
+            differences: List[tracemalloc.StatisticDiff] = (
+                self._last_snapshot.compare_to(self._first_snapshot, "lineno")
+            )
+            for diff in differences[: self.config.top]:
+                lines.append(f"  {diff.traceback[0]}: {_format_bytes(diff.size_diff)}")
+        return "\n".join(lines)
+
+
+def create_profiler(config: ProfilingConfig, run_id: str) -> Optional[Profiler]:
+    output_dir = os.path.join(config.output_dir, run_id)
+    if config.mode == "cpu":
+        return CpuProfiler(config, output_dir)
+    elif config.mode == "memory":
+        return MemoryProfiler(config, output_dir)
+    return None
@@ -0,0 +1,171 @@
+import logging
+import pathlib
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+import click
+
+from datahub.configuration.config_loader import load_config_file
+from datahub.ingestion.api.common import SharedResources
+from datahub.ingestion.run.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+RECIPE_SUFFIXES = [".yml", ".yaml", ".toml"]
+
+
+@dataclass
+class RecipeResult:
+    recipe: str
+    pipeline: Optional[Pipeline] = None
+    # Set if the recipe couldn't be loaded or its pipeline raised an error.
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def status(self) -> str:
+        if self.error is not None or self.pipeline is None:
+            return "error"
+        elif self.pipeline.has_failures():
+            return "failures"
+        elif self.pipeline.has_warnings():
+            return "warnings"
+        return "success"
+
+
+def find_recipes(paths: Iterable[str]) -> List[pathlib.Path]:
+    """Expands directories into the recipes they contain, in alphabetical order."""
+    recipes = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            recipes.extend(
+                sorted(
+                    child
+                    for child in path.iterdir()
+                    if child.is_file() and child.suffix in RECIPE_SUFFIXES
+                )
+            )
+        else:
+            recipes.append(path)
+    return recipes
+
+
+def run_recipes(
+    recipes: List[pathlib.Path],
+    max_concurrency: int,
+    shared_resources: Optional[SharedResources] = None,
+) -> List[RecipeResult]:
+    """
+    Runs the pipelines of several recipes in this process, at most max_concurrency
+    at a time. Plugins are only imported once, and the pipelines share resources
+    such as HTTP sessions and Kafka producers.
+    """
+    if shared_resources is None:
+        shared_resources = SharedResources()
+
+    def run_recipe(recipe: pathlib.Path) -> RecipeResult:
+        result = RecipeResult(recipe=str(recipe))
+        start = time.perf_counter()
+        try:
+            pipeline_config = load_config_file(recipe)
+            result.pipeline = Pipeline.create(
+                pipeline_config, name=recipe.stem, shared_resources=shared_resources
+            )
+            result.pipeline.run()
+        except Exception as e:
+            logger.exception(f"Recipe {recipe} failed")
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="datahub-recipe"
+    ) as executor:
+        return list(executor.map(run_recipe, recipes))
+
+
+def run_daemon(
+    recipes: List[pathlib.Path],
+    interval_seconds: float,
+    max_concurrency: int,
+    max_runs: Optional[int] = None,
+) -> int:
+    """
+    Runs the recipes every interval_seconds, until interrupted or terminated, and
+    returns the exit code of the last run. The recipes are read again for every
+    run, but connections and clients are kept between runs, so that their pools
+    and caches stay warm.
+    """
+    shared_resources = SharedResources()
+    stopped = threading.Event()
+
+    def stop(signum: int, frame: Any) -> None:
+        logger.info("Stopping after the current run")
+        stopped.set()
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    ret = 0
+    runs = 0
+    try:
+        while not stopped.is_set():
+            started_at = time.monotonic()
+            results = run_recipes(recipes, max_concurrency, shared_resources)
+            ret = pretty_print_summary(results)
+            runs += 1
+            if max_runs is not None and runs >= max_runs:
+                break
+            wait_seconds = max(0.0, started_at + interval_seconds - time.monotonic())
+            logger.info(f"Next run in {wait_seconds:.0f}s")
+            stopped.wait(wait_seconds)
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        shared_resources.close()
+    return ret
+
+
+def pretty_print_summary(results: List[RecipeResult]) -> int:
+    click.echo()
+    click.secho("Recipes:", bold=True)
+    for result in results:
+        line = f"{result.recipe}: {result.status} in {result.elapsed_seconds:.1f}s"
+        if result.pipeline is not None:
+            pipeline = result.pipeline
+            records_written = sum(
+                getattr(report, "records_written", 0)
+                for _, report in pipeline.get_sink_reports()
+            )
+            line += (
+                f", {getattr(pipeline.source.get_report(), 'workunits_produced', 0)}"
+                f" work units, {records_written} records written"
+            )
+            if pipeline.checkpoint is not None:
+                line += f", run {pipeline.config.run_id}"
+        click.echo(line)
+        if result.error is not None:
+            click.echo(f"    {result.error}")
+
+    failed = [result for result in results if result.status in ["error", "failures"]]
+    click.echo()
+    if failed:
+        click.secho(
+            f"{len(failed)} of {len(results)} pipelines finished with failures",
+            fg="bright_red",
+            bold=True,
+        )
+        return 1
+    elif any(result.status == "warnings" for result in results):
+        click.secho(
+            f"{len(results)} pipelines finished with warnings", fg="yellow", bold=True
+        )
+        return 0
+    else:
+        click.secho(
+            f"{len(results)} pipelines finished successfully", fg="green", bold=True
+        )
+        return 0
@@ -0,0 +1,140 @@
+import concurrent.futures
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often blocked queue operations wake up to check whether the run was aborted.
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+class _EndOfStream:
+    def __repr__(self) -> str:
+        return "END_OF_STREAM"
+
+
+END_OF_STREAM: Any = _EndOfStream()
+
+
+class StageAborted(Exception):
+    """Raised inside a stage when another stage failed and the run is shutting down"""
+
+
+class StageRunner:
+    """
+    Runs the stages of a pipeline on worker threads that are joined by bounded queues.
+
+    Each stage is a function that is called once per worker thread. It should pull
+    items using get() until it sees END_OF_STREAM, and push its output using put().
+    Since the queues are bounded, a slow stage blocks the stages that feed it.
+    When every worker of a stage has returned, one END_OF_STREAM marker is sent to
+    each consumer of the stage's output queue. The first exception raised by any
+    stage aborts the run and is re-raised from run().
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._threads: List[threading.Thread] = []
+        self._aborted = threading.Event()
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+
+    def new_queue(self) -> queue.Queue:
+        return queue.Queue(maxsize=self.queue_size)
+
+    def put(self, q: queue.Queue, item: Any) -> None:
+        while True:
+            if self._aborted.is_set():
+                raise StageAborted()
+            try:
+                q.put(item, timeout=_POLL_INTERVAL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q: queue.Queue) -> Any:
+        while True:
+            if self._aborted.is_set():
+                raise StageAborted()
+            try:
+                return q.get(timeout=_POLL_INTERVAL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def wait(self, event: threading.Event) -> None:
+        while not event.wait(_POLL_INTERVAL_SECONDS):
+            if self._aborted.is_set():
+                raise StageAborted()
+
+    def result(self, future: concurrent.futures.Future) -> Any:
+        while True:
+            if self._aborted.is_set():
+                raise StageAborted()
+            try:
+                return future.result(timeout=_POLL_INTERVAL_SECONDS)
+            except concurrent.futures.TimeoutError:
+                continue
+
+    def abort(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._error is None and error is not None:
+                self._error = error
+        self._aborted.set()
+
+    def add_stage(
+        self,
+        name: str,
+        target: Callable[[], None],
+        workers: int = 1,
+        output: Optional[queue.Queue] = None,
+        consumers: int = 1,
+    ) -> None:
+        remaining = [workers]
+
+        def worker() -> None:
+            try:
+                target()
+            except StageAborted:
+                return
+            except BaseException as e:
+                logger.error(f"pipeline stage {name} failed: {e}")
+                self.abort(e)
+                return
+
+            with self._lock:
+                remaining[0] -= 1
+                is_last = remaining[0] == 0
+            if is_last and output is not None:
+                try:
+                    for _ in range(consumers):
+                        self.put(output, END_OF_STREAM)
+                except StageAborted:
+                    pass
+
+        for i in range(workers):
+            thread = threading.Thread(
+                target=worker, name=f"datahub-{name}-{i}", daemon=True
+            )
+            self._threads.append(thread)
+
+    def run(self) -> None:
+        self.start()
+        self.join()
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        try:
+            for thread in self._threads:
+                thread.join()
+        except BaseException as e:
+            # Most likely a KeyboardInterrupt. Make sure the worker threads wind down.
+            self.abort(e)
+            raise
+
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# AuditStamps are recognized by these fields. Their time changes on every run, even
+# if nothing else did, so it is left out of the content hashes.
+_AUDIT_STAMP_FIELDS = {"time", "actor"}
+
+
+def _without_audit_times(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {
+            key: _without_audit_times(value)
+            for key, value in obj.items()
+            if not (key == "time" and _AUDIT_STAMP_FIELDS.issubset(obj.keys()))
+        }
+    elif isinstance(obj, list):
+        return [_without_audit_times(item) for item in obj]
+    return obj
+
+
+def get_aspect_hashes(mce: Any) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    Returns the URN of a MetadataChangeEvent's snapshot and a stable content hash of
+    each of its aspects, keyed by the aspect's type. Returns None for records which
+    aren't snapshots.
+    """
+
+    snapshot = getattr(mce, "proposedSnapshot", None)
+    if snapshot is None:
+        return None
+
+    snapshot_obj = snapshot.to_obj()
+    hashes = {}
+    for aspect in snapshot_obj["aspects"]:
+        # Aspects are unions, so each one is encoded as {type: value}.
+        for aspect_type, value in aspect.items():
+            content = json.dumps(
+                _without_audit_times(value), sort_keys=True, separators=(",", ":")
+            )
+            hashes[aspect_type] = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    return snapshot_obj["urn"], hashes
+
+
+class IngestionStateStore:
+    """
+    Remembers the content hashes of the aspects a pipeline wrote to its sink in
+    earlier runs, in a local SQLite database, so that unchanged records can be
+    skipped. The state of different pipelines is kept apart by a state key.
+
+    Hashes are only saved once the sink has acknowledged the record, and they are
+    buffered until commit() is called at the end of each batch.
+    """
+
+    def __init__(self, path: str, state_key: str):
+        self.path = os.path.expanduser(path)
+        self.state_key = state_key
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Records are acknowledged by the sink from whichever thread it uses.
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS aspect_hashes ("
+            "state_key TEXT NOT NULL, urn TEXT NOT NULL, aspect TEXT NOT NULL, "
+            "hash TEXT NOT NULL, PRIMARY KEY (state_key, urn, aspect))"
+        )
+        self._connection.commit()
+
+        self._lock = threading.Lock()
+        self._written: List[Tuple[str, str, str, str]] = []
+
+    def is_unchanged(self, urn: str, hashes: Dict[str, str]) -> bool:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT aspect, hash FROM aspect_hashes WHERE state_key = ? AND urn = ?",
+                (self.state_key, urn),
+            )
+            previous_hashes = dict(rows)
+        return all(
+            previous_hashes.get(aspect) == content_hash
+            for aspect, content_hash in hashes.items()
+        )
+
+    def record_written(self, urn: str, hashes: Dict[str, str]) -> None:
+        with self._lock:
+            self._written.extend(
+                (self.state_key, urn, aspect, content_hash)
+                for aspect, content_hash in hashes.items()
+            )
+
+    def commit(self) -> None:
+        with self._lock:
+            written = self._written
+            self._written = []
+            if not written:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO aspect_hashes (state_key, urn, aspect, hash) "
+                    "VALUES (?, ?, ?, ?)",
+                    written,
+                )
+        logger.debug(f"Saved {len(written)} aspect hashes for {self.state_key}")
+
+    def close(self) -> None:
+        self.commit()
+        with self._lock:
+            self._connection.close()
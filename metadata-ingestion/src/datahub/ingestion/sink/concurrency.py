@@ -0,0 +1,163 @@
+import collections
+import threading
+import time
+from typing import Deque, Hashable, Optional, Set, Tuple
+
+from pydantic import validator
+
+from datahub.configuration.common import ConfigModel
+
+
+class AdaptiveConcurrencyConfig(ConfigModel):
+    # If enabled, the sink keeps several writes in flight at once, and adapts how
+    # many based on the latency and errors it observes.
+    enabled: bool = False
+    min_concurrency: int = 1
+    max_concurrency: int = 32
+    # A write that takes longer than this multiple of the lowest latency seen in
+    # the last baseline_window_seconds counts as a sign of overload, just like an
+    # error does.
+    latency_tolerance: float = 2.0
+    baseline_window_seconds: float = 60.0
+    # The concurrency is multiplied by this on overload.
+    backoff_factor: float = 0.5
+
+    @validator("min_concurrency")
+    def is_positive(cls, val: int) -> int:
+        assert val > 0, "must be a positive number"
+        return val
+
+    @validator("max_concurrency")
+    def is_at_least_min_concurrency(cls, val: int, values: dict) -> int:
+        assert val >= values.get("min_concurrency", 1), "must be >= min_concurrency"
+        return val
+
+    @validator("latency_tolerance")
+    def is_greater_than_one(cls, val: float) -> float:
+        assert val > 1, "must be greater than 1"
+        return val
+
+    @validator("baseline_window_seconds")
+    def is_positive_duration(cls, val: float) -> float:
+        assert val > 0, "must be a positive number"
+        return val
+
+    @validator("backoff_factor")
+    def is_fraction(cls, val: float) -> float:
+        assert 0 < val < 1, "must be between 0 and 1"
+        return val
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of writes in flight, adapting the limit with additive increase
+    and multiplicative decrease (AIMD), like TCP's congestion control does.
+
+    Every successful write that is fast enough raises the limit by 1 / limit, so
+    that it grows by one for every limit writes. An error, or a write whose latency
+    exceeds latency_tolerance times the lowest latency seen in the last
+    baseline_window_seconds, multiplies the limit by backoff_factor. Slow writes
+    count towards that baseline too, so that it follows a server that got slower
+    for good instead of backing off forever. Writes that started before the last decrease can't trigger
+    another one, so that one burst of slow writes only halves the limit once.
+
+    Writes may pass a key, such as a URN. Writes with the same key are never in
+    flight at the same time, which keeps them in order.
+    """
+
+    def __init__(self, config: AdaptiveConcurrencyConfig):
+        self.config = config
+        self.limit = float(config.min_concurrency)
+        self.in_flight = 0
+        self.decreases = 0
+
+        self._condition = threading.Condition()
+        self._keys: Set[Hashable] = set()
+        # The latencies of the writes in the baseline window, as (end, latency).
+        # Only those that may still become the lowest one are kept, so that the
+        # first one is the lowest.
+        self._latencies: Deque[Tuple[float, float]] = collections.deque()
+        self._last_decrease = 0.0
+
+    @property
+    def current_concurrency(self) -> int:
+        return int(self.limit)
+
+    def _can_acquire(self, key: Optional[Hashable]) -> bool:
+        return self.in_flight < int(self.limit) and (
+            key is None or key not in self._keys
+        )
+
+    def _acquired(self, key: Optional[Hashable]) -> float:
+        self.in_flight += 1
+        if key is not None:
+            self._keys.add(key)
+        return time.perf_counter()
+
+    def acquire(self, key: Optional[Hashable] = None) -> float:
+        """Blocks until the write may start. Returns its start time, which must be
+        passed to release() once it is done."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._can_acquire(key))
+            return self._acquired(key)
+
+    def try_acquire(self, key: Optional[Hashable] = None) -> Optional[float]:
+        """Like acquire(), but returns None instead of blocking."""
+        with self._condition:
+            if not self._can_acquire(key):
+                return None
+            return self._acquired(key)
+
+    def release(
+        self,
+        start: float,
+        key: Optional[Hashable] = None,
+        overloaded: bool = False,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Ends a write. Its latency defaults to the time since start, and writers
+        that hold on to a slot for several writes should pass the slowest one's."""
+        now = time.perf_counter()
+        if latency is None:
+            latency = now - start
+        with self._condition:
+            self.in_flight -= 1
+            if key is not None:
+                self._keys.discard(key)
+
+            if not overloaded:
+                baseline = self._get_baseline(now)
+                overloaded = (
+                    baseline is not None
+                    and latency > baseline * self.config.latency_tolerance
+                )
+                # Failed writes are left out, since they may fail fast.
+                self._add_latency(now, latency)
+
+            if not overloaded:
+                self.limit = min(
+                    self.limit + 1 / self.limit, float(self.config.max_concurrency)
+                )
+            elif start >= self._last_decrease:
+                self.limit = max(
+                    self.limit * self.config.backoff_factor,
+                    float(self.config.min_concurrency),
+                )
+                self._last_decrease = now
+                self.decreases += 1
+            self._condition.notify_all()
+
+    def _get_baseline(self, now: float) -> Optional[float]:
+        window_start = now - self.config.baseline_window_seconds
+        while self._latencies and self._latencies[0][0] < window_start:
+            self._latencies.popleft()
+        return self._latencies[0][1] if self._latencies else None
+
+    def _add_latency(self, now: float, latency: float) -> None:
+        while self._latencies and self._latencies[-1][1] >= latency:
+            self._latencies.pop()
+        self._latencies.append((now, latency))
+
+    def wait_until_idle(self) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight == 0)
@@ -1,5 +1,6 @@
 import dataclasses
 import logging
+from typing import List
 
 from datahub.ingestion.api.common import RecordEnvelope
 from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
@@ -29,6 +30,14 @@ class ConsoleSink(Sink):
             self.report.report_record_written(record_envelope)
             write_callback.on_success(record_envelope, {})
 
+    def write_records_batch(
+        self, record_envelopes: List[RecordEnvelope], write_callback: WriteCallback
+    ):
+        print("\n".join(f"{record_envelope}" for record_envelope in record_envelopes))
+        for record_envelope in record_envelopes:
+            self.report.report_record_written(record_envelope)
+            write_callback.on_success(record_envelope, {})
+
     def get_report(self):
         return self.report
 
@@ -1,16 +1,34 @@
+import functools
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
-from datahub.emitter.kafka_emitter import DatahubKafkaEmitter, KafkaEmitterConfig
-from datahub.ingestion.api.common import PipelineContext, RecordEnvelope, WorkUnit
+from pydantic import Field
+
+from datahub.emitter import serialization
+from datahub.emitter.kafka_emitter import (
+    DatahubKafkaEmitter,
+    KafkaEmitterConfig,
+    create_producer,
+)
+from datahub.ingestion.api.common import (
+    PipelineContext,
+    RecordEnvelope,
+    WorkUnit,
+    get_shared_resource,
+)
 from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
+from datahub.ingestion.sink.concurrency import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+)
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 
 
 class KafkaSinkConfig(KafkaEmitterConfig):
-    # This extra layer of indirection exists in case we need to add extra
-    # config options to the sink config.
-    pass
+    # Limits the number of messages awaiting delivery.
+    concurrency: AdaptiveConcurrencyConfig = Field(
+        default_factory=AdaptiveConcurrencyConfig
+    )
 
 
 @dataclass
@@ -18,8 +36,15 @@ class _KafkaCallback:
     reporter: SinkReport
     record_envelope: RecordEnvelope
     write_callback: WriteCallback
+    limiter: Optional[AdaptiveConcurrencyLimiter] = None
+    start: float = 0.0
 
     def kafka_callback(self, err: Optional[Exception], msg: str) -> None:
+        if self.limiter is not None:
+            self.limiter.release(self.start, overloaded=err is not None)
+            self.reporter.report_concurrency(
+                self.limiter.current_concurrency, self.limiter.decreases
+            )
         if err is not None:
             self.reporter.report_failure(err)
             self.write_callback.on_failure(
@@ -36,11 +61,21 @@ class DatahubKafkaSink(Sink):
     report: SinkReport
     emitter: DatahubKafkaEmitter
 
+    serialized_formats = [serialization.AVRO_TUPLES]
+
     def __init__(self, config: KafkaSinkConfig, ctx):
         super().__init__(ctx)
         self.config = config
         self.report = SinkReport()
-        self.emitter = DatahubKafkaEmitter(self.config)
+        producer = get_shared_resource(
+            ctx,
+            ("kafka-producer", self.config.connection.json(sort_keys=True)),
+            functools.partial(create_producer, self.config.connection),
+        )
+        self.emitter = DatahubKafkaEmitter(self.config, producer)
+        self.limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        if self.config.concurrency.enabled:
+            self.limiter = AdaptiveConcurrencyLimiter(self.config.concurrency)
 
     @classmethod
     def create(cls, config_dict, ctx: PipelineContext):
@@ -51,6 +86,9 @@ class DatahubKafkaSink(Sink):
         pass
 
     def handle_work_unit_end(self, workunit: WorkUnit) -> None:
+        pass
+
+    def handle_batch_end(self) -> None:
         self.emitter.flush()
 
     def write_record_async(
@@ -59,11 +97,51 @@ class DatahubKafkaSink(Sink):
         write_callback: WriteCallback,
     ):
         mce = record_envelope.record
-        self.emitter.emit_mce_async(
-            mce,
-            callback=_KafkaCallback(
-                self.report, record_envelope, write_callback
-            ).kafka_callback,
+        callback = _KafkaCallback(self.report, record_envelope, write_callback)
+        if self.limiter is not None:
+            callback.limiter = self.limiter
+            while True:
+                start = self.limiter.try_acquire()
+                if start is not None:
+                    callback.start = start
+                    break
+                # Delivery callbacks, which free up room, only run while polling.
+                self.emitter.producer.poll(0.1)
+
+        try:
+            self.emitter.emit_mce_async(
+                mce,
+                callback=callback.kafka_callback,
+                serialized_value=record_envelope.serialized.get(
+                    serialization.AVRO_TUPLES
+                ),
+            )
+        except Exception:
+            if self.limiter is not None:
+                self.limiter.release(callback.start, overloaded=True)
+            raise
+
+    def write_records_batch(
+        self,
+        record_envelopes: List[RecordEnvelope[MetadataChangeEvent]],
+        write_callback: WriteCallback,
+    ) -> None:
+        if self.limiter is not None:
+            # Every message has to wait for room under the limit.
+            super().write_records_batch(record_envelopes, write_callback)
+            return
+
+        self.emitter.emit_mces_async(
+            [
+                (
+                    record_envelope.record,
+                    _KafkaCallback(
+                        self.report, record_envelope, write_callback
+                    ).kafka_callback,
+                    record_envelope.serialized.get(serialization.AVRO_TUPLES),
+                )
+                for record_envelope in record_envelopes
+            ]
         )
 
     def get_report(self):
@@ -1,10 +1,29 @@
+import concurrent.futures
 import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from pydantic import Field
+from requests import Session
+from requests.exceptions import HTTPError
 
 from datahub.configuration.common import ConfigModel, OperationalError
+from datahub.emitter import serialization
 from datahub.emitter.rest_emitter import DatahubRestEmitter
-from datahub.ingestion.api.common import PipelineContext, RecordEnvelope, WorkUnit
+from datahub.ingestion.api.common import (
+    PipelineContext,
+    RecordEnvelope,
+    WorkUnit,
+    get_shared_resource,
+)
 from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
+from datahub.ingestion.sink.concurrency import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+)
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 
 logger = logging.getLogger(__name__)
@@ -14,6 +33,19 @@ class DatahubRestSinkConfig(ConfigModel):
     """Configuration class for holding connectivity to datahub gms"""
 
     server: str = "http://localhost:8080"
+    concurrency: AdaptiveConcurrencyConfig = Field(
+        default_factory=AdaptiveConcurrencyConfig
+    )
+
+
+def _is_overload(e: Exception) -> bool:
+    # Rejected requests say nothing about the load on GMS, unlike server errors,
+    # throttling, timeouts and refused connections.
+    cause = e.__cause__
+    if isinstance(cause, HTTPError) and cause.response is not None:
+        status = cause.response.status_code
+        return status >= 500 or status == 429
+    return True
 
 
 @dataclass
@@ -22,11 +54,29 @@ class DatahubRestSink(Sink):
     emitter: DatahubRestEmitter
     report: SinkReport
 
+    serialized_formats = [serialization.RESTLI_JSON]
+
     def __init__(self, ctx: PipelineContext, config: DatahubRestSinkConfig):
         super().__init__(ctx)
         self.config = config
         self.report = SinkReport()
-        self.emitter = DatahubRestEmitter(self.config.server)
+        session = get_shared_resource(
+            ctx, ("requests-session", self.config.server), Session
+        )
+        self.emitter = DatahubRestEmitter(self.config.server, session)
+
+        self.limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if self.config.concurrency.enabled:
+            self.limiter = AdaptiveConcurrencyLimiter(self.config.concurrency)
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.config.concurrency.max_concurrency,
+                thread_name_prefix="datahub-rest",
+            )
+        # The writes in flight, by URN. Failed writes stay here until they have
+        # been reported.
+        self._writes: Dict[Future, str] = {}
+        self._writes_lock = threading.Lock()
 
     @classmethod
     def create(cls, config_dict: dict, ctx: PipelineContext):
@@ -39,26 +89,128 @@ class DatahubRestSink(Sink):
     def handle_work_unit_end(self, workunit: WorkUnit) -> None:
         pass
 
+    def handle_batch_end(self) -> None:
+        # The batch is only done once all of its writes are.
+        self._check_writes()
+
     def write_record_async(
         self,
         record_envelope: RecordEnvelope[MetadataChangeEvent],
         write_callback: WriteCallback,
     ):
+        if self.limiter is None or self.executor is None:
+            self._write(record_envelope, write_callback)
+            return
+
+        # Writes for the same URN are kept in order.
+        urn = record_envelope.record.proposedSnapshot.urn
+        self._submit_write(urn, [record_envelope], write_callback)
+
+    def write_records_batch(
+        self,
+        record_envelopes: List[RecordEnvelope[MetadataChangeEvent]],
+        write_callback: WriteCallback,
+    ) -> None:
+        if self.limiter is None or self.executor is None:
+            super().write_records_batch(record_envelopes, write_callback)
+            return
+
+        # The records for each URN are written one after the other by a single
+        # task, so that they don't hold up the records for other URNs.
+        records_by_urn: Dict[str, List[RecordEnvelope[MetadataChangeEvent]]] = {}
+        for record_envelope in record_envelopes:
+            urn = record_envelope.record.proposedSnapshot.urn
+            records_by_urn.setdefault(urn, []).append(record_envelope)
+        for urn, urn_record_envelopes in records_by_urn.items():
+            self._submit_write(urn, urn_record_envelopes, write_callback)
+
+    def _submit_write(
+        self,
+        urn: str,
+        record_envelopes: List[RecordEnvelope[MetadataChangeEvent]],
+        write_callback: WriteCallback,
+    ) -> None:
+        assert self.limiter is not None and self.executor is not None
+        start = self.limiter.acquire(urn)
+        future = self.executor.submit(
+            self._write_limited, start, urn, record_envelopes, write_callback
+        )
+        with self._writes_lock:
+            self._writes[future] = urn
+        future.add_done_callback(self._forget_write)
+
+    def _forget_write(self, future: Future) -> None:
+        if future.exception() is None:
+            with self._writes_lock:
+                self._writes.pop(future, None)
+
+    def _check_writes(self) -> None:
+        """Waits for the writes in flight, and reports those that raised."""
+        with self._writes_lock:
+            writes = dict(self._writes)
+        concurrent.futures.wait(writes)
+        for future, urn in writes.items():
+            e = future.exception()
+            if e is not None:
+                logger.error(f"Failed to write the records for {urn}", exc_info=e)
+                self.report.report_failure({"urn": urn, "e": e})
+        with self._writes_lock:
+            for future in writes:
+                self._writes.pop(future, None)
+
+    def _write_limited(
+        self,
+        start: float,
+        urn: str,
+        record_envelopes: List[RecordEnvelope[MetadataChangeEvent]],
+        write_callback: WriteCallback,
+    ) -> None:
+        assert self.limiter is not None
+        overloaded = False
+        max_latency = 0.0
+        try:
+            for record_envelope in record_envelopes:
+                write_start = time.perf_counter()
+                if self._write(record_envelope, write_callback):
+                    overloaded = True
+                max_latency = max(max_latency, time.perf_counter() - write_start)
+        except Exception:
+            overloaded = True
+            raise
+        finally:
+            self.limiter.release(start, urn, overloaded, max_latency)
+            self.report.report_concurrency(
+                self.limiter.current_concurrency, self.limiter.decreases
+            )
+
+    def _write(
+        self,
+        record_envelope: RecordEnvelope[MetadataChangeEvent],
+        write_callback: WriteCallback,
+    ) -> bool:
+        """Writes the record, and returns whether it failed due to overload."""
         mce = record_envelope.record
 
         try:
-            self.emitter.emit_mce(mce)
+            self.emitter.emit_mce(
+                mce, record_envelope.get_serialized(serialization.RESTLI_JSON)
+            )
             self.report.report_record_written(record_envelope)
             write_callback.on_success(record_envelope, {})
+            return False
         except OperationalError as e:
             self.report.report_failure({"error": e.message, "info": e.info})
             write_callback.on_failure(record_envelope, e, e.info)
+            return _is_overload(e)
         except Exception as e:
             self.report.report_failure({"e": e})
             write_callback.on_failure(record_envelope, e, {})
+            return False
 
     def get_report(self) -> SinkReport:
         return self.report
 
     def close(self):
-        pass
+        if self.executor is not None:
+            self._check_writes()
+            self.executor.shutdown(wait=True)
@@ -1,8 +1,9 @@
-import json
 import logging
 import pathlib
+from typing import List
 
 from datahub.configuration.common import ConfigModel
+from datahub.emitter import serialization
 from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
 from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
@@ -18,6 +19,8 @@ class FileSink(Sink):
     config: FileSinkConfig
     report: SinkReport
 
+    serialized_formats = [serialization.JSON]
+
     def __init__(self, ctx: PipelineContext, config: FileSinkConfig):
         super().__init__(ctx)
         self.config = config
@@ -39,18 +42,20 @@ class FileSink(Sink):
     def handle_work_unit_end(self, wu):
         pass
 
+    def _get_payload(self, record_envelope: RecordEnvelope[MetadataChangeEvent]) -> str:
+        return record_envelope.get_serialized(serialization.JSON)
+
     def write_record_async(
         self,
         record_envelope: RecordEnvelope[MetadataChangeEvent],
         write_callback: WriteCallback,
     ) -> None:
-        mce = record_envelope.record
-        obj = mce.to_obj()
+        payload = self._get_payload(record_envelope)
 
         if self.wrote_something:
             self.file.write(",\n")
 
-        json.dump(obj, self.file, indent=4)
+        self.file.write(payload)
         self.wrote_something = True
 
         # record_string = str(record_envelope.record)
@@ -60,6 +65,26 @@ class FileSink(Sink):
         self.report.report_record_written(record_envelope)
         write_callback.on_success(record_envelope, {})
 
+    def write_records_batch(
+        self,
+        record_envelopes: List[RecordEnvelope[MetadataChangeEvent]],
+        write_callback: WriteCallback,
+    ) -> None:
+        if not record_envelopes:
+            return
+        # Writes the whole batch at once.
+        payloads = [
+            self._get_payload(record_envelope) for record_envelope in record_envelopes
+        ]
+        if self.wrote_something:
+            self.file.write(",\n")
+        self.file.write(",\n".join(payloads))
+        self.wrote_something = True
+
+        for record_envelope in record_envelopes:
+            self.report.report_record_written(record_envelope)
+            write_callback.on_success(record_envelope, {})
+
     def get_report(self):
         return self.report
 
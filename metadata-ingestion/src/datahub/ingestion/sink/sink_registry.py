@@ -4,6 +4,6 @@ from datahub.ingestion.api.sink import Sink
 sink_registry = Registry[Sink]()
 sink_registry.load("datahub.ingestion.sink.plugins")
 
-# These sinks are always enabled
-assert sink_registry.get("console")
-assert sink_registry.get("file")
+# These sinks are always enabled. Plugins are only imported once they are used.
+assert "console" in sink_registry.mapping
+assert "file" in sink_registry.mapping
@@ -1,7 +1,8 @@
+import functools
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
 import confluent_kafka
 from confluent_kafka.schema_registry.schema_registry_client import SchemaRegistryClient
@@ -10,8 +11,9 @@ import datahub.ingestion.extractor.schema_util as schema_util
 from datahub.configuration import ConfigModel
 from datahub.configuration.common import AllowDenyPattern
 from datahub.configuration.kafka import KafkaConsumerConnectionConfig
-from datahub.ingestion.api.common import PipelineContext
-from datahub.ingestion.api.source import Source, SourceReport
+from datahub.ingestion.api.common import PipelineContext, get_shared_resource
+from datahub.ingestion.api.report import LossyList
+from datahub.ingestion.api.source import Source, SourcePartition, SourceReport
 from datahub.ingestion.source.metadata_common import MetadataWorkUnit
 from datahub.metadata.com.linkedin.pegasus2avro.common import AuditStamp, Status
 from datahub.metadata.com.linkedin.pegasus2avro.metadata.snapshot import DatasetSnapshot
@@ -24,6 +26,9 @@ from datahub.metadata.com.linkedin.pegasus2avro.schema import (
 
 logger = logging.getLogger(__name__)
 
+# When partitioned, each partition covers a contiguous range of this many topics.
+_TOPICS_PER_PARTITION = 100
+
 
 class KafkaSourceConfig(ConfigModel):
     # TODO: inline the connection config
@@ -34,7 +39,7 @@ class KafkaSourceConfig(ConfigModel):
 @dataclass
 class KafkaSourceReport(SourceReport):
     topics_scanned = 0
-    filtered: List[str] = field(default_factory=list)
+    filtered: LossyList[str] = field(default_factory=LossyList)
 
     def report_topic_scanned(self, topic: str) -> None:
         self.topics_scanned += 1
@@ -59,10 +64,17 @@ class KafkaSource(Source):
                 **self.source_config.connection.consumer_config,
             }
         )
-        self.schema_registry_client = SchemaRegistryClient(
-            {"url": self.source_config.connection.schema_registry_url}
+        # The client caches the schemas it fetched. It guards its cache with a lock,
+        # so partitions and pipelines running on other threads can share it. The
+        # consumer isn't thread-safe, and is only used to list the topics.
+        schema_registry_url = self.source_config.connection.schema_registry_url
+        self.schema_registry_client = get_shared_resource(
+            ctx,
+            ("schema-registry-client", schema_registry_url),
+            functools.partial(SchemaRegistryClient, {"url": schema_registry_url}),
         )
         self.report = KafkaSourceReport()
+        self.topics_count: Optional[int] = None
 
     @classmethod
     def create(cls, config_dict, ctx):
@@ -71,18 +83,45 @@ class KafkaSource(Source):
 
     def get_workunits(self) -> Iterable[MetadataWorkUnit]:
         topics = self.consumer.list_topics().topics
+        self.topics_count = len(topics)
+        yield from self._get_topic_workunits(topics, self.report)
+
+    def get_partitions(self) -> Iterable[SourcePartition]:
+        topics = sorted(self.consumer.list_topics().topics)
+        self.topics_count = len(topics)
+        for start in range(0, len(topics), _TOPICS_PER_PARTITION):
+            end = start + _TOPICS_PER_PARTITION
+            topic_range = topics[start:end]
+            report = KafkaSourceReport()
+            yield SourcePartition(
+                id=f"{topic_range[0]}..{topic_range[-1]}",
+                report=report,
+                get_workunits=functools.partial(
+                    self._get_topic_workunits, topic_range, report
+                ),
+            )
+
+    def get_workunits_estimate(self) -> Optional[int]:
+        # Includes the topics that are filtered out.
+        return self.topics_count
+
+    def _get_topic_workunits(
+        self, topics: Iterable[str], report: KafkaSourceReport
+    ) -> Iterable[MetadataWorkUnit]:
         for t in topics:
-            self.report.report_topic_scanned(t)
+            report.report_topic_scanned(t)
 
             if self.source_config.topic_patterns.allowed(t):
-                mce = self._extract_record(t)
+                mce = self._extract_record(t, report)
                 wu = MetadataWorkUnit(id=f"kafka-{t}", mce=mce)
-                self.report.report_workunit(wu)
+                report.report_workunit(wu)
                 yield wu
             else:
-                self.report.report_dropped(t)
+                report.report_dropped(t)
 
-    def _extract_record(self, topic: str) -> MetadataChangeEvent:
+    def _extract_record(
+        self, topic: str, report: KafkaSourceReport
+    ) -> MetadataChangeEvent:
         logger.debug(f"topic = {topic}")
         platform = "kafka"
         dataset_name = topic
@@ -105,7 +144,7 @@ class KafkaSource(Source):
             )
             schema = registered_schema.schema
         except Exception as e:
-            self.report.report_warning(topic, f"failed to get schema: {e}")
+            report.report_warning(topic, f"failed to get schema: {e}")
             has_schema = False
 
         # Parse the schema
@@ -113,7 +152,7 @@ class KafkaSource(Source):
         if has_schema and schema.schema_type == "AVRO":
             fields = schema_util.avro_schema_to_mce_fields(schema.schema_str)
         elif has_schema:
-            self.report.report_warning(
+            report.report_warning(
                 topic, f"unable to parse kafka schema type {schema.schema_type}"
             )
 
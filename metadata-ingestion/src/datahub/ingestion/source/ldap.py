@@ -1,12 +1,13 @@
+import functools
 from dataclasses import dataclass
-from typing import Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import ldap
 from ldap.controls import SimplePagedResultsControl
 
 from datahub.configuration.common import ConfigModel, ConfigurationError
 from datahub.ingestion.api.common import PipelineContext
-from datahub.ingestion.api.source import Source, SourceReport
+from datahub.ingestion.api.source import Source, SourcePartition, SourceReport
 from datahub.ingestion.source.metadata_common import MetadataWorkUnit
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 from datahub.metadata.schema_classes import CorpUserInfoClass, CorpUserSnapshotClass
@@ -37,6 +38,14 @@ def set_cookie(lc_object, pctrls, pagesize):
     return cookie
 
 
+def is_user(attrs) -> bool:
+    """Determine whether the LDAP entry is a person, based on its object classes."""
+    return (
+        b"inetOrgPerson" in attrs["objectClass"]
+        or b"posixAccount" in attrs["objectClass"]
+    )
+
+
 def guess_person_ldap(dn, attrs) -> Optional[str]:
     """Determine the user's LDAP based on the DN and attributes."""
     if "sAMAccountName" in attrs:
@@ -72,17 +81,17 @@ class LDAPSource(Source):
         ldap.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_ALLOW)
         ldap.set_option(ldap.OPT_REFERRALS, 0)
 
-        self.ldap_client = ldap.initialize(self.config.ldap_server)
-        self.ldap_client.protocol_version = 3
+        self.ldap_client = self._connect()
+
+    def _connect(self) -> "ldap.ldapobject.LDAPObject":
+        ldap_client = ldap.initialize(self.config.ldap_server)
+        ldap_client.protocol_version = 3
 
         try:
-            self.ldap_client.simple_bind_s(
-                self.config.ldap_user, self.config.ldap_password
-            )
+            ldap_client.simple_bind_s(self.config.ldap_user, self.config.ldap_password)
         except ldap.LDAPError as e:
             raise ConfigurationError("LDAP connection failed") from e
-
-        self.lc = create_controls(self.config.page_size)
+        return ldap_client
 
     @classmethod
     def create(cls, config_dict, ctx):
@@ -90,41 +99,114 @@ class LDAPSource(Source):
         return cls(ctx, config)
 
     def get_workunits(self) -> Iterable[MetadataWorkUnit]:
+        yield from self._get_users(
+            self.ldap_client, self.config.base_dn, ldap.SCOPE_SUBTREE, self.report
+        )
+
+    def get_partitions(self) -> Iterable[SourcePartition]:
+        # Entries directly under the base DN make up one partition. Every other
+        # entry directly under the base DN - typically an organizational unit - has
+        # its subtree crawled as a separate partition, over its own connection.
+        report = SourceReport()
+        yield SourcePartition(
+            id=self.config.base_dn,
+            report=report,
+            get_workunits=functools.partial(
+                self._get_partition_users,
+                self.config.base_dn,
+                ldap.SCOPE_ONELEVEL,
+                report,
+            ),
+        )
+
+        for dn, attrs in self._paged_search(
+            self.ldap_client,
+            self.config.base_dn,
+            ldap.SCOPE_ONELEVEL,
+            "(objectClass=*)",
+            self.report,
+            attrlist=["objectClass"],
+        ):
+            if is_user(attrs):
+                continue
+            report = SourceReport()
+            yield SourcePartition(
+                id=dn,
+                report=report,
+                get_workunits=functools.partial(
+                    self._get_partition_users, dn, ldap.SCOPE_SUBTREE, report
+                ),
+            )
+
+    def _get_partition_users(
+        self, search_base: str, scope: int, report: SourceReport
+    ) -> Iterable[MetadataWorkUnit]:
+        ldap_client = self._connect()
+        try:
+            yield from self._get_users(ldap_client, search_base, scope, report)
+        finally:
+            ldap_client.unbind()
+
+    def _paged_search(
+        self,
+        ldap_client: "ldap.ldapobject.LDAPObject",
+        search_base: str,
+        scope: int,
+        search_filter: str,
+        report: SourceReport,
+        attrlist: Optional[List[str]] = None,
+    ) -> Iterable[Tuple[str, Dict[str, List[bytes]]]]:
+        lc = create_controls(self.config.page_size)
         cookie = True
         while cookie:
             try:
-                msgid = self.ldap_client.search_ext(
-                    self.config.base_dn,
-                    ldap.SCOPE_SUBTREE,
-                    self.config.filter,
-                    serverctrls=[self.lc],
+                msgid = ldap_client.search_ext(
+                    search_base,
+                    scope,
+                    search_filter,
+                    attrlist=attrlist,
+                    serverctrls=[lc],
                 )
-                rtype, rdata, rmsgid, serverctrls = self.ldap_client.result3(msgid)
+                rtype, rdata, rmsgid, serverctrls = ldap_client.result3(msgid)
             except ldap.LDAPError as e:
-                self.report.report_failure(
+                report.report_failure(
                     "ldap-control", "LDAP search failed: {}".format(e)
                 )
                 break
 
-            for dn, attrs in rdata:
-                # TODO: create groups if 'organizationalUnit' in attrs['objectClass']
-
-                if (
-                    b"inetOrgPerson" in attrs["objectClass"]
-                    or b"posixAccount" in attrs["objectClass"]
-                ):
-                    yield from self.handle_user(dn, attrs)
+            yield from rdata
 
             pctrls = get_pctrls(serverctrls)
             if not pctrls:
-                self.report.report_failure(
+                report.report_failure(
                     "ldap-control", "Server ignores RFC 2696 control."
                 )
                 break
 
-            cookie = set_cookie(self.lc, pctrls, self.config.page_size)
-
-    def handle_user(self, dn, attrs) -> Iterable[MetadataWorkUnit]:
+            cookie = set_cookie(lc, pctrls, self.config.page_size)
+
+    def _get_users(
+        self,
+        ldap_client: "ldap.ldapobject.LDAPObject",
+        search_base: str,
+        scope: int,
+        report: SourceReport,
+    ) -> Iterable[MetadataWorkUnit]:
+        for dn, attrs in self._paged_search(
+            ldap_client, search_base, scope, self.config.filter, report
+        ):
+            # TODO: create groups if 'organizationalUnit' in attrs['objectClass']
+
+            if is_user(attrs):
+                yield from self.handle_user(dn, attrs, ldap_client, report)
+
+    def handle_user(
+        self,
+        dn: str,
+        attrs: Dict[str, List[bytes]],
+        ldap_client: "ldap.ldapobject.LDAPObject",
+        report: SourceReport,
+    ) -> Iterable[MetadataWorkUnit]:
         """
         Handle a DN and attributes by adding manager info and constructing a
         work unit based on the information.
@@ -133,23 +215,21 @@ class LDAPSource(Source):
         if "manager" in attrs:
             try:
                 m_cn = attrs["manager"][0].split(b",")[0]
-                manager_msgid = self.ldap_client.search_ext(
+                manager_msgid = ldap_client.search_ext(
                     self.config.base_dn,
                     ldap.SCOPE_SUBTREE,
                     f"({m_cn.decode()})",
-                    serverctrls=[self.lc],
+                    serverctrls=[create_controls(self.config.page_size)],
                 )
-                m_dn, m_attrs = self.ldap_client.result3(manager_msgid)[1][0]
+                m_dn, m_attrs = ldap_client.result3(manager_msgid)[1][0]
                 manager_ldap = guess_person_ldap(m_dn, m_attrs)
             except ldap.LDAPError as e:
-                self.report.report_warning(
-                    dn, "manager LDAP search failed: {}".format(e)
-                )
+                report.report_warning(dn, "manager LDAP search failed: {}".format(e))
 
         mce = self.build_corp_user_mce(dn, attrs, manager_ldap)
         if mce:
             wu = MetadataWorkUnit(dn, mce)
-            self.report.report_workunit(wu)
+            report.report_workunit(wu)
             yield wu
         yield from []
 
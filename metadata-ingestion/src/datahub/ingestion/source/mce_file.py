@@ -1,6 +1,6 @@
 import json
 from dataclasses import dataclass, field
-from typing import Iterable
+from typing import Iterable, Optional
 
 from datahub.configuration.common import ConfigModel
 from datahub.ingestion.api.source import Source, SourceReport
@@ -16,6 +16,7 @@ class MetadataFileSourceConfig(ConfigModel):
 class MetadataFileSource(Source):
     config: MetadataFileSourceConfig
     report: SourceReport = field(default_factory=SourceReport)
+    _workunits_estimate: Optional[int] = field(default=None, init=False, repr=False)
 
     @classmethod
     def create(cls, config_dict, ctx):
@@ -27,6 +28,7 @@ class MetadataFileSource(Source):
             mce_obj_list = json.load(f)
         if not isinstance(mce_obj_list, list):
             mce_obj_list = [mce_obj_list]
+        self._workunits_estimate = len(mce_obj_list)
 
         for i, obj in enumerate(mce_obj_list):
             mce: MetadataChangeEvent = MetadataChangeEvent.from_obj(obj)
@@ -36,6 +38,9 @@ class MetadataFileSource(Source):
             self.report.report_workunit(wu)
             yield wu
 
+    def get_workunits_estimate(self) -> Optional[int]:
+        return self._workunits_estimate
+
     def get_report(self):
         return self.report
 
@@ -6,6 +6,7 @@ from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
 
 @dataclass
 class MetadataWorkUnit(WorkUnit):
+    __slots__ = ("mce",)
     mce: MetadataChangeEvent
 
     def get_metadata(self):
@@ -1,3 +1,4 @@
+import functools
 from dataclasses import dataclass, field
 from typing import Iterable, List, Optional
 
@@ -5,7 +6,8 @@ import pymongo
 
 from datahub.configuration.common import AllowDenyPattern, ConfigModel
 from datahub.ingestion.api.common import PipelineContext
-from datahub.ingestion.api.source import Source, SourceReport
+from datahub.ingestion.api.report import LossyList
+from datahub.ingestion.api.source import Source, SourcePartition, SourceReport
 from datahub.ingestion.source.metadata_common import MetadataWorkUnit
 from datahub.metadata.com.linkedin.pegasus2avro.metadata.snapshot import DatasetSnapshot
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
@@ -33,7 +35,7 @@ class MongoDBConfig(ConfigModel):
 
 @dataclass
 class MongoDBSourceReport(SourceReport):
-    filtered: List[str] = field(default_factory=list)
+    filtered: LossyList[str] = field(default_factory=LossyList)
 
     def report_dropped(self, name: str) -> None:
         self.filtered.append(name)
@@ -61,6 +63,8 @@ class MongoDBSource(Source):
             **self.config.options,
         }
 
+        # The client is thread-safe and pools its connections, so the partitions,
+        # which are crawled concurrently, share it.
         self.mongo_client = pymongo.MongoClient(self.config.connect_uri, **options)
 
         # This cheaply tests the connection. For details, see
@@ -72,10 +76,7 @@ class MongoDBSource(Source):
         config = MongoDBConfig.parse_obj(config_dict)
         return cls(ctx, config)
 
-    def get_workunits(self) -> Iterable[MetadataWorkUnit]:
-        env = "PROD"
-        platform = "mongodb"
-
+    def _get_allowed_databases(self) -> Iterable[str]:
         database_names: List[str] = self.mongo_client.list_database_names()
         for database_name in database_names:
             if database_name in DENY_DATABASE_LIST:
@@ -83,36 +84,60 @@ class MongoDBSource(Source):
             if not self.config.database_pattern.allowed(database_name):
                 self.report.report_dropped(database_name)
                 continue
+            yield database_name
 
-            database = self.mongo_client[database_name]
-            collection_names: List[str] = database.list_collection_names()
-            for collection_name in collection_names:
-                dataset_name = f"{database_name}.{collection_name}"
-                if not self.config.collection_pattern.allowed(dataset_name):
-                    self.report.report_dropped(dataset_name)
-                    continue
+    def get_workunits(self) -> Iterable[MetadataWorkUnit]:
+        for database_name in self._get_allowed_databases():
+            yield from self._get_database_workunits(database_name, self.report)
+
+    def get_partitions(self) -> Iterable[SourcePartition]:
+        for database_name in self._get_allowed_databases():
+            report = MongoDBSourceReport()
+            yield SourcePartition(
+                id=database_name,
+                report=report,
+                get_workunits=functools.partial(
+                    self._get_database_workunits, database_name, report
+                ),
+            )
+
+    def _get_database_workunits(
+        self, database_name: str, report: MongoDBSourceReport
+    ) -> Iterable[MetadataWorkUnit]:
+        env = "PROD"
+        platform = "mongodb"
+
+        database = self.mongo_client[database_name]
+        collection_names: List[str] = database.list_collection_names()
+        for collection_name in collection_names:
+            dataset_name = f"{database_name}.{collection_name}"
+            if not self.config.collection_pattern.allowed(dataset_name):
+                report.report_dropped(dataset_name)
+                continue
 
-                mce = MetadataChangeEvent()
-                dataset_snapshot = DatasetSnapshot()
-                dataset_snapshot.urn = f"urn:li:dataset:(urn:li:dataPlatform:{platform},{dataset_name},{env})"
+            mce = MetadataChangeEvent()
+            dataset_snapshot = DatasetSnapshot()
+            dataset_snapshot.urn = (
+                f"urn:li:dataset:(urn:li:dataPlatform:{platform},{dataset_name},{env})"
+            )
 
-                dataset_properties = DatasetPropertiesClass(
-                    tags=[],
-                    customProperties={},
-                )
-                dataset_snapshot.aspects.append(dataset_properties)
+            dataset_properties = DatasetPropertiesClass(
+                tags=[],
+                customProperties={},
+            )
+            dataset_snapshot.aspects.append(dataset_properties)
 
-                # TODO: Guess the schema via sampling
-                # State of the art seems to be https://github.com/variety/variety.
+            # TODO: Guess the schema via sampling
+            # State of the art seems to be https://github.com/variety/variety.
 
-                # TODO: use list_indexes() or index_information() to get index information
-                # See https://pymongo.readthedocs.io/en/stable/api/pymongo/collection.html#pymongo.collection.Collection.list_indexes.
+            # TODO: use list_indexes() or index_information() to get index information
+            # See https://pymongo.readthedocs.io/en/stable/api/pymongo/collection.html#pymongo.collection.Collection.list_indexes.
 
-                mce.proposedSnapshot = dataset_snapshot
+            mce.proposedSnapshot = dataset_snapshot
 
-                wu = MetadataWorkUnit(id=dataset_name, mce=mce)
-                self.report.report_workunit(wu)
-                yield wu
+            wu = MetadataWorkUnit(id=dataset_name, mce=mce)
+            report.report_workunit(wu)
+            yield wu
 
     def get_report(self) -> MongoDBSourceReport:
         return self.report
@@ -4,5 +4,5 @@ from datahub.ingestion.api.source import Source
 source_registry = Registry[Source]()
 source_registry.load("datahub.ingestion.source.plugins")
 
-# This source is always enabled
-assert source_registry.get("file")
+# This source is always enabled. Plugins are only imported once they are used.
+assert "file" in source_registry.mapping
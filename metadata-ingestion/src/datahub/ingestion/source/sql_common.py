@@ -1,3 +1,5 @@
+import functools
+import json
 import logging
 import time
 from abc import abstractmethod
@@ -5,12 +7,13 @@ from dataclasses import dataclass, field
 from typing import Any, Iterable, List, Optional, Tuple, Type
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import reflection
+from sqlalchemy.engine import Engine, reflection
 from sqlalchemy.sql import sqltypes as types
 
 from datahub.configuration.common import AllowDenyPattern, ConfigModel
-from datahub.ingestion.api.common import PipelineContext
-from datahub.ingestion.api.source import Source, SourceReport
+from datahub.ingestion.api.common import PipelineContext, get_shared_resource
+from datahub.ingestion.api.report import LossyList
+from datahub.ingestion.api.source import Source, SourcePartition, SourceReport
 from datahub.ingestion.source.metadata_common import MetadataWorkUnit
 from datahub.metadata.com.linkedin.pegasus2avro.common import AuditStamp
 from datahub.metadata.com.linkedin.pegasus2avro.metadata.snapshot import DatasetSnapshot
@@ -38,7 +41,7 @@ logger = logging.getLogger(__name__)
 @dataclass
 class SQLSourceReport(SourceReport):
     tables_scanned = 0
-    filtered: List[str] = field(default_factory=list)
+    filtered: LossyList[str] = field(default_factory=LossyList)
 
     def report_table_scanned(self, table_name: str) -> None:
         self.tables_scanned += 1
@@ -93,7 +96,7 @@ class BasicSQLAlchemyConfig(SQLAlchemyConfig):
 
 @dataclass
 class SqlWorkUnit(MetadataWorkUnit):
-    pass
+    __slots__ = ()
 
 
 _field_type_mapping = {
@@ -188,60 +191,108 @@ class SQLAlchemySource(Source):
         self.platform = platform
         self.report = SQLSourceReport()
 
+    def _create_engine(self) -> Engine:
+        url = self.config.get_sql_alchemy_url()
+        logger.debug(f"sql_alchemy_url={url}")
+        # Engines keep a connection pool, which pipelines running in the same process
+        # can share, e.g. across the runs of a daemon.
+        return get_shared_resource(
+            self.ctx,
+            (
+                "sqlalchemy-engine",
+                url,
+                json.dumps(self.config.options, sort_keys=True, default=str),
+            ),
+            functools.partial(create_engine, url, **self.config.options),
+        )
+
+    def _get_allowed_schemas(self, inspector: reflection.Inspector) -> Iterable[str]:
+        for schema in inspector.get_schema_names():
+            if not self.config.schema_pattern.allowed(schema):
+                self.report.report_dropped(schema)
+                continue
+            yield schema
+
     def get_workunits(self) -> Iterable[SqlWorkUnit]:
+        inspector = reflection.Inspector.from_engine(self._create_engine())
+        for schema in self._get_allowed_schemas(inspector):
+            yield from self._get_schema_workunits(inspector, schema, self.report)
+
+    def get_partitions(self) -> Iterable[SourcePartition]:
+        engine = self._create_engine()
+        inspector = reflection.Inspector.from_engine(engine)
+        for schema in self._get_allowed_schemas(inspector):
+            # Each partition uses its own inspector, since inspectors keep a cache
+            # that is not meant to be shared across threads. They do share the
+            # engine's connection pool.
+            report = SQLSourceReport()
+            yield SourcePartition(
+                id=schema,
+                report=report,
+                get_workunits=functools.partial(
+                    self._get_schema_workunits,
+                    reflection.Inspector.from_engine(engine),
+                    schema,
+                    report,
+                ),
+            )
+
+    def _get_schema_workunits(
+        self, inspector: reflection.Inspector, schema: str, report: SQLSourceReport
+    ) -> Iterable[SqlWorkUnit]:
         env: str = "PROD"
         sql_config = self.config
         platform = self.platform
-        url = sql_config.get_sql_alchemy_url()
-        logger.debug(f"sql_alchemy_url={url}")
-        engine = create_engine(url, **sql_config.options)
-        inspector = reflection.Inspector.from_engine(engine)
-        for schema in inspector.get_schema_names():
-            if not sql_config.schema_pattern.allowed(schema):
-                self.report.report_dropped(schema)
+        for table in inspector.get_table_names(schema):
+            schema, table = sql_config.standardize_schema_table_names(schema, table)
+            dataset_name = sql_config.get_identifier(schema, table)
+            report.report_table_scanned(dataset_name)
+
+            if not sql_config.table_pattern.allowed(dataset_name):
+                report.report_dropped(dataset_name)
                 continue
 
-            for table in inspector.get_table_names(schema):
-                schema, table = sql_config.standardize_schema_table_names(schema, table)
-                dataset_name = sql_config.get_identifier(schema, table)
-                self.report.report_table_scanned(dataset_name)
-
-                if not sql_config.table_pattern.allowed(dataset_name):
-                    self.report.report_dropped(dataset_name)
-                    continue
-
-                columns = inspector.get_columns(table, schema)
-                try:
-                    description: Optional[str] = inspector.get_table_comment(
-                        table, schema
-                    )["text"]
-                except NotImplementedError:
-                    description = None
-
-                # TODO: capture inspector.get_pk_constraint
-                # TODO: capture inspector.get_sorted_table_and_fkc_names
-
-                mce = MetadataChangeEvent()
-
-                dataset_snapshot = DatasetSnapshot()
-                dataset_snapshot.urn = f"urn:li:dataset:(urn:li:dataPlatform:{platform},{dataset_name},{env})"
-                if description is not None:
-                    dataset_properties = DatasetPropertiesClass(
-                        description=description,
-                        tags=[],
-                        customProperties={},
-                        # uri=dataset_name,
-                    )
-                    dataset_snapshot.aspects.append(dataset_properties)
-                schema_metadata = get_schema_metadata(
-                    self.report, dataset_name, platform, columns
-                )
-                dataset_snapshot.aspects.append(schema_metadata)
-                mce.proposedSnapshot = dataset_snapshot
+            if dataset_name in self.ctx.completed_workunit_ids:
+                # Written by an earlier attempt of this run, so skip the reflection.
+                report.report_workunit_skipped(dataset_name)
+                continue
 
-                wu = SqlWorkUnit(id=dataset_name, mce=mce)
-                self.report.report_workunit(wu)
-                yield wu
+            columns = inspector.get_columns(table, schema)
+            try:
+                # Missing from the SQLAlchemy stubs.
+                comment = inspector.get_table_comment(  # type: ignore[attr-defined]
+                    table, schema
+                )
+                description: Optional[str] = comment["text"]
+            except NotImplementedError:
+                description = None
+
+            # TODO: capture inspector.get_pk_constraint
+            # TODO: capture inspector.get_sorted_table_and_fkc_names
+
+            mce = MetadataChangeEvent()
+
+            dataset_snapshot = DatasetSnapshot()
+            dataset_snapshot.urn = (
+                f"urn:li:dataset:(urn:li:dataPlatform:{platform},{dataset_name},{env})"
+            )
+            if description is not None:
+                dataset_properties = DatasetPropertiesClass(
+                    description=description,
+                    tags=[],
+                    customProperties={},
+                    # uri=dataset_name,
+                )
+                dataset_snapshot.aspects.append(dataset_properties)
+            schema_metadata = get_schema_metadata(
+                report, dataset_name, platform, columns
+            )
+            dataset_snapshot.aspects.append(schema_metadata)
+            mce.proposedSnapshot = dataset_snapshot
+
+            wu = SqlWorkUnit(id=dataset_name, mce=mce)
+            report.report_workunit(wu)
+            yield wu
 
     def get_report(self):
         return self.report
@@ -1,4 +1,14 @@
+import re
+
+import pytest
+
 from datahub.configuration.common import AllowDenyPattern
+from datahub.configuration.patterns import (
+    CompiledPatterns,
+    PrefixTrie,
+    get_allow_deny_matcher,
+    get_literal_prefix,
+)
 
 
 def test_allow_all():
@@ -19,3 +29,81 @@ def test_single_table():
 def test_default_deny():
     pattern = AllowDenyPattern(allow=["foo.mytable"])
     assert not pattern.allowed("foo.bar")
+
+
+def test_deny_takes_precedence():
+    pattern = AllowDenyPattern(allow=["foo\\..*"], deny=["foo\\.tmp_.*", ".*_backup$"])
+    assert pattern.allowed("foo.table")
+    assert not pattern.allowed("foo.tmp_table")
+    assert not pattern.allowed("foo.table_backup")
+    assert not pattern.allowed("bar.table")
+
+
+@pytest.mark.parametrize(
+    "pattern,literal",
+    [
+        ("foo", "foo"),
+        ("^foo\\.bar.*", "foo.bar"),
+        (".*", ""),
+        ("", ""),
+        ("foo.bar", None),
+        ("foo.*bar", None),
+        ("foo$", None),
+        ("fo+", None),
+        ("\\d+", None),
+        ("(?i)foo", None),
+    ],
+)
+def test_get_literal_prefix(pattern, literal):
+    assert get_literal_prefix(pattern) == literal
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["foo", "^bar\\.baz.*", "qux"],
+        ["foo.bar", "[0-9]+_tmp", "^(lookup|sys).*"],
+        ["(?i)FOO", "(a)\\1", "(?P<x>b)(?P=x)", "sys.*"],
+    ],
+)
+def test_compiled_patterns_match_like_re_match(patterns):
+    compiled = CompiledPatterns(patterns)
+    for string in [
+        "foo",
+        "foo.table",
+        "bar.baz",
+        "bar.qux",
+        "fooXbar",
+        "12_tmp",
+        "lookup",
+        "aa",
+        "bb",
+        "sys",
+        "qux",
+        "",
+        "x",
+    ]:
+        expected = any(re.match(pattern, string) for pattern in patterns)
+        assert compiled.match(string) == expected, string
+
+
+def test_prefix_trie():
+    trie = PrefixTrie(["db.tmp_", "db.stage"])
+    assert trie.matches_prefix("db.tmp_table")
+    assert trie.matches_prefix("db.stage")
+    assert not trie.matches_prefix("db.sta")
+    assert not trie.matches_prefix("other")
+    assert not PrefixTrie().matches_prefix("anything")
+
+
+def test_decisions_are_cached():
+    pattern = AllowDenyPattern(allow=["foo\\..*"], deny=[".*_tmp"])
+    matcher = get_allow_deny_matcher(pattern.allow, pattern.deny)
+    matcher.allowed.cache_clear()
+    for _ in range(3):
+        assert pattern.allowed("foo.table")
+    assert matcher.allowed.cache_info().hits == 2
+
+    # The patterns are compiled again when they change.
+    pattern.deny.append("foo\\.table")
+    assert not pattern.allowed("foo.table")
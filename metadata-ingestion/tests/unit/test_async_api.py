@@ -0,0 +1,77 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Iterable
+from unittest.mock import MagicMock
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import AsyncSink, SinkReport, WriteCallback
+from datahub.ingestion.api.source import AsyncSource, SourceReport
+
+
+@dataclass
+class _FakeWorkUnit:
+    id: str
+
+
+@dataclass
+class _CountingAsyncSource(AsyncSource):
+    report: SourceReport = field(default_factory=SourceReport)
+
+    @classmethod
+    def create(cls, config_dict, ctx):
+        return cls(ctx)
+
+    async def get_workunits_async(self):
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield _FakeWorkUnit(id=f"wu-{i}")
+
+    def get_report(self):
+        return self.report
+
+    def close(self):
+        pass
+
+
+@dataclass
+class _RecordingAsyncSink(AsyncSink):
+    report: SinkReport = field(default_factory=SinkReport)
+
+    @classmethod
+    def create(cls, config_dict, ctx):
+        return cls(ctx)
+
+    def handle_work_unit_start(self, workunit):
+        pass
+
+    def handle_work_unit_end(self, workunit):
+        pass
+
+    async def write_record(self, record_envelope, callback):
+        await asyncio.sleep(0)
+        self.report.report_record_written(record_envelope)
+        callback.on_success(record_envelope, {})
+
+    def get_report(self):
+        return self.report
+
+    def close(self):
+        pass
+
+
+def test_async_source_sync_fallback():
+    source = _CountingAsyncSource(PipelineContext(run_id="test"))
+    workunits: Iterable = source.get_workunits()
+    assert [wu.id for wu in workunits] == ["wu-0", "wu-1", "wu-2"]
+
+
+def test_async_sink_sync_fallback():
+    sink = _RecordingAsyncSink(PipelineContext(run_id="test"))
+    callback = MagicMock(spec=WriteCallback)
+    record_envelope = RecordEnvelope(record="test", metadata={})
+
+    sink.write_record_async(record_envelope, callback)
+    sink.write_record_async(record_envelope, callback)
+
+    assert sink.get_report().records_written == 2
+    assert callback.on_success.call_count == 2
@@ -0,0 +1,152 @@
+import importlib.util
+import json
+import pathlib
+import sys
+
+import pytest
+
+PACKAGE = "generated_metadata"
+
+OWNERSHIP_TYPE = {
+    "type": "enum",
+    "name": "OwnershipType",
+    "symbols": ["DEVELOPER", "DATAOWNER"],
+}
+
+SCHEMA = {
+    "type": "record",
+    "name": "MetadataChangeEvent",
+    "namespace": "com.linkedin.pegasus2avro.mxe",
+    "fields": [
+        {
+            "name": "auditHeader",
+            "type": [
+                "null",
+                {
+                    "type": "record",
+                    "name": "KafkaAuditHeader",
+                    "namespace": "com.linkedin.events",
+                    "fields": [{"name": "time", "type": "long"}],
+                },
+            ],
+            "default": None,
+        },
+        {
+            "name": "proposedSnapshot",
+            "type": [
+                {
+                    "type": "record",
+                    "name": "DatasetSnapshot",
+                    "namespace": "com.linkedin.pegasus2avro.metadata.snapshot",
+                    "fields": [
+                        {"name": "urn", "type": "string"},
+                        {
+                            "name": "aspects",
+                            "type": {
+                                "type": "array",
+                                "items": [
+                                    {
+                                        "type": "record",
+                                        "name": "Owner",
+                                        "namespace": "com.linkedin.pegasus2avro.common",
+                                        "fields": [
+                                            {"name": "owner", "type": "string"},
+                                            {"name": "type", "type": OWNERSHIP_TYPE},
+                                        ],
+                                    },
+                                    {
+                                        "type": "record",
+                                        "name": "Status",
+                                        "namespace": "com.linkedin.pegasus2avro.common",
+                                        "fields": [
+                                            {
+                                                "name": "removed",
+                                                "type": "boolean",
+                                                "default": False,
+                                            }
+                                        ],
+                                    },
+                                ],
+                            },
+                        },
+                    ],
+                }
+            ],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    script = pathlib.Path(__file__).parents[2] / "scripts" / "avro_codegen.py"
+    spec = importlib.util.spec_from_file_location("avro_codegen", script)
+    assert spec is not None and spec.loader is not None
+    codegen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(codegen)  # type: ignore[attr-defined]
+
+    codegen.write_schema_files(json.dumps(SCHEMA, indent=2), str(tmp_path / PACKAGE))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in list(sys.modules):
+        if name == PACKAGE or name.startswith(f"{PACKAGE}."):
+            del sys.modules[name]
+
+
+def _imported_namespaces():
+    return sorted(
+        name.split(".", 1)[1]
+        for name in sys.modules
+        if name.startswith(f"{PACKAGE}.com.linkedin.") and name.count(".") > 3
+    )
+
+
+def test_classes_are_loaded_lazily(generated):
+    schema_classes = importlib.import_module(f"{PACKAGE}.schema_classes")
+    assert _imported_namespaces() == []
+
+    mxe = importlib.import_module(f"{PACKAGE}.com.linkedin.pegasus2avro.mxe")
+    # The snapshot is imported as the default of a required field, while the
+    # other namespaces are only referred to by type hints.
+    assert _imported_namespaces() == [
+        "com.linkedin.pegasus2avro.metadata",
+        "com.linkedin.pegasus2avro.metadata.snapshot",
+        "com.linkedin.pegasus2avro.mxe",
+    ]
+    assert mxe.MetadataChangeEvent is schema_classes.MetadataChangeEventClass
+    assert schema_classes._parsed is None
+
+
+def test_schema_is_parsed_on_first_use(generated):
+    schema_classes = importlib.import_module(f"{PACKAGE}.schema_classes")
+    from generated_metadata.com.linkedin.pegasus2avro.mxe import MetadataChangeEvent
+
+    assert schema_classes._parsed is None
+    # Filling in the defaults of a record looks them up in its schema.
+    mce = MetadataChangeEvent(
+        proposedSnapshot=schema_classes.DatasetSnapshotClass(
+            urn="urn:li:dataset:(urn:li:dataPlatform:hive,table,PROD)",
+            aspects=[
+                schema_classes.OwnerClass(
+                    owner="urn:li:corpuser:datahub", type="DATAOWNER"
+                ),
+                schema_classes.StatusClass(removed=True),
+            ],
+        )
+    )
+    assert schema_classes._parsed is not None
+    assert mce.validate()
+    obj = mce.to_obj()
+    assert (
+        schema_classes.SCHEMA.fullname
+        == "com.linkedin.pegasus2avro.mxe.MetadataChangeEvent"
+    )
+
+    # Records of namespaces that weren't imported yet are read into their classes.
+    read = MetadataChangeEvent.from_obj(obj)
+    assert isinstance(read.proposedSnapshot.aspects[0], schema_classes.OwnerClass)
+    assert read.to_obj() == obj
+
+    generated_metadata = importlib.import_module(PACKAGE)
+    assert generated_metadata.StatusClass is schema_classes.StatusClass
+    assert json.loads(schema_classes.SCHEMA_JSON_STR) == SCHEMA
@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock
+
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.api.sink import Sink, WriteCallback
+from datahub.ingestion.run.batching import RecordCallbacks, SinkBatcher
+
+
+def write_records(batcher: SinkBatcher, count: int) -> None:
+    for _ in range(count):
+        batcher.begin_record()
+        batcher.end_record()
+
+
+def test_batches_end_after_max_records():
+    sink = MagicMock(spec=Sink)
+    batcher = SinkBatcher(sink, max_records=10, max_wait_seconds=60)
+
+    write_records(batcher, 25)
+    assert sink.handle_batch_start.call_count == 3
+    assert sink.handle_batch_end.call_count == 2
+
+    batcher.flush()
+    assert sink.handle_batch_end.call_count == 3
+
+    # Flushing without an open batch is a no-op.
+    batcher.flush()
+    assert sink.handle_batch_end.call_count == 3
+
+
+def test_batches_end_after_timeout():
+    sink = MagicMock(spec=Sink)
+    batcher = SinkBatcher(sink, max_records=1000, max_wait_seconds=0)
+
+    write_records(batcher, 5)
+    assert sink.handle_batch_start.call_count == 5
+    assert sink.handle_batch_end.call_count == 5
+
+
+def test_on_batch_end_runs_after_sink():
+    calls = []
+    sink = MagicMock(spec=Sink)
+    sink.handle_batch_end.side_effect = lambda: calls.append("sink")
+    batcher = SinkBatcher(
+        sink,
+        max_records=2,
+        max_wait_seconds=60,
+        on_batch_end=lambda: calls.append("callback"),
+    )
+
+    write_records(batcher, 3)
+    batcher.flush()
+    assert calls == ["sink", "callback", "sink", "callback"]
+
+
+def test_records_written_together_count_towards_the_batch():
+    sink = MagicMock(spec=Sink)
+    batcher = SinkBatcher(sink, max_records=10, max_wait_seconds=60)
+    assert batcher.remaining_records() == 10
+
+    batcher.begin_record()
+    batcher.end_record(4)
+    assert batcher.remaining_records() == 6
+    batcher.begin_record()
+    batcher.end_record(6)
+    assert sink.handle_batch_end.call_count == 1
+    assert batcher.remaining_records() == 10
+
+
+def test_record_callbacks_call_each_records_callback():
+    first, second = MagicMock(spec=WriteCallback), MagicMock(spec=WriteCallback)
+    first_record = RecordEnvelope(record=1, metadata={})
+    second_record = RecordEnvelope(record=2, metadata={})
+    callbacks = RecordCallbacks()
+    callbacks.add(first_record, first)
+    callbacks.add(second_record, second)
+
+    error = ValueError("boom")
+    callbacks.on_success(first_record, {})
+    callbacks.on_failure(second_record, error, {})
+    first.on_success.assert_called_once_with(first_record, {})
+    second.on_failure.assert_called_once_with(second_record, error, {})
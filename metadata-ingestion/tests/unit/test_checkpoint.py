@@ -0,0 +1,57 @@
+import yaml
+from click.testing import CliRunner
+
+from datahub.entrypoints import datahub
+from datahub.ingestion.run.checkpoint import CheckpointStore
+
+
+def test_checkpoint_store(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    store = CheckpointStore(path, "run-1")
+    assert store.get_completed_workunit_ids() == set()
+
+    store.mark_completed("db.first")
+    store.mark_completed("db.second")
+    store.mark_failed("db.second")
+    # Nothing is stored until the batch is committed.
+    assert store.get_completed_workunit_ids() == set()
+    store.commit()
+    assert store.get_completed_workunit_ids() == {"db.first"}
+
+    store.mark_completed("db.third")
+    store.close()
+
+    resumed = CheckpointStore(path, "run-1")
+    assert resumed.get_completed_workunit_ids() == {"db.first", "db.third"}
+    resumed.close()
+
+    other_run = CheckpointStore(path, "run-2")
+    assert other_run.get_completed_workunit_ids() == set()
+    other_run.close()
+
+
+def test_ingest_prints_run_id(tmp_path):
+    recipe = tmp_path / "recipe.yml"
+    recipe.write_text(
+        yaml.safe_dump(
+            {
+                "source": {
+                    "type": "file",
+                    "config": {"filename": "./examples/mce_files/single_mce.json"},
+                },
+                "sink": {
+                    "type": "file",
+                    "config": {"filename": str(tmp_path / "out.json")},
+                },
+                "checkpointing": {"path": str(tmp_path / "checkpoints.db")},
+            }
+        )
+    )
+
+    result = CliRunner().invoke(
+        datahub, ["ingest", "-c", str(recipe), "--resume", "run-1"]
+    )
+    assert result.exit_code == 0, result.output
+    # Once when the run starts, and once in its summary.
+    assert result.output.count("Run id: run-1") == 2
@@ -0,0 +1,198 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import Sink, SinkReport
+from datahub.ingestion.run.coalescing import CoalescingSink
+from datahub.ingestion.run.pipeline_report import PipelineReport
+from datahub.metadata.schema_classes import (
+    DatasetPropertiesClass,
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+    StatusClass,
+)
+
+
+class _Ownership:
+    def __init__(self, owner: str):
+        self.owner = owner
+
+
+class _Tags:
+    def __init__(self, tags: List[str]):
+        self.tags = tags
+
+
+class _Snapshot:
+    def __init__(self, urn: str, aspects: List[Any]):
+        self.urn = urn
+        self.aspects = aspects
+
+
+class _Event:
+    def __init__(self, proposedSnapshot: _Snapshot):
+        self.proposedSnapshot = proposedSnapshot
+
+
+@dataclass
+class _RecordingSink(Sink):
+    report: SinkReport = field(default_factory=SinkReport)
+    records: List[Any] = field(default_factory=list)
+    batches: int = 0
+
+    @classmethod
+    def create(cls, config_dict, ctx):
+        return cls(ctx)
+
+    def handle_work_unit_start(self, workunit):
+        pass
+
+    def handle_work_unit_end(self, workunit):
+        pass
+
+    def handle_batch_end(self):
+        self.batches += 1
+
+    def write_record_async(self, record_envelope, callback):
+        self.records.append(record_envelope.record)
+        callback.on_success(record_envelope, {})
+
+    def get_report(self):
+        return self.report
+
+    def close(self):
+        pass
+
+
+def _create_sink(**kwargs):
+    ctx = PipelineContext(run_id="test")
+    sink = _RecordingSink(ctx)
+    options: Dict[str, Any] = dict(
+        window_size=0,
+        max_records_in_memory=100,
+        spill_dir=None,
+        batch_size=100,
+        batch_timeout_seconds=60,
+        flush_on_batch_end=False,
+    )
+    options.update(kwargs)
+    report = PipelineReport()
+    return CoalescingSink(ctx, sink, report, **options), sink, report
+
+
+def _write_events(coalescing_sink, callback):
+    aspects = [
+        ("urn:a", _Ownership("alice")),
+        ("urn:b", _Tags(["pii"])),
+        ("urn:a", _Tags(["gold"])),
+        ("urn:a", _Ownership("bob")),
+    ]
+    for i, (urn, aspect) in enumerate(aspects):
+        coalescing_sink.write_record_async(
+            RecordEnvelope(_Event(_Snapshot(urn, [aspect])), {"workunit_id": str(i)}),
+            callback,
+        )
+
+
+def _aspects_by_urn(records):
+    return {
+        record.proposedSnapshot.urn: [
+            vars(aspect) for aspect in record.proposedSnapshot.aspects
+        ]
+        for record in records
+    }
+
+
+def test_merges_aspects_per_urn():
+    coalescing_sink, sink, report = _create_sink()
+    callback = MagicMock()
+    _write_events(coalescing_sink, callback)
+    assert sink.records == []
+
+    coalescing_sink.close()
+    assert _aspects_by_urn(sink.records) == {
+        "urn:a": [{"owner": "bob"}, {"tags": ["gold"]}],
+        "urn:b": [{"tags": ["pii"]}],
+    }
+    assert report.records_coalesced == 2
+    # Every original record is acknowledged.
+    acknowledged = [
+        call.args[0].metadata["workunit_id"]
+        for call in callback.on_success.call_args_list
+    ]
+    assert sorted(acknowledged) == ["0", "1", "2", "3"]
+
+
+def test_spills_to_disk(tmp_path):
+    coalescing_sink, sink, report = _create_sink(
+        max_records_in_memory=2, spill_dir=str(tmp_path)
+    )
+    callback = MagicMock()
+    _write_events(coalescing_sink, callback)
+    assert list(tmp_path.iterdir())
+
+    coalescing_sink.close()
+    assert _aspects_by_urn(sink.records) == {
+        "urn:a": [{"owner": "bob"}, {"tags": ["gold"]}],
+        "urn:b": [{"tags": ["pii"]}],
+    }
+    assert callback.on_success.call_count == 4
+    assert not list(tmp_path.iterdir())
+
+
+def _make_mce(urn, aspects):
+    return MetadataChangeEventClass(
+        proposedSnapshot=DatasetSnapshotClass(urn=urn, aspects=aspects)
+    )
+
+
+def test_spills_generated_classes_to_disk(tmp_path):
+    coalescing_sink, sink, _ = _create_sink(
+        max_records_in_memory=2, spill_dir=str(tmp_path)
+    )
+    callback = MagicMock()
+    properties = [
+        DatasetPropertiesClass(description=f"v{i}", tags=[], customProperties={})
+        for i in range(2)
+    ]
+    mces = [
+        _make_mce("urn:a", [properties[0]]),
+        _make_mce("urn:b", [StatusClass(removed=True)]),
+        _make_mce("urn:a", [StatusClass(removed=False)]),
+        _make_mce("urn:a", [properties[1]]),
+    ]
+    for i, mce in enumerate(mces):
+        coalescing_sink.write_record_async(
+            RecordEnvelope(mce, {"workunit_id": str(i)}), callback
+        )
+    assert list(tmp_path.iterdir())
+
+    coalescing_sink.close()
+    records = sorted(sink.records, key=lambda record: record.proposedSnapshot.urn)
+    assert [record.to_obj() for record in records] == [
+        _make_mce("urn:a", [properties[1], StatusClass(removed=False)]).to_obj(),
+        _make_mce("urn:b", [StatusClass(removed=True)]).to_obj(),
+    ]
+    assert callback.on_success.call_count == 4
+
+
+def test_window_and_batch_edges():
+    coalescing_sink, sink, _ = _create_sink(window_size=2)
+    _write_events(coalescing_sink, MagicMock())
+    # Two windows of two records each.
+    assert len(sink.records) == 3
+
+    coalescing_sink, sink, _ = _create_sink(flush_on_batch_end=True)
+    _write_events(coalescing_sink, MagicMock())
+    coalescing_sink.handle_batch_end()
+    assert len(sink.records) == 2
+    assert sink.batches == 1
+
+
+def test_passes_through_other_records():
+    coalescing_sink, sink, _ = _create_sink()
+    coalescing_sink.write_record_async(
+        RecordEnvelope("not an event", {"workunit_id": "0"}), MagicMock()
+    )
+    assert sink.records == ["not an event"]
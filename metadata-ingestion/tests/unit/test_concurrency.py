@@ -0,0 +1,115 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from datahub.ingestion.sink.concurrency import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+)
+
+
+def _limiter(**kwargs):
+    return AdaptiveConcurrencyLimiter(AdaptiveConcurrencyConfig(enabled=True, **kwargs))
+
+
+class _Clock:
+    now = 0.0
+
+
+def _write(limiter, latency=0.01, overloaded=False):
+    with patch("time.perf_counter", return_value=_Clock.now):
+        start = limiter.acquire()
+    _Clock.now += latency
+    with patch("time.perf_counter", return_value=_Clock.now):
+        limiter.release(start, overloaded=overloaded)
+
+
+def test_additive_increase_up_to_max():
+    limiter = _limiter(max_concurrency=4)
+    assert limiter.current_concurrency == 1
+    _write(limiter)
+    assert limiter.current_concurrency == 2
+    # Grows by about one for every limit writes.
+    for _ in range(3):
+        _write(limiter)
+    assert limiter.current_concurrency == 3
+    for _ in range(100):
+        _write(limiter)
+    assert limiter.current_concurrency == 4
+
+
+def test_multiplicative_decrease_on_overload():
+    limiter = _limiter(max_concurrency=64)
+    while limiter.current_concurrency < 16:
+        _write(limiter)
+
+    _write(limiter, overloaded=True)
+    assert limiter.current_concurrency == 8
+    # Too slow compared to the fastest writes.
+    _write(limiter, latency=1.0)
+    assert limiter.current_concurrency == 4
+    assert limiter.decreases == 2
+
+    for _ in range(10):
+        _write(limiter, overloaded=True)
+    assert limiter.current_concurrency == 1
+
+
+def test_decreases_once_for_writes_in_flight_together():
+    limiter = _limiter(max_concurrency=64)
+    while limiter.current_concurrency < 16:
+        _write(limiter)
+
+    starts = [limiter.acquire() for _ in range(4)]
+    for start in starts:
+        limiter.release(start, overloaded=True)
+    assert limiter.current_concurrency == 8
+    assert limiter.decreases == 1
+
+
+def test_keys_are_not_in_flight_twice():
+    limiter = _limiter(min_concurrency=4)
+    start = limiter.acquire("urn:a")
+    assert limiter.try_acquire("urn:b") is not None
+    assert limiter.try_acquire("urn:a") is None
+
+    acquired = threading.Event()
+
+    def acquire_again():
+        limiter.acquire("urn:a")
+        acquired.set()
+
+    thread = threading.Thread(target=acquire_again)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(start, "urn:a")
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_config_validation():
+    with pytest.raises(ValidationError):
+        AdaptiveConcurrencyConfig(min_concurrency=8, max_concurrency=4)
+    with pytest.raises(ValidationError):
+        AdaptiveConcurrencyConfig(backoff_factor=1.5)
+
+
+def test_recovers_after_latency_shifts_up():
+    limiter = _limiter(max_concurrency=16, baseline_window_seconds=10)
+    while limiter.current_concurrency < 16:
+        _write(limiter, latency=0.01)
+
+    # The server gets ten times slower for good.
+    _write(limiter, latency=0.1)
+    assert limiter.current_concurrency == 8
+    # Once the fast writes have left the baseline window, the slower latency is
+    # the new baseline, and the concurrency grows again.
+    for _ in range(110):
+        _write(limiter, latency=0.1)
+    decreases = limiter.decreases
+    for _ in range(1000):
+        _write(limiter, latency=0.1)
+    assert limiter.decreases == decreases
+    assert limiter.current_concurrency == 16
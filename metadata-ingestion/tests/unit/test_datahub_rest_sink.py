@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock, patch
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import WriteCallback
+from datahub.ingestion.sink.datahub_rest import DatahubRestSink
+from datahub.metadata.schema_classes import (
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+)
+
+
+def _record_envelope(urn):
+    mce = MetadataChangeEventClass(
+        proposedSnapshot=DatasetSnapshotClass(urn=urn, aspects=[])
+    )
+    return RecordEnvelope(mce, workunit_id=urn)
+
+
+@patch("datahub.ingestion.sink.datahub_rest.DatahubRestEmitter")
+def test_reports_writes_that_raise(mock_emitter):
+    sink = DatahubRestSink.create(
+        {"concurrency": {"enabled": True}}, PipelineContext(run_id="test")
+    )
+    callback = MagicMock(spec=WriteCallback)
+    # The sink reports write errors to the callback, so only a failing callback
+    # makes a write raise.
+    callback.on_success.side_effect = [None, RuntimeError("callback failed")]
+    callback.on_failure.side_effect = RuntimeError("callback failed")
+
+    sink.write_record_async(_record_envelope("urn:li:dataset:1"), callback)
+    sink.write_records_batch([_record_envelope("urn:li:dataset:2")], callback)
+    sink.handle_batch_end()
+
+    assert mock_emitter.return_value.emit_mce.call_count == 2
+    failures = sink.get_report().failures
+    assert [failure.get("urn") for failure in failures] == [None, "urn:li:dataset:2"]
+    sink.close()
+    assert len(sink.get_report().failures) == 2
@@ -0,0 +1,195 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
+from datahub.ingestion.run.fanout import FanOutSink
+from datahub.ingestion.run.pipeline import Pipeline
+from datahub.ingestion.sink.datahub_rest import DatahubRestSink
+from datahub.ingestion.sink.file import FileSink
+from datahub.ingestion.source.metadata_common import MetadataWorkUnit
+from datahub.metadata.schema_classes import (
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+)
+
+# The recipe with several sinks from the README.
+RECIPE = """
+source:
+  type: "file"
+  config:
+    filename: "./examples/mce_files/single_mce.json"
+sink:
+  - type: "file"
+    config:
+      filename: "{archive}"
+  - type: "datahub-rest"
+    config:
+      server: "http://localhost:8080"
+"""
+
+
+@dataclass
+class _RecordingSink(Sink):
+    fail: bool = False
+    # If set, writes block until it is.
+    unblocked: Optional[threading.Event] = None
+    report: SinkReport = field(default_factory=SinkReport)
+    events: List[str] = field(default_factory=list)
+
+    @classmethod
+    def create(cls, config_dict, ctx):
+        return cls(ctx)
+
+    def handle_work_unit_start(self, workunit):
+        self.events.append(f"start {workunit.id}")
+
+    def handle_work_unit_end(self, workunit):
+        self.events.append(f"end {workunit.id}")
+
+    def handle_batch_end(self):
+        self.events.append("flush")
+
+    def write_record_async(self, record_envelope, callback):
+        if self.unblocked is not None:
+            self.unblocked.wait()
+        if self.fail:
+            self.report.report_failure("boom")
+            callback.on_failure(record_envelope, ValueError("boom"), {})
+            return
+        self.events.append(f"write {record_envelope.record}")
+        self.report.report_record_written(record_envelope)
+        callback.on_success(record_envelope, {})
+
+    def get_report(self):
+        return self.report
+
+    def close(self):
+        self.events.append("close")
+
+
+def test_fan_out_writes_to_every_sink():
+    ctx = PipelineContext(run_id="test")
+    sinks = [_RecordingSink(ctx), _RecordingSink(ctx)]
+    fan_out = FanOutSink(ctx, sinks, queue_size=2, wait_on_batch_end=True)
+    callback = MagicMock(spec=WriteCallback)
+    workunit = MetadataWorkUnit(
+        id="wu",
+        mce=MetadataChangeEventClass(
+            proposedSnapshot=DatasetSnapshotClass(urn="urn:li:dataset:1", aspects=[])
+        ),
+    )
+
+    fan_out.handle_work_unit_start(workunit)
+    for i in range(5):
+        fan_out.write_record_async(RecordEnvelope(record=i, metadata={}), callback)
+    fan_out.handle_work_unit_end(workunit)
+    fan_out.handle_batch_end()
+    # Every sink has flushed by the time the batch ends.
+    assert all(sink.events[-1] == "flush" for sink in sinks)
+    fan_out.close()
+
+    expected = ["start wu", *[f"write {i}" for i in range(5)], "end wu", "flush"]
+    for sink in sinks:
+        assert sink.events == [*expected, "close"]
+    # The pipeline's callback is called once per record.
+    assert callback.on_success.call_count == 5
+    assert fan_out.get_report().records_written == 10
+
+
+def test_fan_out_writes_batches_to_every_sink():
+    ctx = PipelineContext(run_id="test")
+    sinks = [_RecordingSink(ctx), _RecordingSink(ctx, fail=True)]
+    fan_out = FanOutSink(ctx, sinks, queue_size=2, wait_on_batch_end=False)
+    callback = MagicMock(spec=WriteCallback)
+
+    record_envelopes = [RecordEnvelope(record=i, metadata={}) for i in range(3)]
+    fan_out.write_records_batch(record_envelopes, callback)
+    fan_out.close()
+
+    assert sinks[0].events == ["write 0", "write 1", "write 2", "close"]
+    # Each record is reported once, with the failure of the second sink.
+    assert callback.on_success.call_count == 0
+    assert [
+        args[0] for args, _ in callback.on_failure.call_args_list
+    ] == record_envelopes
+
+
+def test_fan_out_does_not_hold_back_fast_sinks():
+    ctx = PipelineContext(run_id="test")
+    unblocked = threading.Event()
+    fast, slow = _RecordingSink(ctx), _RecordingSink(ctx, unblocked=unblocked)
+    fan_out = FanOutSink(ctx, [fast, slow], queue_size=100, wait_on_batch_end=False)
+    callback = MagicMock(spec=WriteCallback)
+
+    for batch in range(3):
+        for i in range(5):
+            record_envelope = RecordEnvelope(record=f"{batch}.{i}", metadata={})
+            fan_out.write_record_async(record_envelope, callback)
+        fan_out.handle_batch_end()
+    # Every batch has ended, and the fast sink has flushed all of them, while the
+    # slow sink is still stuck on its first write.
+    deadline = time.monotonic() + 5
+    while fast.events.count("flush") < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fast.events.count("flush") == 3
+    assert slow.events == []
+
+    unblocked.set()
+    fan_out.close()
+    assert slow.events == fast.events
+    assert callback.on_success.call_count == 15
+
+
+def test_fan_out_reports_failures_once():
+    ctx = PipelineContext(run_id="test")
+    fan_out = FanOutSink(
+        ctx,
+        [_RecordingSink(ctx), _RecordingSink(ctx, fail=True)],
+        queue_size=10,
+        wait_on_batch_end=False,
+    )
+    callback = MagicMock(spec=WriteCallback)
+
+    fan_out.write_record_async(RecordEnvelope(record=1, metadata={}), callback)
+    fan_out.handle_batch_end()
+    fan_out.close()
+
+    callback.on_success.assert_not_called()
+    callback.on_failure.assert_called_once()
+
+
+def test_fan_out_raises_sink_errors():
+    ctx = PipelineContext(run_id="test")
+    broken = _RecordingSink(ctx)
+    fan_out = FanOutSink(
+        ctx, [_RecordingSink(ctx), broken], queue_size=10, wait_on_batch_end=True
+    )
+
+    with patch.object(
+        broken, "handle_batch_end", side_effect=RuntimeError("disk full")
+    ), pytest.raises(RuntimeError, match="disk full"):
+        fan_out.handle_batch_end()
+
+
+def test_recipe_with_several_sinks(tmp_path):
+    recipe = yaml.safe_load(RECIPE.format(archive=tmp_path / "archive.json"))
+    pipeline = Pipeline.create(recipe)
+
+    assert [sink.type for sink in pipeline.config.get_sink_configs()] == [
+        "file",
+        "datahub-rest",
+    ]
+    assert isinstance(pipeline.sink, FanOutSink)
+    assert [type(sink) for sink in pipeline.sinks] == [FileSink, DatahubRestSink]
+    assert [sink_type for sink_type, _ in pipeline.get_sink_reports()] == [
+        "file",
+        "datahub-rest",
+    ]
+    pipeline.sink.close()
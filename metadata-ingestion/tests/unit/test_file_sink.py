@@ -0,0 +1,38 @@
+import json
+from unittest.mock import MagicMock
+
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import WriteCallback
+from datahub.ingestion.sink.file import FileSink
+from datahub.metadata.schema_classes import (
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+)
+
+
+def _record_envelope(i):
+    mce = MetadataChangeEventClass(
+        proposedSnapshot=DatasetSnapshotClass(urn=f"urn:li:dataset:{i}", aspects=[])
+    )
+    return RecordEnvelope(mce, workunit_id=str(i))
+
+
+def test_file_sink_writes_batches(tmp_path):
+    path = tmp_path / "out.json"
+    sink = FileSink.create({"filename": str(path)}, PipelineContext(run_id="test"))
+    callback = MagicMock(spec=WriteCallback)
+
+    # Empty batches write nothing, wherever they come.
+    sink.write_records_batch([], callback)
+    sink.write_records_batch([_record_envelope(0), _record_envelope(1)], callback)
+    sink.write_records_batch([], callback)
+    sink.write_record_async(_record_envelope(2), callback)
+    sink.close()
+
+    with open(path) as f:
+        written = json.load(f)
+    mces = [MetadataChangeEventClass.from_obj(obj) for obj in written]
+    assert [mce.proposedSnapshot.urn for mce in mces] == [
+        f"urn:li:dataset:{i}" for i in range(3)
+    ]
+    assert callback.on_success.call_count == 3
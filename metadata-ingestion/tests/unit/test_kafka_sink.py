@@ -44,6 +44,26 @@ class KafkaSinkTest(unittest.TestCase):
         created_callback = kwargs["on_delivery"]
         assert created_callback == mock_k_callback_instance.kafka_callback
 
+    @patch("datahub.ingestion.sink.datahub_kafka.PipelineContext")
+    @patch("datahub.emitter.kafka_emitter.SerializingProducer")
+    def test_kafka_sink_write_batch(self, mock_producer, mock_context):
+        mock_producer_instance = mock_producer.return_value
+        callback = MagicMock(spec=WriteCallback)
+        kafka_sink = DatahubKafkaSink.create({}, mock_context)
+        record_envelopes = [
+            RecordEnvelope(record=f"test{i}", metadata={}) for i in range(3)
+        ]
+        kafka_sink.write_records_batch(record_envelopes, callback)
+        # Polls once for the whole batch.
+        assert mock_producer_instance.poll.call_count == 1
+        assert mock_producer_instance.produce.call_count == 3
+
+        for args, kwargs in mock_producer_instance.produce.call_args_list:
+            kwargs["on_delivery"](None, "msg")
+        assert [
+            args[0] for args, _ in callback.on_success.call_args_list
+        ] == record_envelopes
+
     # TODO: Test that kafka producer is configured correctly
 
     @patch("datahub.ingestion.sink.datahub_kafka.PipelineContext")
@@ -54,6 +74,33 @@ class KafkaSinkTest(unittest.TestCase):
         kafka_sink.close()
         mock_producer_instance.flush.assert_called_once()
 
+    @patch("datahub.ingestion.sink.datahub_kafka.PipelineContext")
+    @patch("datahub.emitter.kafka_emitter.SerializingProducer")
+    def test_kafka_sink_flushes_at_batch_end(self, mock_producer, mock_context):
+        mock_producer_instance = mock_producer.return_value
+        kafka_sink = DatahubKafkaSink.create({}, mock_context)
+        kafka_sink.handle_batch_start()
+        kafka_sink.handle_work_unit_end(MagicMock())
+        mock_producer_instance.flush.assert_not_called()
+        kafka_sink.handle_batch_end()
+        mock_producer_instance.flush.assert_called_once()
+
+    @patch("datahub.ingestion.sink.datahub_kafka.PipelineContext")
+    @patch("datahub.emitter.kafka_emitter.SerializingProducer")
+    def test_kafka_sink_limits_messages_in_flight(self, mock_producer, mock_context):
+        kafka_sink = DatahubKafkaSink.create(
+            {"concurrency": {"enabled": True}}, mock_context
+        )
+        kafka_sink.write_record_async(
+            RecordEnvelope(record="test", metadata={}), MagicMock(spec=WriteCallback)
+        )
+        assert kafka_sink.limiter.in_flight == 1
+
+        args, kwargs = mock_producer.return_value.produce.call_args
+        kwargs["on_delivery"](None, MagicMock())
+        assert kafka_sink.limiter.in_flight == 0
+        assert kafka_sink.get_report().current_concurrency == 2
+
     @patch("datahub.ingestion.sink.datahub_kafka.RecordEnvelope")
     @patch("datahub.ingestion.sink.datahub_kafka.WriteCallback")
     def test_kafka_callback_class(self, mock_w_callback, mock_re):
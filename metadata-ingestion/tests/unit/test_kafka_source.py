@@ -70,6 +70,30 @@ class KafkaSourceTest(unittest.TestCase):
         workunits = [w for w in kafka_source.get_workunits()]
         assert len(workunits) == 2
 
+    @patch("datahub.ingestion.source.kafka.SchemaRegistryClient")
+    @patch("datahub.ingestion.source.kafka.confluent_kafka.Consumer")
+    def test_kafka_source_partitions(self, mock_kafka, mock_schema_registry_client):
+        mock_kafka_instance = mock_kafka.return_value
+        mock_cluster_metadata = MagicMock()
+        mock_cluster_metadata.topics = [f"topic{i:03}" for i in range(150)]
+        mock_kafka_instance.list_topics.return_value = mock_cluster_metadata
+
+        ctx = PipelineContext(run_id="test")
+        kafka_source = KafkaSource.create(
+            {"connection": {"bootstrap": "localhost:9092"}}, ctx
+        )
+        partitions = list(kafka_source.get_partitions())
+        assert [p.id for p in partitions] == [
+            "topic000..topic099",
+            "topic100..topic149",
+        ]
+
+        workunits = [w for p in partitions for w in p.get_workunits()]
+        assert len(workunits) == 150
+        assert partitions[1].report.workunits_produced == 50
+        # The partitions share the source's client.
+        assert mock_schema_registry_client.call_count == 1
+
     @patch("datahub.ingestion.source.kafka.confluent_kafka.Consumer")
     def test_close(self, mock_kafka):
         mock_kafka_instance = mock_kafka.return_value
@@ -0,0 +1,85 @@
+import socket
+import urllib.request
+
+from datahub.ingestion.api.sink import SinkReport
+from datahub.ingestion.api.source import SourceReport
+from datahub.ingestion.run.metrics import (
+    CONTENT_TYPE,
+    MetricsConfig,
+    MetricsExporter,
+    collect_metrics,
+    render,
+)
+from datahub.ingestion.run.pipeline_report import LatencyHistogram, PipelineReport
+
+
+def _collect():
+    source_report = SourceReport()
+    source_report.workunits_produced = 3
+    source_report.report_failure("table", "error: no access")
+    sink_report = SinkReport()
+    sink_report.records_written = 2
+    pipeline_report = PipelineReport()
+    pipeline_report.report_latency("sink", 0.002)
+    pipeline_report.report_latency("sink", 2.0)
+    return collect_metrics(
+        'my "pipeline"', source_report, [("console", sink_report)], pipeline_report
+    )
+
+
+def test_render_metrics():
+    lines = render(_collect()).splitlines()
+    labels = 'pipeline="my \\"pipeline\\""'
+
+    assert "# TYPE datahub_workunits_produced counter" in lines
+    assert f"datahub_workunits_produced_total{{{labels}}} 3" in lines
+    assert f"datahub_source_failures_total{{{labels}}} 1" in lines
+    assert f'datahub_records_written_total{{{labels},sink="console"}} 2' in lines
+    assert (
+        f'datahub_stage_latency_seconds_bucket{{{labels},stage="sink",le="0.001"}} 0'
+        in lines
+    )
+    assert (
+        f'datahub_stage_latency_seconds_bucket{{{labels},stage="sink",le="0.005"}} 1'
+        in lines
+    )
+    assert (
+        f'datahub_stage_latency_seconds_bucket{{{labels},stage="sink",le="+Inf"}} 2'
+        in lines
+    )
+    assert lines[-1] == "# EOF"
+
+
+def test_histogram_cumulative_counts():
+    histogram = LatencyHistogram()
+    for seconds in [0.0005, 0.003, 0.004, 0.2]:
+        histogram.record(seconds)
+    assert histogram.cumulative_counts([0.001, 0.01, 1.0]) == [1, 3, 4]
+
+
+def test_serves_metrics():
+    exporter = MetricsExporter(MetricsConfig(port=0), _collect)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as r:
+            assert r.headers["Content-Type"] == CONTENT_TYPE
+            assert b"datahub_workunits_produced_total" in r.read()
+    finally:
+        exporter.stop()
+    assert exporter.port is None
+
+
+def test_falls_back_to_file(tmp_path):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        metrics_file = tmp_path / "metrics.prom"
+        exporter = MetricsExporter(
+            MetricsConfig(port=port, file=str(metrics_file)), _collect
+        )
+        exporter.start()
+        exporter.stop()
+
+    assert exporter.port is None
+    assert "datahub_workunits_produced_total" in metrics_file.read_text()
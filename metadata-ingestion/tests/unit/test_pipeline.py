@@ -1,7 +1,158 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
 import unittest
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 from unittest.mock import patch
 
+from datahub.ingestion.api.sink import AsyncSink, SinkReport
 from datahub.ingestion.run.pipeline import Pipeline
+from datahub.ingestion.sink.console import ConsoleSink
+from datahub.metadata.schema_classes import (
+    DatasetPropertiesClass,
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+)
+
+
+def _make_mces(count: int, urns: int = 3) -> List[MetadataChangeEventClass]:
+    """Events for a few datasets, whose descriptions count up across the events."""
+    return [
+        MetadataChangeEventClass(
+            proposedSnapshot=DatasetSnapshotClass(
+                urn=f"urn:li:dataset:(urn:li:dataPlatform:hive,table{i % urns},PROD)",
+                aspects=[
+                    DatasetPropertiesClass(
+                        description=f"version {i}", tags=[], customProperties={}
+                    )
+                ],
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def _versions_by_urn(
+    mces: List[MetadataChangeEventClass],
+) -> Dict[str, List[Optional[str]]]:
+    versions: Dict[str, List[Optional[str]]] = {}
+    for mce in mces:
+        snapshot = mce.proposedSnapshot
+        (properties,) = snapshot.aspects
+        assert isinstance(properties, DatasetPropertiesClass)
+        versions.setdefault(snapshot.urn, []).append(properties.description)
+    return versions
+
+
+def _run_file_pipeline(
+    mces: List[MetadataChangeEventClass], execution: dict
+) -> List[MetadataChangeEventClass]:
+    """Runs the events through a pipeline from a file source to a file sink, and
+    returns the events that were written."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_file = os.path.join(temp_dir, "source.json")
+        sink_file = os.path.join(temp_dir, "sink.json")
+        with open(source_file, "w") as f:
+            json.dump([mce.to_obj() for mce in mces], f)
+
+        pipeline = Pipeline.create(
+            {
+                "source": {"type": "file", "config": {"filename": source_file}},
+                "sink": {"type": "file", "config": {"filename": sink_file}},
+                "execution": execution,
+            }
+        )
+        pipeline.run()
+        pipeline.raise_from_status()
+
+        with open(sink_file) as f:
+            return [MetadataChangeEventClass.from_obj(obj) for obj in json.load(f)]
+
+
+def _run_console_pipeline(
+    mces: List[MetadataChangeEventClass], execution: dict, write_seconds: float
+) -> Tuple[List[MetadataChangeEventClass], int]:
+    """Runs the events through a pipeline from a file source to a console sink,
+    which takes write_seconds to write every other batch, so that concurrent writes
+    overtake each other. Returns the events in the order they were written, and the
+    most work units that the source was ever ahead of the sink by."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_file = os.path.join(temp_dir, "source.json")
+        with open(source_file, "w") as f:
+            json.dump([mce.to_obj() for mce in mces], f)
+
+        pipeline = Pipeline.create(
+            {
+                "source": {"type": "file", "config": {"filename": source_file}},
+                "sink": {"type": "console"},
+                "execution": execution,
+            }
+        )
+        written: List[MetadataChangeEventClass] = []
+        leads: List[int] = []
+
+        def write_records_batch(sink, record_envelopes, callback):
+            time.sleep(write_seconds if len(leads) % 2 == 0 else 0)
+            leads.append(
+                pipeline.source.get_report().workunits_produced
+                - pipeline.pipeline_report.workunits_written
+            )
+            for record_envelope in record_envelopes:
+                written.append(record_envelope.record)
+                callback.on_success(record_envelope, {})
+
+        with patch.object(
+            ConsoleSink,
+            "write_records_batch",
+            autospec=True,
+            side_effect=write_records_batch,
+        ):
+            pipeline.run()
+        pipeline.raise_from_status()
+        return written, max(leads)
+
+
+@dataclass
+class _SlowAsyncSink(AsyncSink):
+    """Takes longer to write every other record, so that concurrent writes complete
+    out of order."""
+
+    report: SinkReport = field(default_factory=SinkReport)
+    written: List[MetadataChangeEventClass] = field(default_factory=list)
+    in_flight: int = 0
+    max_in_flight: int = 0
+    # Returns how many work units the source is ahead of the sink by.
+    get_lead: Callable[[], int] = lambda: 0
+    max_lead: int = 0
+
+    @classmethod
+    def create(cls, config_dict, ctx):
+        return cls(ctx)
+
+    def handle_work_unit_start(self, workunit):
+        pass
+
+    def handle_work_unit_end(self, workunit):
+        pass
+
+    async def write_record(self, record_envelope, callback):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.max_lead = max(self.max_lead, self.get_lead())
+        await asyncio.sleep(0.02 if len(self.written) % 2 == 0 else 0)
+        self.in_flight -= 1
+        self.written.append(record_envelope.record)
+        self.report.report_record_written(record_envelope)
+        callback.on_success(record_envelope, {})
+
+    def get_report(self):
+        return self.report
+
+    def close(self):
+        pass
 
 
 class PipelineTest(unittest.TestCase):
@@ -21,3 +172,69 @@ class PipelineTest(unittest.TestCase):
         pipeline.raise_from_status()
         mock_source.assert_called_once()
         mock_sink.assert_called_once()
+
+    def test_run_threaded(self):
+        mces = _make_mces(200)
+        execution = {
+            "mode": "threaded",
+            "queue_size": 2,
+            "extractor_workers": 4,
+            "sink_workers": 4,
+        }
+        written, max_lead = _run_console_pipeline(mces, execution, 0.002)
+        assert len(written) == len(mces)
+        # Work units are written concurrently, but never those for the same URN.
+        assert _versions_by_urn(written) == _versions_by_urn(mces)
+        # The source waits while both queues and every sink worker are busy.
+        assert max_lead <= 2 * 2 + 4 + 2
+
+    def test_run_process_pool(self):
+        mces = _make_mces(50)
+        written = _run_file_pipeline(
+            mces,
+            {"mode": "process", "process_workers": 2, "process_chunk_size": 4},
+        )
+        assert [mce.to_obj() for mce in written] == [mce.to_obj() for mce in mces]
+        assert _versions_by_urn(written) == _versions_by_urn(mces)
+
+    def test_run_async(self):
+        mces = _make_mces(200)
+        execution = {"mode": "async", "max_in_flight": 8, "sink_workers": 4}
+        written, max_lead = _run_console_pipeline(mces, execution, 0.002)
+        assert len(written) == len(mces)
+        assert _versions_by_urn(written) == _versions_by_urn(mces)
+        # The source waits while max_in_flight work units are being written.
+        assert max_lead <= 8 + 1
+
+    def test_run_async_with_async_sink(self):
+        mces = _make_mces(100, urns=4)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_file = os.path.join(temp_dir, "source.json")
+            with open(source_file, "w") as f:
+                json.dump([mce.to_obj() for mce in mces], f)
+            with patch(
+                "datahub.ingestion.run.pipeline.sink_registry.get",
+                return_value=_SlowAsyncSink,
+            ):
+                pipeline = Pipeline.create(
+                    {
+                        "source": {"type": "file", "config": {"filename": source_file}},
+                        "sink": {"type": "slow-async"},
+                        "execution": {"mode": "async", "max_in_flight": 8},
+                    }
+                )
+            sink = pipeline.sink
+            assert isinstance(sink, _SlowAsyncSink)
+            sink.get_lead = lambda: (
+                pipeline.source.get_report().workunits_produced
+                - pipeline.pipeline_report.workunits_written
+            )
+            pipeline.run()
+            pipeline.raise_from_status()
+
+        assert len(sink.written) == len(mces)
+        assert _versions_by_urn(sink.written) == _versions_by_urn(mces)
+        # The writes for different URNs overlap, but the source waits while
+        # max_in_flight work units are being written.
+        assert sink.max_in_flight > 1
+        assert sink.max_lead <= 8 + 1
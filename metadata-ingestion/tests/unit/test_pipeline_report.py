@@ -0,0 +1,57 @@
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.run.pipeline_report import (
+    LatencyHistogram,
+    PipelineReport,
+    ProgressReporter,
+)
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+
+    assert histogram.count == 100
+    assert abs(histogram.percentile(50) - 0.050) < 0.050 * 0.05
+    assert abs(histogram.percentile(99) - 0.099) < 0.099 * 0.05
+    assert histogram.percentile(100) == 0.1
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_pipeline_report():
+    report = PipelineReport()
+    assert list(report.timed("source", ["a", "b", "c"])) == ["a", "b", "c"]
+
+    envelope = RecordEnvelope(record="a", metadata={})
+    report.report_write_started(envelope)
+    report.report_write_acknowledged(envelope)
+    # Acknowledging a record twice doesn't count it twice.
+    report.report_write_acknowledged(envelope)
+    report.report_run_finished()
+
+    obj = report.as_obj()
+    assert obj["stages"]["source"]["count"] == 3
+    assert obj["stages"]["callback"]["count"] == 1
+    assert obj["stages"]["sink"]["count"] == 0
+    assert "source" in report.as_string()
+
+
+def test_progress_reporter():
+    report = PipelineReport()
+    progress = ProgressReporter(report, 30, lambda: 10)
+    progress.start()
+    progress.stop()
+
+    list(report.timed("source", range(4)))
+    envelopes = [RecordEnvelope(record=i, metadata={}) for i in range(3)]
+    for envelope in envelopes:
+        report.report_write_started(envelope)
+        report.report_latency("sink", 0.001)
+    report.report_write_acknowledged(envelopes[0])
+    report.report_workunit_written()
+
+    line = progress.get_progress()
+    assert "1 records written" in line
+    assert "2 in flight" in line
+    assert "4 work units read, 1 written of about 10" in line
+    assert "ETA" in line
@@ -1,9 +1,13 @@
+import json
+import sys
+
 import pytest
 from click.testing import CliRunner
 
 from datahub.configuration.common import ConfigurationError
 from datahub.entrypoints import datahub
-from datahub.ingestion.api.registry import Registry
+from datahub.ingestion.api import plugin_index
+from datahub.ingestion.api.registry import Registry, find_missing_modules
 from datahub.ingestion.api.sink import Sink
 from datahub.ingestion.extractor.extractor_registry import extractor_registry
 from datahub.ingestion.sink.console import ConsoleSink
@@ -59,3 +63,70 @@ def test_registry():
         fake_registry.register("thisdoesnotexist", DummyClass)  # type: ignore
     with pytest.raises(ConfigurationError, match="disabled"):
         fake_registry.get("disabled")
+
+
+def test_registry_imports_plugins_lazily(tmp_path, monkeypatch):
+    (tmp_path / "lazy_sink_plugin.py").write_text(
+        "from datahub.ingestion.sink.console import ConsoleSink\n"
+        "class LazySink(ConsoleSink):\n"
+        "    pass\n"
+    )
+    (tmp_path / "broken_sink_plugin.py").write_text("import thismoduledoesnotexist\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    fake_registry = Registry[Sink]()
+    fake_registry.register_lazy("lazy", "lazy_sink_plugin:LazySink")
+    fake_registry.register_lazy("broken", "broken_sink_plugin:BrokenSink")
+
+    # Probing doesn't import the plugins.
+    assert fake_registry.is_enabled("lazy")
+    assert not fake_registry.is_enabled("broken")
+    assert "lazy_sink_plugin" not in sys.modules
+    assert "broken_sink_plugin" not in sys.modules
+
+    lazy_sink = fake_registry.get("lazy")
+    assert lazy_sink.__name__ == "LazySink"
+    assert fake_registry.get("lazy") is lazy_sink
+    assert fake_registry.get("lazy_sink_plugin.LazySink") is lazy_sink
+
+    with pytest.raises(ConfigurationError, match="disabled"):
+        fake_registry.get("broken")
+    assert not fake_registry.is_enabled("broken")
+
+
+def test_find_missing_modules():
+    assert find_missing_modules("datahub.ingestion.sink.console") == []
+
+
+@pytest.fixture
+def plugin_index_path(tmp_path, monkeypatch):
+    path = tmp_path / "plugin_index.json"
+    monkeypatch.setenv("DATAHUB_PLUGIN_INDEX", str(path))
+    monkeypatch.setattr(plugin_index, "_index", None)
+    return path
+
+
+def test_plugin_index_is_cached(plugin_index_path, monkeypatch):
+    assert ("console", "datahub.ingestion.sink.console:ConsoleSink") in (
+        plugin_index.get_entry_points("datahub.ingestion.sink.plugins")
+    )
+    cached = json.loads(plugin_index_path.read_text())
+    assert cached["fingerprint"] == plugin_index._get_environment_fingerprint()
+
+    # A new process reads the index from the cache.
+    def fail():
+        raise AssertionError("the index should have been read from the cache")
+
+    monkeypatch.setattr(plugin_index, "_index", None)
+    monkeypatch.setattr(plugin_index, "build_index", fail)
+    assert plugin_index.load_index() == cached["entry_points"]
+
+
+def test_plugin_index_is_rebuilt(plugin_index_path, monkeypatch):
+    plugin_index_path.write_text(
+        json.dumps({"fingerprint": "stale", "entry_points": {}})
+    )
+    index = plugin_index.load_index()
+    assert "console" in index["datahub.ingestion.sink.plugins"]
+    cached = json.loads(plugin_index_path.read_text())
+    assert cached["fingerprint"] != "stale"
@@ -0,0 +1,78 @@
+import logging
+import os
+from unittest.mock import patch
+
+from datahub.ingestion.run.pipeline_report import PipelineReport
+from datahub.ingestion.run.profiling import (
+    CpuProfiler,
+    MemoryProfiler,
+    ProfilingConfig,
+    create_profiler,
+)
+
+
+def _busy() -> int:
+    return sum(i * i for i in range(10000))
+
+
+def test_cpu_profiler_attributes_time_to_stages(tmp_path):
+    config = ProfilingConfig(mode="cpu", top=5)
+    profiler = create_profiler(config, "run-1")
+    assert isinstance(profiler, CpuProfiler)
+    profiler.output_dir = str(tmp_path)
+
+    report = PipelineReport()
+    report.observers.append(profiler)
+    profiler.start()
+    for _ in report.timed("sink", (_busy() for _ in range(2))):
+        pass
+    profiler.stage_started("source")
+    profiler.stage_finished("source")
+    profiler.stop()
+
+    assert sorted(os.listdir(tmp_path)) == ["sink.pstats", "source.pstats"]
+    summary = profiler.summary()
+    assert "Stage sink:" in summary
+    assert "_busy" in summary
+
+
+def test_cpu_profiler_reports_skipped_stages(tmp_path, caplog):
+    profiler = CpuProfiler(ProfilingConfig(mode="cpu"), str(tmp_path))
+    with patch("cProfile.Profile") as mock_profile, caplog.at_level(logging.WARNING):
+        # As on Python 3.12, when another profiler is already active.
+        mock_profile.return_value.enable.side_effect = ValueError
+        for _ in range(3):
+            profiler.stage_started("sink")
+            profiler.stage_finished("sink")
+
+    assert profiler.skipped_stages == {"sink": 3}
+    # Only warns once per stage.
+    assert len(caplog.records) == 1
+    assert "sink (3 times)" in profiler.summary()
+
+
+def test_memory_profiler_takes_snapshots(tmp_path):
+    config = ProfilingConfig(mode="memory", snapshot_interval_workunits=2, top=3)
+    profiler = MemoryProfiler(config, str(tmp_path))
+
+    report = PipelineReport()
+    report.observers.append(profiler)
+    profiler.start()
+    kept = []
+    for _ in range(5):
+        kept.append(bytearray(10000))
+        report.report_workunit_written()
+    profiler.stop()
+
+    # One snapshot for every two work units, and a final one.
+    assert profiler.snapshots_taken == 3
+    assert profiler.peak_traced_bytes >= 50000
+    assert os.listdir(tmp_path) == ["memory.tracemalloc"]
+    summary = profiler.summary()
+    assert "Peak traced memory" in summary
+    assert "Top allocation sites:" in summary
+    assert "test_profiling.py" in summary
+
+
+def test_profiling_disabled_by_default():
+    assert create_profiler(ProfilingConfig(), "run-1") is None
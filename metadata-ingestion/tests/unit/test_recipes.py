@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock, patch
+
+from datahub.ingestion.api.common import (
+    PipelineContext,
+    SharedResources,
+    get_shared_resource,
+)
+from datahub.ingestion.run.recipes import find_recipes, run_daemon
+
+
+def test_find_recipes(tmp_path):
+    recipes_dir = tmp_path / "recipes"
+    recipes_dir.mkdir()
+    for name in ["b.yml", "a.yaml", "c.toml", "notes.txt"]:
+        (recipes_dir / name).write_text("")
+    single = tmp_path / "single.yml"
+    single.write_text("")
+
+    assert find_recipes([str(recipes_dir), str(single)]) == [
+        recipes_dir / "a.yaml",
+        recipes_dir / "b.yml",
+        recipes_dir / "c.toml",
+        single,
+    ]
+
+
+def test_shared_resources_are_created_once():
+    factory = MagicMock(side_effect=lambda: object())
+    shared_resources = SharedResources()
+    ctx = PipelineContext(run_id="test", shared_resources=shared_resources)
+    other_ctx = PipelineContext(run_id="other", shared_resources=shared_resources)
+
+    first = get_shared_resource(ctx, "key", factory)
+    assert get_shared_resource(other_ctx, "key", factory) is first
+    assert get_shared_resource(ctx, "other-key", factory) is not first
+    assert factory.call_count == 2
+
+
+def test_resources_are_not_shared_without_shared_resources():
+    ctx = PipelineContext(run_id="test")
+    assert get_shared_resource(ctx, "key", object) is not get_shared_resource(
+        ctx, "key", object
+    )
+
+
+def test_shared_resources_are_closed():
+    resource = MagicMock()
+    shared_resources = SharedResources()
+    shared_resources.get("key", lambda: resource)
+    shared_resources.close()
+    resource.close.assert_called_once()
+
+
+def test_daemon_runs_recipes_repeatedly(tmp_path):
+    recipe = tmp_path / "recipe.yml"
+    with patch("datahub.ingestion.run.recipes.run_recipes") as run_recipes:
+        run_recipes.return_value = []
+        assert run_daemon([recipe], 0, 2, max_runs=3) == 0
+    assert run_recipes.call_count == 3
+    # The runs share their resources.
+    shared_resources = {call.args[2] for call in run_recipes.call_args_list}
+    assert len(shared_resources) == 1
@@ -0,0 +1,87 @@
+import json
+import pickle
+
+from datahub.emitter import serialization
+from datahub.ingestion.api.common import RecordEnvelope
+from datahub.ingestion.run import pickling
+from datahub.ingestion.source.metadata_common import MetadataWorkUnit
+from datahub.metadata.schema_classes import (
+    DatasetSnapshotClass,
+    MetadataChangeEventClass,
+)
+
+
+def test_record_envelope_creates_metadata_lazily():
+    record_envelope = RecordEnvelope("record", workunit_id="wu-1")
+    assert not hasattr(record_envelope, "__dict__")
+    assert record_envelope._metadata is None
+    assert record_envelope._serialized is None
+
+    assert record_envelope.metadata == {"workunit_id": "wu-1"}
+    record_envelope.metadata["aspect_hashes"] = None
+    assert "aspect_hashes" in record_envelope.metadata
+
+    assert repr(record_envelope) == (
+        "RecordEnvelope(record='record', "
+        "metadata={'workunit_id': 'wu-1', 'aspect_hashes': None})"
+    )
+    assert record_envelope._serialized is None
+
+
+def test_record_envelope_takes_workunit_id_from_metadata():
+    record_envelope = RecordEnvelope(record="record", metadata={"workunit_id": "wu-1"})
+    assert record_envelope.workunit_id == "wu-1"
+    assert record_envelope == RecordEnvelope("record", workunit_id="wu-1")
+    assert record_envelope != RecordEnvelope("other", workunit_id="wu-1")
+
+
+def test_record_envelope_and_workunit_pickle():
+    record_envelope = RecordEnvelope("record", workunit_id="wu-1")
+    record_envelope.serialized["json"] = "{}"
+    assert pickle.loads(pickle.dumps(record_envelope)) == record_envelope
+
+    mce = MetadataChangeEventClass(
+        proposedSnapshot=DatasetSnapshotClass(urn="urn:li:dataset:1", aspects=[])
+    )
+    workunit = MetadataWorkUnit(id="wu-1", mce=mce)
+    assert not hasattr(workunit, "__dict__")
+    # Generated records go through the pipeline's own pickling.
+    unpickled = pickling.loads(pickling.dumps(workunit))
+    assert unpickled.id == workunit.id
+    assert unpickled.mce.to_obj() == mce.to_obj()
+
+
+class _FakeMCE:
+    def __init__(self):
+        self.to_obj_calls = 0
+
+    def to_obj(self, tuples=False):
+        self.to_obj_calls += 1
+        aspect = {"com.linkedin.pegasus2avro.common.Status": {"removed": False}}
+        return {
+            "proposedSnapshot": {
+                "com.linkedin.pegasus2avro.metadata.snapshot.DatasetSnapshot": {
+                    "urn": "urn:li:dataset:1",
+                    "aspects": [aspect],
+                }
+            },
+            "proposedDelta": None,
+        }
+
+
+def test_record_envelope_caches_serialized_forms():
+    mce = _FakeMCE()
+    record_envelope = RecordEnvelope(mce, workunit_id="wu-1")
+
+    payload = record_envelope.get_serialized(serialization.JSON)
+    assert json.loads(payload)["proposedDelta"] is None
+    request = record_envelope.get_serialized(serialization.RESTLI_JSON)
+    assert json.loads(request) == {
+        "snapshot": {
+            "urn": "urn:li:dataset:1",
+            "aspects": [{"com.linkedin.common.Status": {"removed": False}}],
+        }
+    }
+    assert record_envelope.get_serialized(serialization.JSON) is payload
+    # Both forms are derived from the same avro-JSON object.
+    assert mce.to_obj_calls == 1
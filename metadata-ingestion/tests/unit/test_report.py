@@ -0,0 +1,88 @@
+import json
+
+from datahub.ingestion.api.report import disable_spill, enable_spill
+from datahub.ingestion.api.sink import SinkReport
+from datahub.ingestion.api.source import SourceReport
+
+
+def test_merge_source_reports():
+    first = SourceReport()
+    first.report_warning("db.table", "no comment")
+
+    second = SourceReport()
+    second.workunits_produced = 2
+    second.workunit_ids.append("db.other")
+    second.workunit_ids.append("db.third")
+    second.report_warning("db.table", "no schema")
+    second.report_failure("db.fourth", "access denied")
+
+    first.merge(second)
+    assert first.workunits_produced == 2
+    assert first.workunit_ids == ["db.other", "db.third"]
+    assert first.warnings == {"db.table": ["no comment", "no schema"]}
+    assert first.failures == {"db.fourth": ["access denied"]}
+
+
+def test_lossy_source_report():
+    report = SourceReport()
+    for i in range(1000):
+        report.report_failure(f"db.table{i}", f"access denied: table{i}")
+        report.workunit_ids.append(f"db.table{i}")
+
+    assert len(report.workunit_ids) == 100
+    assert report.workunit_ids.total == 1000
+    assert len(report.failures) == 100
+    assert report.failures.dropped_keys == 900
+    assert report.failures_by_category == {"access denied": 1000}
+    assert report.as_obj()["workunit_ids"][-1] == "... sampled 100 of 1000"
+
+
+def test_report_skipped_workunits():
+    report = SourceReport()
+    for i in range(150):
+        report.report_workunit_skipped(f"db.table{i}")
+
+    assert report.workunits_skipped == 150
+    assert len(report.skipped_workunit_ids) == 100
+    assert report.skipped_workunit_ids.total == 150
+
+
+def test_merge_lossy_reports():
+    first = SourceReport()
+    second = SourceReport()
+    for i in range(150):
+        second.workunit_ids.append(f"db.table{i}")
+    second.report_warning("db.table", "no comment: db.table")
+
+    first.merge(second)
+    assert len(first.workunit_ids) == 100
+    assert first.workunit_ids.total == 150
+    assert first.warnings_by_category == {"no comment": 1}
+
+
+def test_sink_report_compacts_exceptions():
+    report = SinkReport()
+    report.report_failure({"e": ValueError("bad record")})
+    report.report_failure(ConnectionError("refused"))
+
+    assert report.failures == [
+        {"e": "ValueError: bad record"},
+        "ConnectionError: refused",
+    ]
+    assert report.failures_by_category == {"ValueError": 1, "ConnectionError": 1}
+
+
+def test_spill_to_file(tmp_path):
+    path = str(tmp_path / "spill.jsonl")
+    enable_spill(path)
+    try:
+        report = SourceReport()
+        for i in range(150):
+            report.workunit_ids.append(f"db.table{i}")
+    finally:
+        disable_spill()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 150
+    assert lines[0] == {"field": "SourceReport.workunit_ids", "item": "db.table0"}
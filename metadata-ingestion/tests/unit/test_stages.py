@@ -0,0 +1,54 @@
+import pytest
+
+from datahub.ingestion.run.stages import END_OF_STREAM, StageRunner
+
+
+def test_stages_pass_items_through():
+    runner = StageRunner(queue_size=2)
+    numbers = runner.new_queue()
+    squares = runner.new_queue()
+    results = []
+
+    def produce():
+        for i in range(100):
+            runner.put(numbers, i)
+
+    def square():
+        while True:
+            item = runner.get(numbers)
+            if item is END_OF_STREAM:
+                return
+            runner.put(squares, item * item)
+
+    def collect():
+        while True:
+            item = runner.get(squares)
+            if item is END_OF_STREAM:
+                return
+            results.append(item)
+
+    runner.add_stage("produce", produce, output=numbers, consumers=3)
+    runner.add_stage("square", square, workers=3, output=squares)
+    runner.add_stage("collect", collect)
+    runner.run()
+
+    assert sorted(results) == [i * i for i in range(100)]
+
+
+def test_stage_failure_aborts_run():
+    runner = StageRunner(queue_size=1)
+    items = runner.new_queue()
+
+    def produce():
+        # This would block forever on the full queue if the run was not aborted.
+        while True:
+            runner.put(items, "item")
+
+    def consume():
+        runner.get(items)
+        raise ValueError("sink exploded")
+
+    runner.add_stage("produce", produce, output=items)
+    runner.add_stage("consume", consume)
+    with pytest.raises(ValueError, match="sink exploded"):
+        runner.run()
@@ -0,0 +1,60 @@
+from datahub.ingestion.run.state import IngestionStateStore, get_aspect_hashes
+
+
+class _FakeSnapshot:
+    def __init__(self, urn: str, aspects: list):
+        self.urn = urn
+        self.aspects = aspects
+
+    def to_obj(self) -> dict:
+        return {"urn": self.urn, "aspects": self.aspects}
+
+
+class _FakeMCE:
+    def __init__(self, urn: str, aspects: list):
+        self.proposedSnapshot = _FakeSnapshot(urn, aspects)
+
+
+def _schema(fields: list, time: int) -> dict:
+    return {
+        "SchemaMetadata": {
+            "fields": fields,
+            "created": {"time": time, "actor": "urn:li:corpuser:etl"},
+            "lastModified": {"time": time, "actor": "urn:li:corpuser:etl"},
+        }
+    }
+
+
+def test_aspect_hashes_ignore_audit_times():
+    urn = "urn:li:dataset:(urn:li:dataPlatform:mysql,db.table,PROD)"
+    first = get_aspect_hashes(_FakeMCE(urn, [_schema(["a", "b"], time=1)]))
+    later = get_aspect_hashes(_FakeMCE(urn, [_schema(["a", "b"], time=2)]))
+    changed = get_aspect_hashes(_FakeMCE(urn, [_schema(["a", "c"], time=2)]))
+
+    assert first is not None and changed is not None
+    assert first[0] == urn
+    assert list(first[1].keys()) == ["SchemaMetadata"]
+    assert first == later
+    assert first[1] != changed[1]
+    assert get_aspect_hashes(object()) is None
+
+
+def test_state_store(tmp_path):
+    path = str(tmp_path / "state.db")
+    urn = "urn:li:dataset:(urn:li:dataPlatform:mysql,db.table,PROD)"
+    hashes = {"SchemaMetadata": "abc", "DatasetProperties": "def"}
+
+    store = IngestionStateStore(path, "pipeline")
+    assert not store.is_unchanged(urn, hashes)
+    store.record_written(urn, hashes)
+    store.close()
+
+    store = IngestionStateStore(path, "pipeline")
+    assert store.is_unchanged(urn, hashes)
+    assert not store.is_unchanged(urn, {**hashes, "SchemaMetadata": "xyz"})
+    assert not store.is_unchanged(urn, {**hashes, "Ownership": "ghi"})
+    store.close()
+
+    other_pipeline = IngestionStateStore(path, "other")
+    assert not other_pipeline.is_unchanged(urn, hashes)
+    other_pipeline.close()